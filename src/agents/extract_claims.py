@@ -2,7 +2,10 @@
 
 import re
 
-from src.wrappers.bedrock import call_llm
+from src.wrappers.bedrock import call_llm, model_route
+from src.wrappers.bedrock_batch import complete
+
+INSTRUCTION = "Extract all atomic factual claims from the following text:\n\n"
 
 SYSTEM_PROMPT = (
     "You are a claim extraction assistant. Given a text, extract ONLY "
@@ -29,18 +32,58 @@ def parse_claims(response: str) -> list[str]:
     return claims
 
 
+def is_claim_list(response: str) -> bool:
+    """Whether a response follows the format: NO CLAIMS or a numbered list."""
+    text = response.strip()
+    return text.upper() == "NO CLAIMS" or bool(re.search(r"^\s*\d+[\.\)]", text, re.MULTILINE))
+
+
+def _request(text: str) -> dict:
+    # No cache breakpoint: the instruction and system prompt are far below the
+    # minimum cacheable prefix, so only the verifier's evidence is cached.
+    return {"prompt": INSTRUCTION + text, "system": SYSTEM_PROMPT}
+
+
+def _extract(text: str, route: dict) -> str:
+    """Ask the cascade model first; fall back to the main model if its output is malformed."""
+    if route["cascade"]:
+        response = call_llm(**_request(text), model_id=route["cascade"])
+        if is_claim_list(response):
+            return response
+    return call_llm(**_request(text), model_id=route["model"])
+
+
+def _extract_batch(texts: list[str], route: dict, batch: dict) -> list[str]:
+    """``_extract`` for every text, as batch jobs: the cascade tier, then the fallbacks."""
+    requests = [_request(text) for text in texts]
+    responses = [""] * len(texts)
+    if route["cascade"] and texts:
+        responses = complete(requests, route["cascade"], batch, "extract-fast")
+    retry = [i for i, response in enumerate(responses) if not is_claim_list(response)]
+    if retry:
+        retried = complete([requests[i] for i in retry], route["model"], batch, "extract")
+        for i, response in zip(retry, retried, strict=True):
+            responses[i] = response
+    return responses
+
+
 def extract_claims(state: dict) -> None:
-    """Extract atomic factual claims from each LLM response."""
+    """Extract atomic factual claims from each LLM response (as batch jobs with ``batch``)."""
     responses = state["responses"]
+    config = state.get("config", {})
+    route = model_route(config, "extract_claims")
+    batch = config.get("batch")
+    texts = [entry["response"] for entry in responses]
+    if batch:
+        llm_responses = _extract_batch(texts, route, batch)
+    else:
+        llm_responses = [_extract(text, route) for text in texts]
     all_claims = []
 
-    for entry in responses:
+    for entry, llm_response in zip(responses, llm_responses, strict=True):
         prompt_text = entry["prompt"]
         response_text = entry["response"]
 
-        prompt = f"Extract all atomic factual claims from the following text:\n\n{response_text}"
-
-        llm_response = call_llm(prompt, system=SYSTEM_PROMPT)
         claims = parse_claims(llm_response)
 
         for claim_text in claims:
@@ -49,6 +92,7 @@ def extract_claims(state: dict) -> None:
                     "text": claim_text,
                     "source_prompt": prompt_text,
                     "source_response": response_text,
+                    "category": entry.get("category"),
                 }
             )
 
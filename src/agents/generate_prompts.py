@@ -1,8 +1,20 @@
 """generate_prompts -- ask Claude to create domain-specific test prompts."""
 
 import re
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 
-from src.wrappers.bedrock import call_llm
+from src import prompt_bank
+from src.ingest.dedup import find_or_add, new_lsh_index
+from src.wrappers.bedrock import call_llm, model_route
+
+DEFAULT_SHARD_SIZE = 25
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TOP_UP_ROUNDS = 2
+# Prompts are short, so near-duplicates are compared on word pairs.
+DEDUP_DEFAULTS = {"threshold": 0.7, "shingle_size": 2}
+
+_CATEGORY_RE = re.compile(r"^\[([^\]]+)\]\s*")
 
 
 def parse_prompts(response: str) -> list[str]:
@@ -23,31 +35,168 @@ def parse_prompts(response: str) -> list[str]:
     return prompts
 
 
-def generate_prompts(state: dict) -> None:
-    """Generate test prompts for the given use case via Claude."""
-    config = state["config"]
-    use_case = config["use_case"]
-    num_prompts = config["evaluation"]["num_prompts"]
-    categories = config["evaluation"]["prompt_categories"]
+def split_category(prompt: str, categories: list[str]) -> tuple[str | None, str]:
+    """Split a ``[category] prompt`` line into (category, prompt).
 
-    categories_str = ", ".join(categories)
+    The category is None when the tag is missing or not a configured category.
+    """
+    match = _CATEGORY_RE.match(prompt)
+    if not match:
+        return None, prompt
+    category = match.group(1).strip()
+    return (category if category in categories else None), prompt[match.end() :]
 
-    system_prompt = (
-        "You are a test prompt generator for LLM reliability evaluation. "
-        "Generate prompts that are likely to surface hallucinations or "
-        "inaccurate information. Return ONLY a numbered list of prompts, "
-        "one per line. No extra commentary."
-    )
 
+SYSTEM_PROMPT = (
+    "You are a test prompt generator for LLM reliability evaluation. "
+    "Generate prompts that are likely to surface hallucinations or "
+    "inaccurate information. Return ONLY a numbered list of prompts, "
+    "one per line, each starting with its category in square brackets, "
+    "e.g. 1. [category] prompt. No extra commentary."
+)
+
+
+def plan_shards(
+    num_prompts: int, categories: list[str], shard_size: int
+) -> list[tuple[tuple, int]]:
+    """(categories, count) per shard.
+
+    A suite of at most ``shard_size`` prompts is one shard over every
+    category.  Larger suites split evenly across categories and then into
+    blocks of ``shard_size``, so no single response runs into ``max_tokens``.
+    """
+    if num_prompts <= shard_size or not categories:
+        return [(tuple(categories), num_prompts)]
+    base, extra = divmod(num_prompts, len(categories))
+    shards = []
+    for i, category in enumerate(categories):
+        quota = base + (i < extra)
+        shards += [((category,), min(shard_size, quota - n)) for n in range(0, quota, shard_size)]
+    return shards
+
+
+def _shard_prompt(
+    use_case: str, categories: tuple, count: int, part: tuple[int, int], exclude: list[str]
+) -> str:
     prompt = (
-        f"Generate {num_prompts} test prompts for the following use case:\n"
+        f"Generate {count} test prompts for the following use case:\n"
         f"Use case: {use_case}\n"
-        f"Categories to cover: {categories_str}\n\n"
-        f"Return exactly {num_prompts} prompts as a numbered list."
+        f"Categories to cover: {', '.join(categories)}\n\n"
     )
+    if part[1] > 1:
+        prompt += (
+            f"This is batch {part[0]} of {part[1]} for these categories; other batches "
+            "run in parallel, so cover different aspects from an obvious first list.\n"
+        )
+    prompt += f"Return exactly {count} prompts as a numbered list."
+    if exclude:
+        listed = "\n".join(f"- {p}" for p in exclude)
+        prompt += f"\n\nDo not repeat any of these earlier prompts:\n{listed}"
+    return prompt
+
+
+def _normalize(prompt: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", prompt.lower()).split())
 
-    response = call_llm(prompt, system=system_prompt)
-    prompts = parse_prompts(response)
 
-    # Truncate to num_prompts if Claude returned more
-    state["prompts"] = prompts[:num_prompts]
+def generate(config: dict, num_prompts: int, exclude: list[str]) -> list[tuple[str | None, str]]:
+    """Generate ``num_prompts`` (category, prompt) pairs via Claude, avoiding ``exclude``.
+
+    Generation runs as parallel shards (see ``plan_shards``).  Exact and
+    near-duplicate prompts are dropped across shards, and any category left
+    short is topped up for up to ``evaluation.generation.top_up_rounds``.
+    """
+    use_case = config["use_case"]
+    categories = config["evaluation"]["prompt_categories"]
+    generation = config["evaluation"].get("generation", {})
+    shard_size = generation.get("shard_size", DEFAULT_SHARD_SIZE)
+    model_id = model_route(config, "generate_prompts")["model"]
+
+    lsh = new_lsh_index({**DEDUP_DEFAULTS, **generation.get("dedup", {})})
+    seen = set()
+    for i, p in enumerate(exclude):
+        seen.add(_normalize(p))
+        find_or_add(lsh, f"exclude-{i}", _normalize(p))
+
+    # Each group is one category (or every category for a single-shard suite).
+    quotas: dict[tuple, int] = {}
+    for group, count in plan_shards(num_prompts, categories, shard_size):
+        quotas[group] = quotas.get(group, 0) + count
+    accepted: dict[tuple, list[tuple[str | None, str]]] = {group: [] for group in quotas}
+    returned: dict[tuple, list[str]] = {group: [] for group in quotas}
+
+    for _ in range(generation.get("top_up_rounds", DEFAULT_TOP_UP_ROUNDS) + 1):
+        shards = []
+        for group, quota in quotas.items():
+            missing = quota - len(accepted[group])
+            blocks = [min(shard_size, missing - n) for n in range(0, missing, shard_size)]
+            # Top-ups also exclude everything the group's shards returned, duplicates
+            # included; otherwise a group with nothing accepted repeats its request.
+            avoid = exclude + returned[group]
+            shards += [
+                (group, _shard_prompt(use_case, group, count, (k + 1, len(blocks)), avoid))
+                for k, count in enumerate(blocks)
+            ]
+        if not shards:
+            break
+
+        with ThreadPoolExecutor(
+            max_workers=generation.get("concurrency", DEFAULT_CONCURRENCY)
+        ) as pool:
+            # copy_context keeps each call inside the run's track_usage totals.
+            futures = [
+                pool.submit(
+                    copy_context().run,
+                    call_llm,
+                    prompt,
+                    system=SYSTEM_PROMPT,
+                    model_id=model_id,
+                )
+                for _, prompt in shards
+            ]
+            responses = [future.result() for future in futures]
+
+        added = 0
+        for (group, _), response in zip(shards, responses, strict=True):
+            for line in parse_prompts(response):
+                category, p = split_category(line, categories)
+                if len(group) == 1:
+                    category = group[0]
+                if p not in returned[group]:
+                    returned[group].append(p)
+                key = _normalize(p)
+                if key in seen or find_or_add(lsh, str(len(seen)), key) is not None:
+                    continue
+                seen.add(key)
+                accepted[group].append((category, p))
+                added += 1
+        if not added:
+            break
+
+    # Truncate each group to its quota if Claude returned more
+    return [entry for group, quota in quotas.items() for entry in accepted[group][:quota]]
+
+
+def generate_prompts(state: dict) -> None:
+    """Generate test prompts for the given use case via Claude.
+
+    With a ``prompt_bank`` block, prompts come from the bank for this use
+    case, categories and model, which is only generated into when short;
+    ``prompt_bank`` in the state records the fingerprint and version used.
+    Prompts listed in ``previous_prompts`` (earlier adaptive rounds) are
+    excluded from the request and dropped from the result.  Each prompt's
+    category is kept in ``prompt_categories`` for per-category scoring.
+    """
+    config = state["config"]
+    num_prompts = config["evaluation"]["num_prompts"]
+    previous = state.get("previous_prompts", [])
+    if config.get("prompt_bank"):
+        tagged, entry = prompt_bank.take(config, num_prompts, previous, generate)
+        state["prompt_bank"] = entry and {
+            "fingerprint": entry["fingerprint"],
+            "version": entry["version"],
+        }
+    else:
+        tagged = generate(config, num_prompts, previous)
+    state["prompts"] = [p for _, p in tagged]
+    state["prompt_categories"] = [category for category, _ in tagged]
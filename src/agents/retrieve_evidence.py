@@ -1,6 +1,13 @@
 """retrieve_evidence -- query ES for each claim using keyword + vector hybrid search."""
 
-from src.wrappers.elasticsearch_helper import search_docs, vector_search
+from collections.abc import Callable
+
+from src.wrappers import local_search
+from src.wrappers.bedrock import embed, embedding_options
+from src.wrappers.elasticsearch_helper import knn_search, search_docs, vector_search
+
+DEFAULT_POOL_SIZE = 50
+DEFAULT_K = 5
 
 
 def deduplicate(results: list[dict]) -> list[dict]:
@@ -22,16 +29,103 @@ def deduplicate(results: list[dict]) -> list[dict]:
     return unique
 
 
+def _backend(retrieval: dict) -> dict[str, Callable[..., list[dict]]]:
+    """Search functions of the configured ``retrieval.backend``."""
+    backend = retrieval.get("backend", "elasticsearch")
+    if backend == "elasticsearch":
+        return {"keyword": search_docs, "vector": vector_search, "knn": knn_search}
+    if backend == "local":
+        if not retrieval.get("snapshot"):
+            raise ValueError("The local retrieval backend requires retrieval.snapshot.")
+        return {
+            "keyword": local_search.search_docs,
+            "vector": local_search.vector_search,
+            "knn": local_search.knn_search,
+        }
+    raise ValueError(f"Unknown retrieval backend: {backend}")
+
+
+def _claim_groups(claims: list[dict]) -> list[list[int]]:
+    """Indices of claims grouped by the response they came from, in first-seen order."""
+    groups: dict[str, list[int]] = {}
+    for i, claim in enumerate(claims):
+        groups.setdefault(claim.get("source_response", claim["text"]), []).append(i)
+    return list(groups.values())
+
+
+def _retrieve_per_response(
+    claims: list[dict],
+    search: dict,
+    index: str,
+    retrieval: dict,
+    keyword_kwargs: dict,
+    vector_kwargs: dict,
+    embedding: dict,
+) -> list[list[dict]]:
+    """One candidate pool per response, re-ranked locally for each of its claims.
+
+    Each pool is a keyword search and a kNN search for the group's claims
+    joined together, ``retrieval.pool_size`` results each, so a response
+    costs one embedding and two searches however many claims it has.
+    """
+    pool_size = retrieval.get("pool_size", DEFAULT_POOL_SIZE)
+    documents: list[list[dict]] = [[] for _ in claims]
+    for group in _claim_groups(claims):
+        group_text = " ".join(claims[i]["text"] for i in group)
+        anchor = embed(group_text, **embedding)
+        candidates = deduplicate(
+            search["keyword"](group_text, index=index, size=pool_size, **keyword_kwargs)
+            + search["knn"](anchor, index=index, k=pool_size, **vector_kwargs)
+        )
+        pool = local_search.memory_index(candidates)
+        for i in group:
+            keyword_results, vector_results = local_search.rerank(
+                pool, claims[i]["text"], anchor, k=retrieval.get("k", DEFAULT_K)
+            )
+            documents[i] = deduplicate(keyword_results + vector_results)
+    return documents
+
+
 def retrieve_evidence(state: dict) -> None:
-    """Retrieve evidence documents for each claim via dual search."""
+    """Retrieve evidence documents for each claim via dual search.
+
+    ``retrieval.filters`` (e.g. ``{"tags": ["refunds"]}``) scopes both
+    searches to matching chunk metadata; ``retrieval.num_candidates`` sets
+    the kNN candidate pool.  Queries are embedded with the same ``embedding``
+    settings the index was built with.  ``retrieval.backend: local`` searches
+    the ``retrieval.snapshot`` file in-process instead of Elasticsearch.
+    ``retrieval.mode: response`` searches once per response and re-ranks
+    the results for each claim locally.
+    """
     claims = state["claims"]
     index = state["config"]["elasticsearch"]["index"]
+    retrieval = state["config"].get("retrieval", {})
+    search = _backend(retrieval)
+    if retrieval.get("backend") == "local":
+        index = retrieval["snapshot"]
+    filters = retrieval.get("filters")
+    embedding = embedding_options(state["config"])
+
+    keyword_kwargs: dict = {"filters": filters} if filters else {}
+    knn_kwargs = dict(keyword_kwargs)
+    if "num_candidates" in retrieval:
+        knn_kwargs["num_candidates"] = retrieval["num_candidates"]
 
-    evidence = []
-    for claim in claims:
-        keyword_results = search_docs(claim["text"], index=index)
-        vector_results = vector_search(claim["text"], index=index)
-        combined = deduplicate(keyword_results + vector_results)
-        evidence.append({"claim": claim, "documents": combined})
+    mode = retrieval.get("mode", "claim")
+    if mode == "response":
+        documents = _retrieve_per_response(
+            claims, search, index, retrieval, keyword_kwargs, knn_kwargs, embedding
+        )
+    elif mode == "claim":
+        vector_kwargs = {**knn_kwargs, **embedding}
+        documents = []
+        for claim in claims:
+            keyword_results = search["keyword"](claim["text"], index=index, **keyword_kwargs)
+            vector_results = search["vector"](claim["text"], index=index, **vector_kwargs)
+            documents.append(deduplicate(keyword_results + vector_results))
+    else:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
 
-    state["evidence"] = evidence
+    state["evidence"] = [
+        {"claim": claim, "documents": docs} for claim, docs in zip(claims, documents, strict=True)
+    ]
@@ -30,9 +30,14 @@ def run_model(state: dict) -> None:
     prompts = state["prompts"]
     model_config = state["config"]["model"]
 
+    categories = state.get("prompt_categories")
+
     responses = []
-    for prompt in prompts:
+    for i, prompt in enumerate(prompts):
         result = call_target_llm(prompt, model_config)
-        responses.append({"prompt": prompt, "response": result})
+        entry = {"prompt": prompt, "response": result}
+        if categories:
+            entry["category"] = categories[i]
+        responses.append(entry)
 
     state["responses"] = responses
@@ -1,26 +1,52 @@
 """score_risk -- compute hallucination risk score from claim verdicts."""
 
+import numpy as np
+
+from src.scoring import DEFAULT_BOOTSTRAP_SAMPLES, breakdowns, verdict_arrays
+from src.stats import clustered_risk_interval
+
+DEFAULT_CONFIDENCE = 0.95
+
+
+def risk_interval_by_prompt(verdicts: list[dict], confidence: float) -> tuple[float, float]:
+    """Interval on the unsupported share, clustered by the prompt each claim came from."""
+    clusters: dict[object, list[int]] = {}
+    for i, verdict in enumerate(verdicts):
+        key = verdict.get("source_prompt") or i
+        counts = clusters.setdefault(key, [0, 0])
+        counts[0] += verdict["verdict"] == "unsupported"
+        counts[1] += 1
+    return clustered_risk_interval([(u, n) for u, n in clusters.values()], confidence)
+
 
 def score_risk(state: dict) -> None:
-    """Read verdicts, compute risk score, write decision to state."""
+    """Read verdicts, compute risk score, write decision to state.
+
+    ``breakdown`` holds risk per category, prompt and evidence document with
+    bootstrap intervals (``scoring.bootstrap_samples``, ``scoring.confidence``,
+    ``scoring.seed``).
+    """
     verdicts = state["verdicts"]
     threshold = state["config"]["thresholds"]["reject"]
+    scoring = state["config"].get("scoring", {})
 
+    arrays = verdict_arrays(verdicts)
     total = len(verdicts)
-
-    if total == 0:
-        hallucination_risk = 0.0
-        unsupported_count = 0
-        weakly_count = 0
-        supported_count = 0
-    else:
-        unsupported_count = sum(1 for v in verdicts if v["verdict"] == "unsupported")
-        weakly_count = sum(1 for v in verdicts if v["verdict"] == "weakly_supported")
-        supported_count = total - unsupported_count - weakly_count
-        hallucination_risk = unsupported_count / total
+    unsupported_count = int(np.count_nonzero(arrays["unsupported"]))
+    weakly_count = int(np.count_nonzero(arrays["weakly_supported"]))
+    supported_count = total - unsupported_count - weakly_count
+    hallucination_risk = unsupported_count / total if total else 0.0
 
     reliability_score = 1 - hallucination_risk
+    adaptive = state["config"].get("evaluation", {}).get("adaptive")
+    if not isinstance(adaptive, dict):
+        adaptive = {}
+    low, high = risk_interval_by_prompt(verdicts, adaptive.get("confidence", DEFAULT_CONFIDENCE))
     decision = "approve" if hallucination_risk < threshold else "reject"
+    early_stop = state.get("early_stop")
+    if early_stop:
+        # Risk is estimated from the verified sample; the decision is the settled one.
+        decision = early_stop["decision"]
 
     state["score"] = {
         "hallucination_risk": round(hallucination_risk, 4),
@@ -30,4 +56,14 @@ def score_risk(state: dict) -> None:
         "supported": supported_count,
         "weakly_supported": weakly_count,
         "unsupported": unsupported_count,
+        "risk_interval": [round(low, 4), round(high, 4)],
+        "rounds": state.get("rounds", 1),
+        "breakdown": breakdowns(
+            arrays,
+            samples=scoring.get("bootstrap_samples", DEFAULT_BOOTSTRAP_SAMPLES),
+            confidence=scoring.get("confidence", DEFAULT_CONFIDENCE),
+            seed=scoring.get("seed"),
+        ),
     }
+    if early_stop:
+        state["score"]["early_stop"] = early_stop
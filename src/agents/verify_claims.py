@@ -1,8 +1,11 @@
 """verify_claims -- label each claim against retrieved evidence."""
 
+import random
 import re
 
-from src.wrappers.bedrock import call_llm
+from src.stats import looks, risk_interval, settled_decision
+from src.wrappers.bedrock import call_llm, model_route
+from src.wrappers.bedrock_batch import complete
 
 SYSTEM_PROMPT = (
     "You are an evidence verification assistant. Compare the given claim "
@@ -17,6 +20,11 @@ SYSTEM_PROMPT = (
     "JUSTIFICATION: <one sentence explanation>"
 )
 
+# The cascade's first tier also rates its own certainty, so unsure answers escalate.
+CASCADE_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT + "\nCONFIDENCE: <how certain you are of the label, from 0 to 1>"
+)
+
 VALID_LABELS = {"supported", "weakly_supported", "unsupported"}
 
 
@@ -44,6 +52,31 @@ def parse_verdict(response: str) -> tuple[str, str]:
     return (label, justification)
 
 
+def parse_confidence(response: str) -> float | None:
+    """Self-reported confidence from a ``CONFIDENCE:`` line, or None if absent."""
+    match = re.search(r"CONFIDENCE:\s*([0-9]*\.?[0-9]+)", response, re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+def first_tier_label(response: str, min_confidence: float) -> str | None:
+    """The first tier's label if it can stand, or None to escalate.
+
+    Escalates when the response does not parse, the label is
+    ``weakly_supported``, or the reported confidence is missing or below
+    ``min_confidence``.
+    """
+    label_match = re.search(r"LABEL:\s*(.+)", response, re.IGNORECASE)
+    if not label_match:
+        return None
+    label = label_match.group(1).strip().lower()
+    if label not in VALID_LABELS or label == "weakly_supported":
+        return None
+    confidence = parse_confidence(response)
+    if confidence is None or confidence < min_confidence:
+        return None
+    return label
+
+
 _CONFIDENCE_MAP = {
     "supported": 1.0,
     "weakly_supported": 0.5,
@@ -51,41 +84,145 @@ _CONFIDENCE_MAP = {
 }
 
 
-def verify_claims(state: dict) -> None:
-    """Verify each claim against its retrieved evidence documents."""
-    evidence_entries = state["evidence"]
-    verdicts = []
-
-    for entry in evidence_entries:
-        claim = entry["claim"]
-        documents = entry["documents"]
-
-        if not documents:
-            verdicts.append(
-                {
-                    "claim": claim["text"],
-                    "verdict": "unsupported",
-                    "evidence_snippet": "",
-                    "confidence": 0.0,
-                }
-            )
-            continue
-
-        evidence_text = "\n\n".join(doc["content"] for doc in documents)
-        prompt = f"Claim: {claim['text']}\n\nEvidence:\n{evidence_text}"
-
-        response = call_llm(prompt, system=SYSTEM_PROMPT)
+def _verdict(entry: dict, label: str, tier: str | None) -> dict:
+    claim = entry["claim"]
+    documents = entry["documents"]
+    return {
+        "claim": claim["text"],
+        "source_prompt": claim.get("source_prompt"),
+        "category": claim.get("category"),
+        "verdict": label,
+        "evidence_snippet": documents[0]["content"][:200] if documents else "",
+        "evidence_source": documents[0].get("source") if documents else None,
+        "confidence": _CONFIDENCE_MAP.get(label, 0.0),
+        "tier": tier,
+    }
+
+
+def _request(entry: dict, system: str, cache: bool) -> dict:
+    # Evidence goes first: claims backed by the same documents share it as a
+    # cacheable prefix, and only the claim differs between their calls.
+    evidence_text = "\n\n".join(doc["content"] for doc in entry["documents"])
+    return {
+        "prompt": f"Claim: {entry['claim']['text']}",
+        "system": system,
+        "prefix": f"Evidence:\n{evidence_text}\n\n",
+        "cache": cache,
+    }
+
+
+def _verify(entry: dict, route: dict, cache: bool = False) -> dict:
+    if not entry["documents"]:
+        return _verdict(entry, "unsupported", None)
+
+    label = None
+    tier = "fast"
+    if route["cascade"]:
+        response = call_llm(
+            **_request(entry, CASCADE_SYSTEM_PROMPT, cache), model_id=route["cascade"]
+        )
+        label = first_tier_label(response, route["min_confidence"])
+    if label is None:
+        response = call_llm(**_request(entry, SYSTEM_PROMPT, cache), model_id=route["model"])
         label, _justification = parse_verdict(response)
+        tier = "strong"
+
+    return _verdict(entry, label, tier)
+
+
+def _verify_batch(state: dict, batch: dict) -> None:
+    """Verify every claim through batch jobs: one for the cascade tier, one for escalations."""
+    config = state.get("config", {})
+    route = model_route(config, "verify_claims")
+    cache = bool(config.get("prompt_cache"))
+    entries = state["evidence"]
+
+    labels: dict[int, tuple[str, str]] = {}
+    pending = [i for i, entry in enumerate(entries) if entry["documents"]]
+    if route["cascade"] and pending:
+        requests = [_request(entries[i], CASCADE_SYSTEM_PROMPT, cache) for i in pending]
+        responses = complete(requests, route["cascade"], batch, "verify-fast")
+        for i, response in zip(pending, responses, strict=True):
+            label = first_tier_label(response, route["min_confidence"])
+            if label is not None:
+                labels[i] = (label, "fast")
+        pending = [i for i in pending if i not in labels]
+    if pending:
+        requests = [_request(entries[i], SYSTEM_PROMPT, cache) for i in pending]
+        responses = complete(requests, route["model"], batch, "verify")
+        for i, response in zip(pending, responses, strict=True):
+            labels[i] = (parse_verdict(response)[0], "strong")
+
+    state["verdicts"] = [
+        _verdict(entry, *labels[i]) if i in labels else _verdict(entry, "unsupported", None)
+        for i, entry in enumerate(entries)
+    ]
+
+
+def _verify_until_settled(state: dict, early_stop: dict) -> None:
+    """Verify claims in random order, stopping once the gate decision is settled.
+
+    At each look (``min_claims`` verified, then every ``check_every``) the
+    unsupported share of the verified sample gives a confidence interval for
+    the share among all claims.  The overall ``confidence`` is split evenly
+    across the looks (Bonferroni), so repeatedly checking does not inflate
+    the chance of stopping on the wrong decision.
+    """
+    entries = state["evidence"]
+    route = model_route(state["config"], "verify_claims")
+    cache = bool(state["config"].get("prompt_cache"))
+    total = len(entries)
+    threshold = state["config"]["thresholds"]["reject"]
+    confidence = early_stop.get("confidence", 0.95)
+    checkpoints = looks(total, early_stop.get("min_claims", 30), early_stop.get("check_every", 10))
+    look_confidence = 1 - (1 - confidence) / max(len(checkpoints), 1)
+
+    order = list(range(total))
+    random.Random(early_stop.get("seed")).shuffle(order)
+
+    verdicts: dict[int, dict] = {}
+    unsupported = 0
+    for i in order:
+        verdicts[i] = _verify(entries[i], route, cache)
+        unsupported += verdicts[i]["verdict"] == "unsupported"
+        if len(verdicts) not in checkpoints:
+            continue
+        interval = risk_interval(unsupported, len(verdicts), total, look_confidence)
+        decision = settled_decision(interval, threshold)
+        if decision:
+            state["early_stop"] = {
+                "decision": decision,
+                "confidence": confidence,
+                "claims_verified": len(verdicts),
+                "claims_skipped": total - len(verdicts),
+                "risk_interval": [round(interval[0], 4), round(interval[1], 4)],
+            }
+            break
 
-        snippet = documents[0]["content"][:200] if documents else ""
+    state["verdicts"] = [verdicts[i] for i in sorted(verdicts)]
 
-        verdicts.append(
-            {
-                "claim": claim["text"],
-                "verdict": label,
-                "evidence_snippet": snippet,
-                "confidence": _CONFIDENCE_MAP.get(label, 0.0),
-            }
-        )
 
-    state["verdicts"] = verdicts
+def verify_claims(state: dict) -> None:
+    """Verify each claim against its retrieved evidence documents.
+
+    With ``verification.early_stop`` configured, verification stops as soon
+    as the approve/reject decision is settled at the configured confidence.
+    With a ``models.verify_claims.cascade`` model, each claim goes to it
+    first and only escalates to the main model when its answer is unsure;
+    ``tier`` records which one decided (``fast`` or ``strong``).  With
+    ``prompt_cache``, the system prompt and evidence are cached prefixes.
+    With a ``batch`` block, the calls run as Bedrock batch jobs instead.
+    """
+    config = state.get("config", {})
+    early_stop = config.get("verification", {}).get("early_stop")
+    batch = config.get("batch")
+    if early_stop and batch:
+        raise ValueError("verification.early_stop can't be combined with batch inference.")
+    if batch:
+        _verify_batch(state, batch)
+    elif early_stop:
+        _verify_until_settled(state, early_stop if isinstance(early_stop, dict) else {})
+    else:
+        route = model_route(config, "verify_claims")
+        cache = bool(config.get("prompt_cache"))
+        state["verdicts"] = [_verify(entry, route, cache) for entry in state["evidence"]]
@@ -1,19 +1,29 @@
 """FastAPI backend for the LLM Reliability Gate."""
 
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from scalar_fastapi import get_scalar_api_reference
+from starlette.concurrency import run_in_threadpool
 
 from src.config.loader import load_config
 from src.orchestrator import build_response, run_workflow
-from src.wrappers.elasticsearch_helper import index_doc
+from src.wrappers.elasticsearch_async import close_client, index_doc
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="LLM Reliability Gate", docs_url=None)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    await close_client()
+
+
+app = FastAPI(title="LLM Reliability Gate", docs_url=None, lifespan=lifespan)
 
 
 @app.get("/docs", include_in_schema=False)
@@ -39,6 +49,12 @@ class EvaluateResponse(BaseModel):
     reliability_score: float
     decision: str
     claims: list[dict]
+    risk_interval: list[float] | None = None
+    rounds: int = 1
+    breakdown: dict | None = None
+    early_stop: dict | None = None
+    usage: dict | None = None
+    prompt_bank: dict | None = None
 
 
 @app.exception_handler(ValueError)
@@ -55,12 +71,14 @@ async def file_not_found_handler(request: Request, exc: FileNotFoundError) -> JS
 async def evaluate(request: EvaluateRequest) -> EvaluateResponse:
     config = load_config(request.config_path)
     state = {"config": config}
-    run_workflow(state)
+    # The agents make blocking Bedrock and Elasticsearch calls; running them in
+    # a worker thread keeps the event loop free for concurrent requests.
+    await run_in_threadpool(run_workflow, state)
     result = build_response(state)
 
     logger.info("run_id=%s Evaluation complete, decision=%s", result["run_id"], result["decision"])
 
-    index_doc("runs", result["run_id"], result)
+    await index_doc("runs", result["run_id"], result)
 
     return EvaluateResponse(**result)
 
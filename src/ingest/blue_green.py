@@ -0,0 +1,84 @@
+"""blue_green -- build each ingest into a fresh index generation behind an alias.
+
+Evaluations query ``elasticsearch.index``.  With blue/green ingest that name
+is an alias: each run builds ``<alias>-v<N>``, seeds it with a server-side
+copy of the live generation (so incremental ingest still only embeds new
+content), loads and optimises it, and then atomically repoints the alias.
+Readers never see a half-loaded or unmerged index.
+"""
+
+import logging
+import re
+
+from src.wrappers.elasticsearch_helper import (
+    alias_target,
+    copy_index,
+    create_index,
+    delete_index,
+    get_mappings,
+    list_indices,
+    swap_alias,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP = 1
+
+
+def generation_number(alias: str, index: str) -> int | None:
+    """Parse N from ``<alias>-v<N>``, or None if index is not a generation of alias."""
+    match = re.fullmatch(re.escape(alias) + r"-v(\d+)", index)
+    return int(match.group(1)) if match else None
+
+
+def _generations(alias: str) -> list[str]:
+    names = [name for name in list_indices(f"{alias}-v*") if generation_number(alias, name)]
+    return sorted(names, key=lambda name: generation_number(alias, name) or 0)
+
+
+def create_generation(alias: str) -> dict:
+    """Create the next, empty generation index for alias.
+
+    The live index is whatever the alias points to.  If ``alias`` is still a
+    plain index from before blue/green ingest was enabled, that index is the
+    live one and is replaced by the alias when the generation is published.
+    """
+    live = alias_target(alias)
+    generations = _generations(alias)
+    number = (generation_number(alias, generations[-1]) or 0) + 1 if generations else 1
+    index = f"{alias}-v{number}"
+
+    create_index(index, get_mappings(live) if live else None)
+    logger.info("Created index generation %s (live: %s)", index, live)
+    return {"alias": alias, "index": index, "previous": live}
+
+
+def is_live(generation: dict) -> bool:
+    """True if the alias already points at this generation."""
+    return bool(alias_target(generation["alias"]) == generation["index"])
+
+
+def seed_generation(generation: dict) -> None:
+    """Copy every document from the live index into the new generation."""
+    if generation["previous"]:
+        copy_index(generation["previous"], generation["index"])
+
+
+def publish_generation(generation: dict) -> None:
+    """Atomically point the alias at the new generation."""
+    swap_alias(generation["alias"], generation["index"], generation["previous"])
+    logger.info("Alias %s now points at %s", generation["alias"], generation["index"])
+
+
+def abandon_generation(generation: dict) -> None:
+    """Delete a generation that failed before it was published."""
+    delete_index(generation["index"])
+
+
+def cleanup_generations(alias: str, live: str, keep: int = DEFAULT_KEEP) -> list[str]:
+    """Delete all but the ``keep`` most recent generations older than live."""
+    older = [name for name in _generations(alias) if name != live]
+    doomed = older[: max(len(older) - keep, 0)]
+    for name in doomed:
+        delete_index(name)
+    return doomed
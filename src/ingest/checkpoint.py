@@ -0,0 +1,139 @@
+"""checkpoint -- durable per-file progress for resumable ingest runs.
+
+The journal is a JSONL file.  Its first line is a header naming the index
+being loaded (and the unpublished blue/green generation, if any); every
+further line records one file as ``done`` (with its manifest entry) or
+``failed`` (with the error), or that the generation has been ``seeded``
+from the live index.  A resumed run skips done files, retries failed ones,
+and seeds the generation again unless it was recorded as seeded.
+
+Because chunks from many files share the embedding and bulk stages, a file
+is only done once every chunk it produced has been flushed to, or found in,
+the index.  ``progress`` tracks that: which chunk ids each file still waits
+for, and which files wait on each chunk id.
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+def start_journal(
+    path: str,
+    target: str,
+    generation: dict | None,
+    done: dict | None = None,
+    seeded: bool = False,
+) -> None:
+    """Rewrite the journal with a new header, carrying over already-done files."""
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"target": target, "generation": generation}) + "\n")
+        if seeded:
+            fh.write(json.dumps({"seeded": True}) + "\n")
+        for done_path, entry in (done or {}).items():
+            fh.write(json.dumps({"path": done_path, "entry": entry}) + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def read_journal(path: str) -> dict:
+    """Return the header plus the latest done/failed record for each file.
+
+    A record for a file supersedes earlier records for it, so a file that
+    failed and then succeeded on a retry is done.  A truncated last line
+    (crash mid-write) is ignored.
+    """
+    journal: dict = {"header": None, "done": {}, "failed": {}, "seeded": False}
+    file_path = Path(path)
+    if not file_path.exists():
+        return journal
+
+    with open(file_path, encoding="utf-8") as fh:
+        for number, line in enumerate(fh):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if number == 0:
+                journal["header"] = record
+            elif "seeded" in record:
+                journal["seeded"] = True
+            elif "entry" in record:
+                journal["failed"].pop(record["path"], None)
+                journal["done"][record["path"]] = record["entry"]
+            else:
+                journal["done"].pop(record["path"], None)
+                journal["failed"][record["path"]] = record["error"]
+    return journal
+
+
+def append_record(path: str, record: dict) -> None:
+    """Append one record and flush it to disk before returning."""
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def new_progress() -> dict:
+    return {"pending": {}, "waiting": {}, "settled": set(), "read": set(), "failed": set()}
+
+
+def _maybe_done(progress: dict, path: str) -> list[str]:
+    if (
+        path in progress["read"]
+        and path not in progress["failed"]
+        and not progress["pending"][path]
+    ):
+        del progress["pending"][path]
+        return [path]
+    return []
+
+
+def track_chunk(progress: dict, path: str, doc_id: str) -> None:
+    """Record that path needs doc_id to be indexed before it is done."""
+    progress["pending"].setdefault(path, set())
+    if doc_id not in progress["settled"]:
+        progress["pending"][path].add(doc_id)
+        progress["waiting"].setdefault(doc_id, set()).add(path)
+
+
+def file_read(progress: dict, path: str) -> list[str]:
+    """Mark path as fully chunked; returns [path] if nothing is outstanding."""
+    if path in progress["failed"]:
+        return []
+    progress["pending"].setdefault(path, set())
+    progress["read"].add(path)
+    return _maybe_done(progress, path)
+
+
+def settle(progress: dict, doc_ids: list[str]) -> list[str]:
+    """Mark chunk ids as indexed; returns the files that are now done."""
+    done = []
+    for doc_id in doc_ids:
+        progress["settled"].add(doc_id)
+        for path in sorted(progress["waiting"].pop(doc_id, set())):
+            progress["pending"].get(path, set()).discard(doc_id)
+            done.extend(_maybe_done(progress, path))
+    return done
+
+
+def fail_file(progress: dict, path: str) -> bool:
+    """Mark path as failed; returns False if it had already failed."""
+    if path in progress["failed"]:
+        return False
+    progress["failed"].add(path)
+    progress["pending"].pop(path, None)
+    return True
+
+
+def fail_chunks(progress: dict, doc_ids: list[str]) -> list[str]:
+    """Fail every file waiting on the given chunk ids; returns newly failed files."""
+    failed = []
+    for doc_id in doc_ids:
+        for path in sorted(progress["waiting"].pop(doc_id, set())):
+            if fail_file(progress, path):
+                failed.append(path)
+    return failed
@@ -0,0 +1,84 @@
+"""content_chunking -- content-defined chunk boundaries that survive document edits.
+
+Fixed word offsets shift every later boundary when text is inserted near the
+top of a document.  Here a boundary is chosen by a rolling hash over the most
+recent words, so it depends only on local content: after an edit, boundaries
+fall back into step within a chunk or two and the chunks further down keep
+their content (and therefore their sha256 doc ids).
+"""
+
+import zlib
+from collections.abc import Iterable, Iterator
+
+DEFAULT_MIN_WORDS = 200
+DEFAULT_AVG_WORDS = 500
+DEFAULT_MAX_WORDS = 1000
+
+_HASH_MASK = 0xFFFFFFFF
+_SENTENCE_ENDINGS = (".", "!", "?")
+_TRAILING_PUNCTUATION = "\"')]"
+
+
+def is_sentence_end(word: str) -> bool:
+    """True if the word closes a sentence, ignoring trailing quotes/brackets."""
+    return word.rstrip(_TRAILING_PUNCTUATION).endswith(_SENTENCE_ENDINGS)
+
+
+def _word_hash(word: str) -> int:
+    # crc32 is stable across processes, unlike the salted builtin hash().
+    return zlib.crc32(word.encode("utf-8"))
+
+
+def iter_content_defined_chunks(
+    words: Iterable[str],
+    min_words: int = DEFAULT_MIN_WORDS,
+    avg_words: int = DEFAULT_AVG_WORDS,
+    max_words: int = DEFAULT_MAX_WORDS,
+) -> Iterator[str]:
+    """Yield chunks whose boundaries are defined by content, not offsets.
+
+    A gear-style rolling hash (shift-and-add over 32 bits, so it only
+    remembers the last 32 words) arms a cut once at least ``min_words`` words
+    have accumulated and ``hash % (avg_words - min_words) == 0``.  An armed
+    cut is snapped forward to the next sentence end.  A chunk that reaches
+    ``max_words`` is cut at its last sentence end past ``min_words``, or hard
+    at ``max_words`` if there is none.
+
+    Cleaning collapses paragraph breaks into single spaces, so sentence ends
+    are the finest structural boundary available at this stage.
+    """
+    if not 0 < min_words < avg_words <= max_words:
+        raise ValueError("Chunk sizes must satisfy 0 < min_words < avg_words <= max_words")
+
+    divisor = avg_words - min_words
+    window: list[str] = []
+    rolling = 0
+    armed = False
+    last_sentence_end = 0
+
+    for word in words:
+        window.append(word)
+        rolling = ((rolling << 1) + _word_hash(word)) & _HASH_MASK
+        sentence_end = is_sentence_end(word)
+        if sentence_end:
+            last_sentence_end = len(window)
+
+        if len(window) >= min_words and rolling % divisor == 0:
+            armed = True
+
+        if armed and sentence_end:
+            yield " ".join(window)
+            window = []
+            armed = False
+            last_sentence_end = 0
+        elif len(window) >= max_words:
+            cut = last_sentence_end if last_sentence_end >= min_words else len(window)
+            yield " ".join(window[:cut])
+            window = window[cut:]
+            armed = False
+            last_sentence_end = max(
+                (i + 1 for i, w in enumerate(window) if is_sentence_end(w)), default=0
+            )
+
+    if window:
+        yield " ".join(window)
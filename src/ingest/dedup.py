@@ -0,0 +1,94 @@
+"""dedup -- MinHash/LSH near-duplicate detection for ingested chunks."""
+
+import random
+import zlib
+from functools import cache
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+@cache
+def _permutations(num_perm: int) -> list[tuple[int, int]]:
+    # Fixed seed so signatures are comparable across runs and processes.
+    rng = random.Random(0x5EED)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> set[int]:
+    """Hashed word n-grams of a chunk (the whole chunk if it is shorter than n)."""
+    words = text.lower().split()
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash_signature(
+    text: str, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE
+) -> tuple[int, ...]:
+    """MinHash signature: the minimum of each universal hash over the shingles."""
+    hashed = shingles(text, shingle_size)
+    return tuple(
+        min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashed) for a, b in _permutations(num_perm)
+    )
+
+
+def estimated_jaccard(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Fraction of agreeing signature positions -- an unbiased Jaccard estimate."""
+    return sum(1 for a, b in zip(sig_a, sig_b, strict=True) if a == b) / len(sig_a)
+
+
+def new_lsh_index(config: dict | None = None) -> dict:
+    """Create an empty LSH index from the ``ingest.dedup`` config block."""
+    config = config or {}
+    num_perm = config.get("num_perm", DEFAULT_NUM_PERM)
+    bands = config.get("bands", DEFAULT_BANDS)
+    if num_perm % bands:
+        raise ValueError("dedup.num_perm must be a multiple of dedup.bands")
+    return {
+        "threshold": config.get("threshold", DEFAULT_THRESHOLD),
+        "num_perm": num_perm,
+        "bands": bands,
+        "shingle_size": config.get("shingle_size", DEFAULT_SHINGLE_SIZE),
+        "buckets": [{} for _ in range(bands)],
+        "signatures": {},
+    }
+
+
+def _band_keys(lsh: dict, signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+    rows = lsh["num_perm"] // lsh["bands"]
+    return [signature[i * rows : (i + 1) * rows] for i in range(lsh["bands"])]
+
+
+def find_or_add(lsh: dict, doc_id: str, text: str) -> str | None:
+    """Return the id of an indexed near-duplicate of text, or add text and return None.
+
+    Banding only proposes candidates; a candidate is accepted when its
+    estimated Jaccard similarity reaches the configured threshold.
+    """
+    signature = minhash_signature(text, lsh["num_perm"], lsh["shingle_size"])
+    keys = _band_keys(lsh, signature)
+
+    candidates: list[str] = []
+    for bucket, key in zip(lsh["buckets"], keys, strict=True):
+        for candidate in bucket.get(key, []):
+            if candidate not in candidates:
+                candidates.append(candidate)
+
+    for candidate in candidates:
+        similarity = estimated_jaccard(signature, lsh["signatures"][candidate])
+        if similarity >= lsh["threshold"]:
+            return candidate
+
+    lsh["signatures"][doc_id] = signature
+    for bucket, key in zip(lsh["buckets"], keys, strict=True):
+        bucket.setdefault(key, []).append(doc_id)
+    return None
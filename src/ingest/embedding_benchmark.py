@@ -0,0 +1,146 @@
+"""embedding_benchmark -- recall and latency of reduced embedding dimensions on our corpus.
+
+Samples chunks from the configured ``doc_sources``, embeds them at each
+candidate dimension, and ranks a held-out set of query chunks against them
+by exact (brute-force) similarity.  Recall@k is measured against the
+ranking at the largest dimension, so it shows how much neighbourhood
+structure a smaller vector loses; latencies show what it saves.
+
+    python -m src.ingest.embedding_benchmark --config .llm-reliability.yaml \\
+        --dimensions 256 512 1024 --sample 500 --queries 50
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.config.loader import load_config
+from src.ingest.pipeline import (
+    DEFAULT_EMBED_CONCURRENCY,
+    discover_documents,
+    iter_file_chunks,
+)
+from src.wrappers.bedrock import embed
+
+DEFAULT_DIMENSIONS = (256, 512, 1024)
+DEFAULT_SAMPLE = 500
+DEFAULT_QUERIES = 50
+DEFAULT_K = 5
+_SEARCH_REPEATS = 20
+
+
+def sample_chunks(config: dict, size: int, seed: int = 0) -> list[str]:
+    """Reservoir-sample ``size`` chunks from every document in ``doc_sources``."""
+    rng = random.Random(seed)
+    chunking = config.get("ingest", {}).get("chunking", {})
+    sample: list[str] = []
+    seen = 0
+    for path, _, _ in discover_documents(config["doc_sources"]):
+        for chunk in iter_file_chunks(path, chunking):
+            seen += 1
+            if len(sample) < size:
+                sample.append(chunk)
+            else:
+                slot = rng.randrange(seen)
+                if slot < size:
+                    sample[slot] = chunk
+    return sample
+
+
+def embed_matrix(
+    texts: list[str],
+    dimensions: int,
+    normalize: bool = True,
+    concurrency: int = DEFAULT_EMBED_CONCURRENCY,
+) -> tuple[np.ndarray, float]:
+    """Embed texts as rows of a float32 matrix; also return wall time per text."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        vectors = list(
+            pool.map(lambda text: embed(text, dimensions=dimensions, normalize=normalize), texts)
+        )
+    elapsed = time.perf_counter() - started
+    return np.asarray(vectors, dtype=np.float32), elapsed / max(len(texts), 1)
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k most cosine-similar corpus rows for each query, best first."""
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1)
+    return np.take_along_axis(best, order, axis=1)
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    """Mean fraction of each query's true top-k that was found."""
+    hits = [len(set(t) & set(f)) / len(t) for t, f in zip(truth, found, strict=True)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def run_benchmark(
+    config_path: str,
+    dimensions: list[int],
+    sample: int = DEFAULT_SAMPLE,
+    queries: int = DEFAULT_QUERIES,
+    k: int = DEFAULT_K,
+    seed: int = 0,
+) -> list[dict]:
+    """Return one row per dimension, largest first (the recall reference)."""
+    config = load_config(config_path)
+    normalize = config.get("embedding", {}).get("normalize", True)
+    concurrency = config.get("ingest", {}).get("embed_concurrency", DEFAULT_EMBED_CONCURRENCY)
+
+    chunks = sample_chunks(config, sample + queries, seed)
+    if len(chunks) <= queries:
+        raise ValueError(f"Need more than {queries} chunks to benchmark, found {len(chunks)}.")
+    query_texts, corpus_texts = chunks[:queries], chunks[queries:]
+
+    rows = []
+    truth = None
+    for dims in sorted(dimensions, reverse=True):
+        corpus, embed_seconds = embed_matrix(corpus_texts, dims, normalize, concurrency)
+        query_vectors, _ = embed_matrix(query_texts, dims, normalize, concurrency)
+
+        started = time.perf_counter()
+        for _ in range(_SEARCH_REPEATS):
+            found = top_k(corpus, query_vectors, k)
+        search_seconds = (time.perf_counter() - started) / (_SEARCH_REPEATS * queries)
+
+        if truth is None:
+            truth = found
+        rows.append(
+            {
+                "dimensions": dims,
+                "recall_at_k": round(recall_at_k(truth, found), 4),
+                "embed_ms": round(embed_seconds * 1000, 2),
+                "search_us": round(search_seconds * 1e6, 2),
+                "bytes_per_vector": corpus.shape[1] * corpus.itemsize,
+            }
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedding dimensions.")
+    parser.add_argument("--config", default=".llm-reliability.yaml", help="Path to config file.")
+    parser.add_argument(
+        "--dimensions", type=int, nargs="+", default=list(DEFAULT_DIMENSIONS), help="Sizes to try."
+    )
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE, help="Corpus chunks.")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="Query chunks.")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbours per query.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.config, args.dimensions, args.sample, args.queries, args.k)
+    print(f"{'dims':>6} {'recall@k':>9} {'embed ms':>9} {'search us':>10} {'bytes':>7}")
+    for row in results:
+        print(
+            f"{row['dimensions']:>6} {row['recall_at_k']:>9.4f} {row['embed_ms']:>9.2f} "
+            f"{row['search_us']:>10.2f} {row['bytes_per_vector']:>7}"
+        )
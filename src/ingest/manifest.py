@@ -0,0 +1,77 @@
+"""manifest -- record of ingested source files and the chunk ids they produced."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+_READ_BLOCK_SIZE = 1 << 20
+
+
+def empty_manifest(index: str) -> dict:
+    """Return a manifest with no recorded files for the given index."""
+    return {"version": MANIFEST_VERSION, "index": index, "files": {}}
+
+
+def load_manifest(path: str, index: str) -> dict:
+    """Load the manifest at path.
+
+    Returns an empty manifest if the file does not exist, was written by a
+    different manifest version, or records a different index -- in all of
+    those cases nothing in it can be trusted to describe the target index.
+    """
+    file_path = Path(path)
+    if not file_path.exists():
+        return empty_manifest(index)
+
+    with open(file_path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("index") != index:
+        return empty_manifest(index)
+    return manifest  # type: ignore[no-any-return]
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    """Write the manifest atomically so an interrupted run never truncates it."""
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, file_path)
+
+
+def file_fingerprint(path: Path) -> dict:
+    """Return the size and sha256 content hash of a file, read in blocks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as fh:
+        while block := fh.read(_READ_BLOCK_SIZE):
+            digest.update(block)
+            size += len(block)
+    return {"sha256": digest.hexdigest(), "size": size}
+
+
+def is_unchanged(entry: dict | None, fingerprint: dict) -> bool:
+    """True if a manifest entry matches the document's current fingerprint.
+
+    Local files are fingerprinted by size and sha256, S3 objects by size and
+    ETag; every field of the fingerprint must match.
+    """
+    if not entry:
+        return False
+    return all(entry.get(field) == value for field, value in fingerprint.items())
+
+
+def stale_chunk_ids(previous: dict, current: dict) -> set[str]:
+    """Chunk ids recorded in previous file entries that no current file produces.
+
+    Chunk ids are content hashes, so the same id can be shared by several
+    files; an id is only stale once no file in the current run references it.
+    """
+    old_ids = {cid for entry in previous.values() for cid in entry.get("chunk_ids", [])}
+    live_ids = {cid for entry in current.values() for cid in entry.get("chunk_ids", [])}
+    return old_ids - live_ids
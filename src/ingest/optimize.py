@@ -0,0 +1,67 @@
+"""optimize -- bulk-load index settings and post-ingest finalisation."""
+
+import logging
+import time
+
+from src.wrappers.elasticsearch_helper import (
+    force_merge,
+    get_index_settings,
+    put_index_settings,
+    refresh_index,
+    vector_search,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_NUM_SEGMENTS = 1
+
+_BULK_LOAD_SETTINGS = {"index.refresh_interval": "-1", "index.number_of_replicas": 0}
+
+
+def begin_bulk_load(index: str) -> dict | None:
+    """Disable refresh and replicas for a bulk load, returning the settings to restore.
+
+    Returns None when the index does not exist yet; it will be created by the
+    first bulk request with default settings, so there is nothing to restore.
+    """
+    current = get_index_settings(index)
+    if current is None:
+        return None
+    saved = {key: current.get(key) for key in _BULK_LOAD_SETTINGS}
+    put_index_settings(index, _BULK_LOAD_SETTINGS)
+    return saved
+
+
+def end_bulk_load(index: str, saved: dict | None) -> None:
+    """Restore the settings captured by begin_bulk_load (None resets to default)."""
+    if saved is not None:
+        put_index_settings(index, saved)
+
+
+def finalize_index(index: str, config: dict, embedding: dict | None = None) -> dict:
+    """Refresh, force-merge, and optionally warm the index; return timings in seconds.
+
+    ``config`` is the ``ingest.optimize`` block: ``max_num_segments`` (default
+    1) and ``warmup_queries``, a list of query strings run through
+    ``vector_search`` so the HNSW graph is loaded before the first evaluation.
+    ``embedding`` holds the embed options the index was built with.
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    refresh_index(index)
+    timings["refresh"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    force_merge(index, config.get("max_num_segments", DEFAULT_MAX_NUM_SEGMENTS))
+    timings["force_merge"] = time.perf_counter() - started
+
+    warmup_queries = config.get("warmup_queries", [])
+    if warmup_queries:
+        started = time.perf_counter()
+        for query in warmup_queries:
+            vector_search(query, index=index, **(embedding or {}))
+        timings["warmup"] = time.perf_counter() - started
+
+    logger.info("Finalised index %s: %s", index, timings)
+    return {name: round(seconds, 3) for name, seconds in timings.items()}
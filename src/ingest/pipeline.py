@@ -2,54 +2,240 @@
 
 import argparse
 import hashlib
+import logging
 import re
-from pathlib import Path
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import TextIO
 
 from src.config.loader import load_config
-from src.wrappers.bedrock import embed
-from src.wrappers.elasticsearch_helper import index_doc
+from src.ingest.blue_green import (
+    DEFAULT_KEEP,
+    abandon_generation,
+    cleanup_generations,
+    create_generation,
+    is_live,
+    publish_generation,
+    seed_generation,
+)
+from src.ingest.checkpoint import (
+    append_record,
+    fail_chunks,
+    fail_file,
+    file_read,
+    new_progress,
+    read_journal,
+    settle,
+    start_journal,
+    track_chunk,
+)
+from src.ingest.content_chunking import (
+    DEFAULT_AVG_WORDS,
+    DEFAULT_MAX_WORDS,
+    DEFAULT_MIN_WORDS,
+    iter_content_defined_chunks,
+)
+from src.ingest.dedup import find_or_add, new_lsh_index
+from src.ingest.manifest import (
+    empty_manifest,
+    file_fingerprint,
+    is_unchanged,
+    load_manifest,
+    save_manifest,
+    stale_chunk_ids,
+)
+from src.ingest.optimize import begin_bulk_load, end_bulk_load, finalize_index
+from src.ingest.s3_source import is_s3_uri, iter_object_text, list_documents
+from src.ingest.snapshot import export_snapshot
+from src.wrappers.bedrock import embed, embedding_options
+from src.wrappers.elasticsearch_helper import (
+    bulk_add_values,
+    bulk_delete,
+    bulk_index,
+    bump_generation,
+    ensure_index,
+    existing_ids,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 1
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_EMBED_CONCURRENCY = 4
+READ_BLOCK_CHARS = 1 << 16
+# A "<" with no ">" within this many characters is taken as literal text.
+MAX_TAG_CHARS = 4096
+CHUNKING_STRATEGIES = ("fixed", "content_defined")
+
+# Metadata fields are keywords so retrieval can filter on them exactly; the
+# embedding is left to dynamic mapping (dense_vector with inferred dims).
+CHUNK_MAPPINGS = {
+    "properties": {
+        "source": {"type": "keyword"},
+        "position": {"type": "integer"},
+        "doc_type": {"type": "keyword"},
+        "tags": {"type": "keyword"},
+    }
+}
+
+
+def chunk_mappings(embedding: dict) -> dict:
+    """CHUNK_MAPPINGS, plus an explicit dense_vector field when dimensions are configured.
+
+    Normalised vectors are compared with ``dot_product``, which skips the
+    per-comparison norm computation that ``cosine`` needs.
+    """
+    if "dimensions" not in embedding:
+        return CHUNK_MAPPINGS
+    vector = {
+        "type": "dense_vector",
+        "dims": embedding["dimensions"],
+        "index": True,
+        "similarity": "dot_product" if embedding.get("normalize", True) else "cosine",
+    }
+    return {"properties": {**CHUNK_MAPPINGS["properties"], "embedding": vector}}
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
 
 
 def clean_text(raw: str) -> str:
     """Strip HTML tags and normalize whitespace."""
-    text = re.sub(r"<[^>]+>", "", raw)
+    text = _TAG_RE.sub("", raw)
     text = re.sub(r"\s+", " ", text)
     return text.strip()
 
 
 def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
     """Split text into word-level chunks with overlap."""
-    words = text.split()
-    if not words:
-        return []
+    return list(iter_chunks(text.split(), chunk_size, overlap))
 
-    chunks = []
-    start = 0
-    while start < len(words):
-        end = start + chunk_size
-        chunk = " ".join(words[start:end])
-        chunks.append(chunk)
-        if end >= len(words):
-            break
-        start = end - overlap
 
-    return chunks
+def iter_clean_words(stream: TextIO, block_size: int = READ_BLOCK_CHARS) -> Iterator[str]:
+    """Yield the words of ``clean_text(stream.read())`` while reading in blocks."""
+    return iter_clean_block_words(iter(partial(stream.read, block_size), ""))
 
 
-def run_ingest(config_path: str) -> dict:
-    """Read, clean, chunk, embed, and index trusted documents."""
-    config = load_config(config_path)
-    index = config["elasticsearch"]["index"]
-    sources = config["doc_sources"]
+def iter_clean_block_words(blocks: Iterable[str]) -> Iterator[str]:
+    """Yield the words of ``clean_text("".join(blocks))`` one block at a time.
+
+    Each block has its tags stripped and is split on whitespace in a single
+    pass.  Two things are carried over to the next block: a trailing word
+    that may continue past the block boundary, and any text from the first
+    ``<`` after the last ``>`` onwards, since it may be the start of a tag
+    whose ``>`` has not been read yet.
+
+    A pending tag is held back for at most ``MAX_TAG_CHARS`` characters;
+    past that its ``<`` is literal text, so a stray ``<`` cannot make the
+    carry grow with the file.  This is the one case where the words differ
+    from ``clean_text``: a ``>`` arriving later does not strip the text in
+    between.
+    """
+    carry = ""
+    for block in blocks:
+        text = carry + block
+        open_tag = text.find("<", text.rfind(">") + 1)
+        while open_tag != -1 and len(text) - open_tag > MAX_TAG_CHARS:
+            open_tag = text.find("<", open_tag + 1)
+        pending_tag = ""
+        if open_tag != -1:
+            text, pending_tag = text[:open_tag], text[open_tag:]
+
+        stripped = _TAG_RE.sub("", text)
+        words = stripped.split()
+        trailing_word = ""
+        if words and not stripped[-1].isspace():
+            trailing_word = words.pop()
+        yield from words
+        carry = trailing_word + pending_tag
+
+    yield from _TAG_RE.sub("", carry).split()
+
+
+def iter_chunks(words: Iterable[str], chunk_size: int = 500, overlap: int = 50) -> Iterator[str]:
+    """Lazily yield the same chunks as ``chunk_text`` from a stream of words.
+
+    Only the current window of ``chunk_size`` words is held in memory.
+    """
+    window: list[str] = []
+    fresh = 0
+    for word in words:
+        window.append(word)
+        fresh += 1
+        if len(window) == chunk_size:
+            yield " ".join(window)
+            window = window[chunk_size - overlap :]
+            fresh = 0
+    if fresh:
+        yield " ".join(window)
+
+
+def chunk_words(words: Iterable[str], chunking: dict | None = None) -> Iterator[str]:
+    """Chunk a word stream with the strategy from the ``ingest.chunking`` config.
+
+    ``fixed`` (the default) uses ``chunk_size``/``overlap`` word offsets.
+    ``content_defined`` uses ``min_words``/``avg_words``/``max_words`` and
+    places boundaries by content, so an edit only changes nearby chunks.
+    """
+    chunking = chunking or {}
+    strategy = chunking.get("strategy", "fixed")
+    if strategy == "fixed":
+        return iter_chunks(words, chunking.get("chunk_size", 500), chunking.get("overlap", 50))
+    if strategy == "content_defined":
+        return iter_content_defined_chunks(
+            words,
+            min_words=chunking.get("min_words", DEFAULT_MIN_WORDS),
+            avg_words=chunking.get("avg_words", DEFAULT_AVG_WORDS),
+            max_words=chunking.get("max_words", DEFAULT_MAX_WORDS),
+        )
+    raise ValueError(f"Unknown chunking strategy: {strategy}")
+
 
-    documents_processed = 0
-    chunks_indexed = 0
+def iter_file_chunks(path: str, chunking: dict | None = None) -> Iterator[str]:
+    """Stream a local file or S3 object into chunks with memory bounded by chunk size."""
+    if is_s3_uri(path):
+        yield from chunk_words(iter_clean_block_words(iter_object_text(path)), chunking)
+        return
+    with open(path, encoding="utf-8") as fh:
+        yield from chunk_words(iter_clean_words(fh), chunking)
 
+
+def prepare_document(path: str, chunking: dict | None = None) -> list[str]:
+    """Read, clean, and chunk one file.  Runs inside a worker process."""
+    return list(iter_file_chunks(path, chunking))
+
+
+def document_metadata(path: str, source: dict) -> dict:
+    """Metadata stored with every chunk of a document, for filtered retrieval.
+
+    ``doc_type`` and ``tags`` come from the document's ``doc_sources`` entry;
+    ``doc_type`` defaults to the file extension.
+    """
+    return {
+        "source": path,
+        "doc_type": source.get("doc_type", PurePosixPath(path).suffix.lstrip(".")),
+        "tags": list(source.get("tags", [])),
+    }
+
+
+def discover_documents(sources: list[dict]) -> Iterator[tuple[str, dict | None, dict]]:
+    """Yield (path, fingerprint, source) for every .txt/.md document in the sources.
+
+    Local files are yielded in sorted order with no fingerprint (it is hashed
+    only when a manifest needs it).  S3 objects are yielded as ``s3://`` URIs
+    in key order, fingerprinted by the ETag from the listing.
+    """
     for source in sources:
         source_type = source.get("type", "")
 
         if source_type == "s3":
-            raise NotImplementedError("S3 source type is not yet supported.")
+            for uri, fingerprint in list_documents(source):
+                yield uri, fingerprint, source
+            continue
 
         if source_type != "local":
             raise ValueError(f"Unknown source type: {source_type}")
@@ -59,26 +245,482 @@ def run_ingest(config_path: str) -> dict:
             raise FileNotFoundError(f"Source path not found: {source['path']}")
 
         files = list(source_path.rglob("*.txt")) + list(source_path.rglob("*.md"))
-
         for file_path in sorted(files):
-            raw = file_path.read_text(encoding="utf-8")
-            cleaned = clean_text(raw)
-            chunks = chunk_text(cleaned)
-            documents_processed += 1
+            yield str(file_path), None, source
+
+
+def _future_chunks(future: Future) -> Iterator[str]:
+    yield from future.result()
+
+
+def _prepared_documents(
+    paths: list[str], workers: int, chunking: dict | None = None
+) -> Iterator[tuple[str, Iterable[str]]]:
+    """Yield (path, chunks) in input order.
+
+    With a single worker, each file's chunks are streamed lazily.  With more,
+    files are cleaned and chunked in a process pool and each file's chunks
+    come back as one list.  At most ``2 * workers`` files are in flight, so a
+    slow consumer holds back reading instead of letting prepared chunks pile
+    up in memory.  Errors reading a file surface when its chunks are iterated.
+    """
+    if workers <= 1:
+        for path in paths:
+            yield path, iter_file_chunks(path, chunking)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[tuple[str, Future]] = deque()
+        for path in paths:
+            pending.append((path, pool.submit(prepare_document, path, chunking)))
+            if len(pending) >= 2 * workers:
+                done_path, future = pending.popleft()
+                yield done_path, _future_chunks(future)
+        while pending:
+            done_path, future = pending.popleft()
+            yield done_path, _future_chunks(future)
+
+
+def chunk_id(chunk: str) -> str:
+    """Content-addressed doc id for a chunk."""
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _new_chunks(
+    chunks: Iterable[tuple[str, str, dict]],
+    index: str,
+    batch_size: int,
+    stats: dict,
+    on_indexed: Callable[[list[str]], None],
+    on_failed: Callable[[list[str], Exception], None],
+    seen: set[str],
+) -> Iterator[tuple[str, str, dict]]:
+    """Drop (doc_id, chunk, metadata) that are already indexed or already seen this run.
+
+    Candidates are checked against the index in batches of ``batch_size`` ids,
+    so repeated boilerplate and unchanged content never reach the embedder.
+    Ids found in the index are passed to ``on_indexed``; a batch whose check
+    failed is passed to ``on_failed`` and dropped.  ``seen`` holds the
+    ids passed on so far; the caller removes ids that failed so a later
+    repeat is tried again.
+    """
+    candidates: list[tuple[str, str, dict]] = []
+
+    def flush() -> Iterator[tuple[str, str, dict]]:
+        doc_ids = [doc_id for doc_id, _, _ in candidates]
+        try:
+            indexed = existing_ids(index, doc_ids)
+        except Exception as exc:
+            logger.warning("Existence check of %d chunks failed: %s", len(doc_ids), exc)
+            on_failed(doc_ids, exc)
+            return
+        if indexed:
+            stats["chunks_skipped"] += len(indexed)
+            on_indexed(sorted(indexed))
+        for candidate in candidates:
+            if candidate[0] not in indexed:
+                yield candidate
+
+    for candidate in chunks:
+        doc_id = candidate[0]
+        if doc_id in seen:
+            stats["chunks_skipped"] += 1
+            continue
+        seen.add(doc_id)
+        candidates.append(candidate)
+        if len(candidates) >= batch_size:
+            yield from flush()
+            candidates = []
+    if candidates:
+        yield from flush()
+
+
+def _embed_chunk(doc_id: str, chunk: str, metadata: dict, options: dict) -> tuple[str, dict]:
+    return doc_id, {"content": chunk, "embedding": embed(chunk, **options), **metadata}
+
+
+def _embedded_chunks(
+    chunks: Iterable[tuple[str, str, dict]], concurrency: int, options: dict | None = None
+) -> Iterator[tuple[str, dict | Exception]]:
+    """Embed chunks on a thread pool, yielding (doc_id, body) in order.
+
+    At most ``2 * concurrency`` embedding requests are outstanding, which
+    caps both the request rate against the embedding quota and the number
+    of vectors held in memory ahead of the index sink.  A failed embedding
+    yields the exception in place of the body.  ``options`` are passed to
+    ``embed`` (see ``embedding_options``).
+    """
+    options = options or {}
+
+    def result(doc_id: str, future: Future) -> tuple[str, dict | Exception]:
+        try:
+            return future.result()  # type: ignore[no-any-return]
+        except Exception as exc:
+            return doc_id, exc
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending: deque[tuple[str, Future]] = deque()
+        for doc_id, chunk, metadata in chunks:
+            pending.append((doc_id, pool.submit(_embed_chunk, doc_id, chunk, metadata, options)))
+            if len(pending) >= 2 * concurrency:
+                yield result(*pending.popleft())
+        while pending:
+            yield result(*pending.popleft())
+
+
+def _load_chunks(
+    chunks: Iterable[tuple[str, str, dict]],
+    index: str,
+    batch_size: int,
+    embed_concurrency: int,
+    stats: dict,
+    on_indexed: Callable[[list[str]], None],
+    on_failed: Callable[[list[str], Exception], None],
+    embedding: dict | None = None,
+) -> None:
+    """Embed new chunks and write them to the index in bulk batches.
+
+    Chunk ids that reach the index are passed to ``on_indexed``; ids whose
+    embedding or bulk request failed are passed to ``on_failed`` instead of
+    aborting the run, as are ids whose existence check failed.  A failed id
+    is forgotten, so a later file producing the same chunk embeds it again.
+    """
+    batch: list[tuple[str, dict]] = []
+    seen: set[str] = set()
+
+    def fail(doc_ids: list[str], exc: Exception) -> None:
+        seen.difference_update(doc_ids)
+        on_failed(doc_ids, exc)
+
+    def flush() -> None:
+        doc_ids = [doc_id for doc_id, _ in batch]
+        try:
+            bulk_index(index, batch)
+        except Exception as exc:
+            logger.warning("Bulk request of %d chunks failed: %s", len(batch), exc)
+            fail(doc_ids, exc)
+            return
+        stats["chunks_indexed"] += len(batch)
+        on_indexed(doc_ids)
+
+    new_chunks = _new_chunks(chunks, index, batch_size, stats, on_indexed, fail, seen)
+    for doc_id, body in _embedded_chunks(new_chunks, embed_concurrency, embedding):
+        if isinstance(body, Exception):
+            logger.warning("Embedding chunk %s failed: %s", doc_id, body)
+            fail([doc_id], body)
+            continue
+        batch.append((doc_id, body))
+        if len(batch) >= batch_size:
+            flush()
+            batch = []
+    if batch:
+        flush()
+
+
+def run_ingest(
+    config_path: str,
+    workers: int | None = None,
+    batch_size: int | None = None,
+    resume: bool = False,
+) -> dict:
+    """Read, clean, chunk, embed, and index trusted documents.
+
+    The run is a staged pipeline: files are cleaned and chunked in a process
+    pool (``workers``), chunks are embedded on a bounded thread pool
+    (``ingest.embed_concurrency``), and embedded chunks are written to
+    Elasticsearch in bulk requests of ``batch_size``.  Chunks whose id is
+    already in the index, or was already produced earlier in the run, are
+    never embedded.  A file that cannot be read, embedded, or indexed is
+    reported under ``failed`` and the run carries on with the other files.
+
+    When ``ingest.dedup`` is set, chunks that are near-duplicates (MinHash
+    Jaccard estimate above the threshold) of a chunk already seen in the run
+    are collapsed into it, and the canonical chunk records the files its
+    duplicates came from in ``duplicate_sources``.
+
+    When ``ingest.manifest`` is set in the config, files whose size and
+    content hash match the manifest are skipped, and chunks that no current
+    file produces any more are deleted from the index.
+
+    When ``ingest.checkpoint`` is set, every finished or failed file is
+    journaled as soon as its chunks are indexed.  With ``resume=True`` the
+    files the journal records as done are skipped, failed files are retried,
+    and an unpublished blue/green generation is loaded into again.
+
+    When ``ingest.optimize`` is set, refresh and replicas are disabled while
+    loading and restored afterwards, then the index is refreshed,
+    force-merged, and optionally warmed; the phase timings are reported
+    under ``optimize``.
+
+    When ``ingest.snapshot`` is set, the finished index is exported to that
+    path for the local retrieval backend (``retrieval.backend: local``).
+
+    When ``ingest.blue_green`` is set, ``elasticsearch.index`` is treated as
+    an alias: the run builds a new index generation seeded from the live
+    one, and the alias is switched to it only after loading (and
+    optimisation) succeeded.  Older generations beyond ``keep`` are deleted.
+    """
+    config = load_config(config_path)
+    index = config["elasticsearch"]["index"]
+    sources = config["doc_sources"]
+    ingest_config = config.get("ingest", {})
+    manifest_path = ingest_config.get("manifest")
+    checkpoint_path = ingest_config.get("checkpoint")
+    workers = workers or ingest_config.get("workers", DEFAULT_WORKERS)
+    batch_size = batch_size or ingest_config.get("batch_size", DEFAULT_BATCH_SIZE)
+    embed_concurrency = ingest_config.get("embed_concurrency", DEFAULT_EMBED_CONCURRENCY)
+    chunking = ingest_config.get("chunking", {})
+    embedding = embedding_options(config)
+    if chunking.get("strategy", "fixed") not in CHUNKING_STRATEGIES:
+        raise ValueError(f"Unknown chunking strategy: {chunking['strategy']}")
+    if resume and not checkpoint_path:
+        raise ValueError("Resuming requires ingest.checkpoint in the config.")
+
+    dedup = ingest_config.get("dedup")
+    lsh = new_lsh_index(dedup if isinstance(dedup, dict) else None) if dedup else None
+    duplicate_sources: dict[str, set[str]] = {}
+
+    previous = load_manifest(manifest_path, index)["files"] if manifest_path else {}
+    journal: dict = (
+        read_journal(checkpoint_path)
+        if resume
+        else {"header": None, "done": {}, "failed": {}, "seeded": False}
+    )
+    current: dict[str, dict] = {}
+    fingerprints: dict[str, dict] = {}
+    failures: dict[str, str] = {}
+    progress = new_progress()
+
+    stats: dict = {
+        "documents_processed": 0,
+        "documents_skipped": 0,
+        "documents_resumed": 0,
+        "documents_failed": 0,
+        "chunks_indexed": 0,
+        "chunks_skipped": 0,
+        "chunks_collapsed": 0,
+        "chunks_deleted": 0,
+    }
+
+    paths = []
+    metadata: dict[str, dict] = {}
+    for key, listed_fingerprint, source in discover_documents(sources):
+        if key in journal["done"]:
+            current[key] = journal["done"][key]
+            stats["documents_resumed"] += 1
+            continue
+        if manifest_path:
+            fingerprint = listed_fingerprint or file_fingerprint(Path(key))
+            if is_unchanged(previous.get(key), fingerprint):
+                current[key] = previous[key]
+                stats["documents_skipped"] += 1
+                continue
+            fingerprints[key] = fingerprint
+        metadata[key] = document_metadata(key, source)
+        paths.append(key)
+
+    optimize = ingest_config.get("optimize")
+    blue_green = ingest_config.get("blue_green")
+    generation = None
+    seed = False
+    if blue_green:
+        if checkpoint_path and not resume:
+            # A fresh run supersedes the journal; drop the generation it left
+            # unpublished, or cleanup would keep it in place of a real rollback.
+            stale = (read_journal(checkpoint_path)["header"] or {}).get("generation")
+            if stale and stale["alias"] == index and not is_live(stale):
+                abandon_generation(stale)
+        generation = (journal["header"] or {}).get("generation")
+        if not generation or is_live(generation):
+            generation = create_generation(index)
+            seed = True
+        else:
+            # A run that died during the seed copy resumes with a fresh copy.
+            seed = not journal["seeded"]
+    target = generation["index"] if generation else index
+
+    if checkpoint_path:
+        start_journal(
+            checkpoint_path, target, generation, journal["done"], bool(generation) and not seed
+        )
+
+    def done(done_paths: list[str]) -> None:
+        for path in done_paths:
+            if checkpoint_path:
+                append_record(checkpoint_path, {"path": path, "entry": current[path]})
+
+    def failed(failed_paths: list[str], exc: Exception) -> None:
+        for path in failed_paths:
+            failures[path] = str(exc)
+            if path in previous:
+                current[path] = previous[path]
+            else:
+                current.pop(path, None)
+            if checkpoint_path:
+                append_record(checkpoint_path, {"path": path, "error": str(exc)})
+
+    def indexed(doc_ids: list[str]) -> None:
+        done(settle(progress, doc_ids))
+
+    def chunk_failed(doc_ids: list[str], exc: Exception) -> None:
+        failed(fail_chunks(progress, doc_ids), exc)
+
+    def chunks() -> Iterator[tuple[str, str, dict]]:
+        for path, document_chunks in _prepared_documents(paths, workers, chunking):
+            stats["documents_processed"] += 1
+            chunk_ids: list[str] = []
+            current[path] = {**fingerprints.get(path, {}), "chunk_ids": chunk_ids}
+            try:
+                for position, chunk in enumerate(document_chunks):
+                    doc_id = chunk_id(chunk)
+                    if lsh is not None and doc_id not in lsh["signatures"]:
+                        canonical = find_or_add(lsh, doc_id, chunk)
+                        if canonical is not None:
+                            duplicate_sources.setdefault(canonical, set()).add(path)
+                            stats["chunks_collapsed"] += 1
+                            chunk_ids.append(canonical)
+                            track_chunk(progress, path, canonical)
+                            continue
+                    chunk_ids.append(doc_id)
+                    track_chunk(progress, path, doc_id)
+                    yield doc_id, chunk, {**metadata[path], "position": position}
+            except Exception as exc:
+                logger.warning("Reading %s failed: %s", path, exc)
+                if fail_file(progress, path):
+                    failed([path], exc)
+                continue
+            done(file_read(progress, path))
+
+    try:
+        ensure_index(target, chunk_mappings(embedding))
+        saved_settings = begin_bulk_load(target) if optimize else None
+        try:
+            if seed and generation:
+                seed_generation(generation)
+                if checkpoint_path:
+                    append_record(checkpoint_path, {"seeded": True})
+            _load_chunks(
+                chunks(),
+                target,
+                batch_size,
+                embed_concurrency,
+                stats,
+                indexed,
+                chunk_failed,
+                embedding,
+            )
+            # Every chunk has been indexed or failed by now; a file still
+            # pending would otherwise be recorded with chunks never indexed.
+            stranded = [path for path in sorted(progress["pending"]) if fail_file(progress, path)]
+            if stranded:
+                failed(stranded, RuntimeError("Chunks were never indexed."))
+
+            if duplicate_sources:
+                # Merged into the stored list: earlier runs' sources still apply.
+                bulk_add_values(
+                    target,
+                    "duplicate_sources",
+                    [
+                        (doc_id, sorted(sources))
+                        for doc_id, sources in sorted(duplicate_sources.items())
+                        if doc_id in progress["settled"]
+                    ],
+                )
+
+            stale = sorted(stale_chunk_ids(previous, current)) if manifest_path else []
+            if stale:
+                try:
+                    bulk_delete(target, stale)
+                    stats["chunks_deleted"] += len(stale)
+                except Exception as exc:
+                    logger.warning("Deleting %d stale chunks failed: %s", len(stale), exc)
+                    # Failing the files keeps their old entries in the
+                    # manifest, so the next run finds the chunks stale again.
+                    stale_ids = set(stale)
+                    failed(
+                        sorted(
+                            path
+                            for path, entry in previous.items()
+                            if path not in failures
+                            and stale_ids.intersection(entry.get("chunk_ids", []))
+                        ),
+                        exc,
+                    )
+        finally:
+            if optimize:
+                end_bulk_load(target, saved_settings)
+
+        if optimize:
+            stats["optimize"] = finalize_index(
+                target, optimize if isinstance(optimize, dict) else {}, embedding
+            )
+    except Exception:
+        # With a checkpoint the unpublished generation is kept for --resume.
+        if generation and not checkpoint_path:
+            abandon_generation(generation)
+        raise
+
+    if generation:
+        publish_generation(generation)
+        keep = (
+            blue_green.get("keep", DEFAULT_KEEP) if isinstance(blue_green, dict) else DEFAULT_KEEP
+        )
+        stats["index_generation"] = target
+        stats["generations_deleted"] = cleanup_generations(index, target, keep)
+
+    if generation or stats["chunks_indexed"] or stats["chunks_deleted"] or duplicate_sources:
+        bump_generation(target)
+
+    snapshot_path = ingest_config.get("snapshot")
+    if snapshot_path:
+        stats["snapshot_chunks"] = export_snapshot(target, snapshot_path)
+
+    if manifest_path:
+        manifest = empty_manifest(index)
+        manifest["files"] = current
+        save_manifest(manifest_path, manifest)
 
-            for chunk in chunks:
-                vector = embed(chunk)
-                doc_id = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
-                index_doc(index, doc_id, {"content": chunk, "embedding": vector})
-                chunks_indexed += 1
+    if checkpoint_path and not failures:
+        Path(checkpoint_path).unlink(missing_ok=True)
 
-    return {"documents_processed": documents_processed, "chunks_indexed": chunks_indexed}
+    stats["documents_failed"] = len(failures)
+    stats["failed"] = failures
+    return stats
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ingest trusted documents into Elasticsearch.")
     parser.add_argument("--config", default=".llm-reliability.yaml", help="Path to config file.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes used to read and chunk files."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=None, help="Chunks per Elasticsearch bulk request."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip files the checkpoint journal records as done and retry failed ones.",
+    )
     args = parser.parse_args()
-    result = run_ingest(args.config)
+    result = run_ingest(
+        args.config, workers=args.workers, batch_size=args.batch_size, resume=args.resume
+    )
     print(f"Documents processed: {result['documents_processed']}")
+    print(f"Documents skipped: {result['documents_skipped']}")
+    print(f"Documents resumed: {result['documents_resumed']}")
+    print(f"Documents failed: {result['documents_failed']}")
     print(f"Chunks indexed: {result['chunks_indexed']}")
+    print(f"Chunks skipped: {result['chunks_skipped']}")
+    print(f"Chunks collapsed: {result['chunks_collapsed']}")
+    print(f"Chunks deleted: {result['chunks_deleted']}")
+    if "snapshot_chunks" in result:
+        print(f"Snapshot chunks: {result['snapshot_chunks']}")
+    if "index_generation" in result:
+        print(f"Index generation: {result['index_generation']}")
+    for phase, seconds in result.get("optimize", {}).items():
+        print(f"Optimize {phase}: {seconds:.3f}s")
+    for path, error in result["failed"].items():
+        print(f"Failed: {path}: {error}")
+    if result["failed"]:
+        sys.exit(1)
@@ -0,0 +1,20 @@
+"""snapshot -- export the index for the in-process local retrieval backend."""
+
+import logging
+
+from src.wrappers.elasticsearch_helper import refresh_index, scan_docs
+from src.wrappers.local_search import write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def export_snapshot(index: str, path: str) -> int:
+    """Write every chunk of index, with its embedding, to a snapshot file.
+
+    The index is refreshed first so chunks from the bulk load just finished
+    are visible to the scroll.  Returns the number of chunks written.
+    """
+    refresh_index(index)
+    count = write_snapshot(path, scan_docs(index))
+    logger.info("Exported %d chunks from %s to %s", count, index, path)
+    return count
@@ -1,37 +1,106 @@
 """Workflow orchestrator -- wires all agents into a sequential pipeline."""
 
 import logging
+from collections.abc import Callable
 from uuid import uuid4
 
 from src.agents.extract_claims import extract_claims
 from src.agents.generate_prompts import generate_prompts
 from src.agents.retrieve_evidence import retrieve_evidence
 from src.agents.run_model import run_model
-from src.agents.score_risk import score_risk
+from src.agents.score_risk import DEFAULT_CONFIDENCE, risk_interval_by_prompt, score_risk
 from src.agents.verify_claims import verify_claims
+from src.wrappers.bedrock import track_usage
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TARGET_WIDTH = 0.1
+DEFAULT_MAX_ROUNDS = 5
+
+
+ROUND_RESULTS = ("prompts", "prompt_categories", "responses", "claims", "evidence", "verdicts")
+
+
+def _run_agent(agent: Callable[[dict], None], state: dict) -> None:
+    name = agent.__name__
+    logger.info("Starting %s", name)
+    try:
+        agent(state)
+    except Exception as exc:
+        logger.error("Failed in %s: %s", name, exc)
+        raise
+    logger.info("Completed %s", name)
+
+
+def _run_rounds(state: dict, adaptive: dict) -> None:
+    """Evaluate fresh prompts in rounds until the risk interval is narrow enough.
+
+    Each round runs ``evaluation.num_prompts`` new prompts through to
+    verification and appends its results to state.  Rounds stop once the
+    prompt-clustered interval on hallucination risk is at most
+    ``target_width`` wide, or after ``max_rounds``.
+    """
+    if state["config"].get("verification", {}).get("early_stop"):
+        raise ValueError("evaluation.adaptive and verification.early_stop cannot be combined.")
+    target_width = adaptive.get("target_width", DEFAULT_TARGET_WIDTH)
+    confidence = adaptive.get("confidence", DEFAULT_CONFIDENCE)
+    max_rounds = adaptive.get("max_rounds", DEFAULT_MAX_ROUNDS)
+
+    for key in ROUND_RESULTS:
+        state[key] = []
+    for round_number in range(1, max_rounds + 1):
+        round_state = {"config": state["config"], "previous_prompts": list(state["prompts"])}
+        for agent in (
+            generate_prompts,
+            run_model,
+            extract_claims,
+            retrieve_evidence,
+            verify_claims,
+        ):
+            _run_agent(agent, round_state)
+        for key in ROUND_RESULTS:
+            state[key].extend(round_state.get(key, []))
+        if "prompt_bank" in round_state:
+            # Later rounds may extend the bank; the last version covers every round.
+            state["prompt_bank"] = round_state["prompt_bank"]
+
+        low, high = risk_interval_by_prompt(state["verdicts"], confidence)
+        state["rounds"] = round_number
+        logger.info(
+            "Round %d: %d claims, risk interval [%.3f, %.3f]",
+            round_number,
+            len(state["verdicts"]),
+            low,
+            high,
+        )
+        if high - low <= target_width:
+            break
+
 
 def run_workflow(state: dict) -> None:
-    """Execute all agents in pipeline order."""
-    agents = [
-        generate_prompts,
-        run_model,
-        extract_claims,
-        retrieve_evidence,
-        verify_claims,
-        score_risk,
-    ]
-    for agent in agents:
-        name = agent.__name__
-        logger.info("Starting %s", name)
-        try:
-            agent(state)
-        except Exception as exc:
-            logger.error("Failed in %s: %s", name, exc)
-            raise
-        logger.info("Completed %s", name)
+    """Execute all agents in pipeline order.
+
+    With ``evaluation.adaptive`` configured, prompts are generated and
+    evaluated in rounds before the risk is scored.  Token usage of every
+    Bedrock call made by the agents is totalled in ``state["usage"]``.
+    """
+    with track_usage() as usage:
+        adaptive = state.get("config", {}).get("evaluation", {}).get("adaptive")
+        if adaptive:
+            _run_rounds(state, adaptive if isinstance(adaptive, dict) else {})
+            _run_agent(score_risk, state)
+        else:
+            agents = [
+                generate_prompts,
+                run_model,
+                extract_claims,
+                retrieve_evidence,
+                verify_claims,
+                score_risk,
+            ]
+            for agent in agents:
+                _run_agent(agent, state)
+    state["usage"] = usage
 
 
 def build_response(state: dict) -> dict:
@@ -48,4 +117,10 @@ def build_response(state: dict) -> dict:
         "reliability_score": score["reliability_score"],
         "decision": score["decision"],
         "claims": state.get("verdicts", []),
+        "risk_interval": score.get("risk_interval"),
+        "rounds": score.get("rounds", 1),
+        "breakdown": score.get("breakdown"),
+        "early_stop": score.get("early_stop"),
+        "usage": state.get("usage"),
+        "prompt_bank": state.get("prompt_bank"),
     }
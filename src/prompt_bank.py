@@ -0,0 +1,212 @@
+"""prompt_bank -- versioned test prompts, stored and reused across runs.
+
+A bank holds the generated prompts for one fingerprint: a hash of the use
+case, the prompt categories and the generator model.  Runs with a
+``prompt_bank`` config block take their prompts from the bank instead of
+generating them, so they skip the generation round trip and evaluate the
+same prompts run after run.  A bank is only generated into when it is
+short of what a run needs.
+
+Every write is a new version; older versions are kept, and
+``prompt_bank.version`` pins a run to one.  Banks live in a local directory
+(``backend: local``, the default) or an Elasticsearch index
+(``backend: elasticsearch``).
+
+Refresh (regenerate from scratch) and extend (add prompts) are explicit::
+
+    python -m src.prompt_bank refresh --config .llm-reliability.yaml
+    python -m src.prompt_bank extend --config .llm-reliability.yaml --count 50
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from src.wrappers import elasticsearch_helper
+from src.wrappers.bedrock import default_model, model_route
+
+DEFAULT_PATH = ".prompt-bank"
+DEFAULT_INDEX = "prompt-bank"
+MAPPINGS = {
+    # Prompts are kept in _source only; the bank is looked up by fingerprint.
+    "dynamic": False,
+    "properties": {
+        "fingerprint": {"type": "keyword"},
+        "version": {"type": "integer"},
+        "created_at": {"type": "date"},
+    },
+}
+
+# generate(config, count, exclude) -> [(category, prompt), ...]
+Generator = Callable[[dict, int, list[str]], list[tuple[str | None, str]]]
+
+_locks: dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+def fingerprint(config: dict) -> str:
+    """Bank key: the use case, the categories (in any order) and the generator model."""
+    model = model_route(config, "generate_prompts")["model"] or default_model()
+    identity = {
+        "use_case": config["use_case"].strip(),
+        "categories": sorted(config["evaluation"]["prompt_categories"]),
+        "model": model,
+    }
+    digest = hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def _local_load(bank: dict, key: str, version: int | None) -> dict | None:
+    directory = Path(bank.get("path", DEFAULT_PATH)) / key
+    if version is None:
+        versions = [int(p.stem[1:]) for p in directory.glob("v*.json")]
+        if not versions:
+            return None
+        version = max(versions)
+    file_path = directory / f"v{version}.json"
+    if not file_path.exists():
+        return None
+    with open(file_path, encoding="utf-8") as fh:
+        return json.load(fh)  # type: ignore[no-any-return]
+
+
+def _local_save(bank: dict, entry: dict) -> None:
+    """Write the version atomically so an interrupted run never truncates it."""
+    directory = Path(bank.get("path", DEFAULT_PATH)) / entry["fingerprint"]
+    directory.mkdir(parents=True, exist_ok=True)
+    file_path = directory / f"v{entry['version']}.json"
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(entry, fh, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def _es_load(bank: dict, key: str, version: int | None) -> dict | None:
+    index = bank.get("index", DEFAULT_INDEX)
+    if version is not None:
+        return elasticsearch_helper.get_doc(index, f"{key}-v{version}")
+    return elasticsearch_helper.top_doc(index, "fingerprint", key, "version")
+
+
+def _es_save(bank: dict, entry: dict) -> None:
+    index = bank.get("index", DEFAULT_INDEX)
+    elasticsearch_helper.ensure_index(index, MAPPINGS)
+    elasticsearch_helper.index_doc(index, f"{entry['fingerprint']}-v{entry['version']}", entry)
+    elasticsearch_helper.refresh_index(index)
+
+
+def _backend(bank: dict) -> dict[str, Callable]:
+    """``load`` and ``save`` functions of the configured ``prompt_bank.backend``."""
+    backend = bank.get("backend", "local")
+    if backend == "local":
+        return {"load": _local_load, "save": _local_save}
+    if backend == "elasticsearch":
+        return {"load": _es_load, "save": _es_save}
+    raise ValueError(f"Unknown prompt bank backend: {backend}")
+
+
+def load(config: dict, version: int | None = None) -> dict | None:
+    """The bank for the config's fingerprint: ``version``, else the latest; None if absent."""
+    bank = config["prompt_bank"]
+    return _backend(bank)["load"](bank, fingerprint(config), version)  # type: ignore[no-any-return]
+
+
+def save(config: dict, prompts: list[tuple[str | None, str]], previous: dict | None) -> dict:
+    """Store ``prompts`` as the version after ``previous`` and return the new entry."""
+    bank = config["prompt_bank"]
+    entry = {
+        "fingerprint": fingerprint(config),
+        "version": previous["version"] + 1 if previous else 1,
+        "created_at": datetime.now(UTC).isoformat(),
+        "use_case": config["use_case"],
+        "categories": config["evaluation"]["prompt_categories"],
+        "model": model_route(config, "generate_prompts")["model"] or default_model(),
+        "prompts": [{"prompt": p, "category": category} for category, p in prompts],
+    }
+    _backend(bank)["save"](bank, entry)
+    return entry
+
+
+def _lock(key: str) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _tagged(entry: dict | None) -> list[tuple[str | None, str]]:
+    return [(p["category"], p["prompt"]) for p in entry["prompts"]] if entry else []
+
+
+def take(
+    config: dict, count: int, exclude: list[str], generate: Generator
+) -> tuple[list[tuple[str | None, str]], dict | None]:
+    """``count`` bank prompts not in ``exclude``, with the bank entry they came from.
+
+    A bank that is missing or short is extended with newly generated
+    prompts first, unless ``prompt_bank.version`` pins it.  Prompts are
+    taken in bank order, or sampled with ``prompt_bank.sample`` (and
+    ``seed``).
+    """
+    bank = config["prompt_bank"]
+    pinned = bank.get("version")
+    # One run at a time fills a given bank; others wait and then reuse it.
+    with _lock(fingerprint(config)):
+        entry = load(config, pinned)
+        if pinned is not None and entry is None:
+            raise ValueError(f"Prompt bank version {pinned} not found.")
+        stored = _tagged(entry)
+        excluded = set(exclude)
+        available = [(category, p) for category, p in stored if p not in excluded]
+        if len(available) < count and pinned is None:
+            new = generate(config, count - len(available), exclude + [p for _, p in stored])
+            if new:
+                entry = save(config, stored + new, entry)
+                available += new
+
+    if bank.get("sample"):
+        return random.Random(bank.get("seed")).sample(available, min(count, len(available))), entry
+    return available[:count], entry
+
+
+def refresh(config: dict, generate: Generator, count: int | None = None) -> dict:
+    """Regenerate the bank from scratch as a new version (``num_prompts`` by default)."""
+    count = count or config["evaluation"]["num_prompts"]
+    with _lock(fingerprint(config)):
+        return save(config, generate(config, count, []), load(config))
+
+
+def extend(config: dict, generate: Generator, count: int) -> dict:
+    """Add ``count`` new prompts to the bank as a new version."""
+    with _lock(fingerprint(config)):
+        entry = load(config)
+        stored = _tagged(entry)
+        return save(config, stored + generate(config, count, [p for _, p in stored]), entry)
+
+
+if __name__ == "__main__":
+    from src.agents.generate_prompts import generate
+    from src.config.loader import load_config
+
+    parser = argparse.ArgumentParser(description="Manage the versioned prompt bank.")
+    parser.add_argument("operation", choices=["show", "refresh", "extend"])
+    parser.add_argument("--config", default=".llm-reliability.yaml", help="Path to config file.")
+    parser.add_argument("--count", type=int, help="Prompts to generate (default num_prompts).")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    cfg.setdefault("prompt_bank", {})
+    if args.operation == "refresh":
+        result = refresh(cfg, generate, args.count)
+    elif args.operation == "extend":
+        result = extend(cfg, generate, args.count or cfg["evaluation"]["num_prompts"])
+    else:
+        result = load(cfg) or {"fingerprint": fingerprint(cfg), "version": None, "prompts": []}
+    print(
+        f"fingerprint {result['fingerprint']} version {result['version']}: "
+        f"{len(result['prompts'])} prompts"
+    )
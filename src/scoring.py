@@ -0,0 +1,197 @@
+"""scoring -- vectorised risk breakdowns over verdict arrays.
+
+Verdicts are turned into NumPy arrays once: an unsupported flag per claim
+and an integer code per claim for each grouping (category, prompt, evidence
+document).  Per-group counts are ``np.bincount`` calls, and bootstrap
+intervals are drawn for every group at once, so scoring stays fast at 10^5+
+verdicts.
+
+Category (and overall) intervals resample whole prompts, because claims
+from one response are correlated.  Prompt and document intervals resample
+claims within the group.  Resampling n claims with replacement gives an
+unsupported count distributed Binomial(n, share), so those are drawn
+directly.
+"""
+
+import numpy as np
+
+DEFAULT_BOOTSTRAP_SAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+UNKNOWN = "unknown"
+
+# Bootstrap draws per block for the prompt resampling, bounding memory use.
+_BLOCK_CELLS = 1 << 22
+
+
+def encode(values: list) -> tuple[list[str], np.ndarray]:
+    """(group names in first-seen order, integer code per value); None is ``unknown``."""
+    index: dict[str, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(UNKNOWN if v is None else str(v), len(index)) for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return list(index), codes
+
+
+def verdict_arrays(verdicts: list[dict]) -> dict:
+    """Unsupported flags and group codes for a list of verdicts."""
+    arrays: dict = {
+        "unsupported": np.fromiter(
+            (v["verdict"] == "unsupported" for v in verdicts), dtype=bool, count=len(verdicts)
+        ),
+        "weakly_supported": np.fromiter(
+            (v["verdict"] == "weakly_supported" for v in verdicts),
+            dtype=bool,
+            count=len(verdicts),
+        ),
+    }
+    for group, key in (
+        ("category", "category"),
+        ("prompt", "source_prompt"),
+        ("document", "evidence_source"),
+    ):
+        arrays[group] = encode([v.get(key) for v in verdicts])
+    return arrays
+
+
+def _percentiles(samples: np.ndarray, confidence: float) -> np.ndarray:
+    """Percentile interval per column of a (draws, groups) array."""
+    tail = (1 - confidence) / 2
+    quantile = np.nanquantile if np.isnan(samples).any() else np.quantile
+    return quantile(samples, [tail, 1 - tail], axis=0).T  # type: ignore[no-any-return]
+
+
+def claim_bootstrap(
+    unsupported: np.ndarray,
+    claims: np.ndarray,
+    rng: np.random.Generator,
+    samples: int,
+    confidence: float,
+) -> np.ndarray:
+    """(groups, 2) intervals resampling claims within each group.
+
+    The interval depends only on a group's (unsupported, claims) counts, so
+    draws are made once per distinct pair and shared by every group with it.
+    """
+    pairs, inverse = np.unique(np.stack([unsupported, claims], axis=1), axis=0, return_inverse=True)
+    draws = rng.binomial(
+        pairs[:, 1].astype(np.int64), pairs[:, 0] / pairs[:, 1], size=(samples, len(pairs))
+    )
+    return _percentiles(draws / pairs[:, 1], confidence)[inverse.ravel()]
+
+
+def cluster_bootstrap(
+    cluster_unsupported: np.ndarray,
+    cluster_claims: np.ndarray,
+    cluster_group: np.ndarray,
+    groups: int,
+    rng: np.random.Generator,
+    samples: int,
+    confidence: float,
+) -> np.ndarray:
+    """(groups, 2) intervals resampling clusters (prompts) within each group.
+
+    Each draw picks, for every group, as many of its clusters as it has,
+    with replacement, and pools their counts.
+    """
+    order = np.argsort(cluster_group, kind="stable")
+    cluster_unsupported = cluster_unsupported[order]
+    cluster_claims = cluster_claims[order]
+    cluster_group = cluster_group[order]
+    sizes = np.bincount(cluster_group, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    clusters = len(cluster_group)
+
+    # Positions are sorted by group, so each group's picks are one contiguous run.
+    present = np.flatnonzero(sizes)
+    block = max(1, _BLOCK_CELLS // max(clusters, 1))
+    draws = np.full((samples, groups), np.nan)
+    for first in range(0, samples, block):
+        count = min(block, samples - first)
+        picks = starts[cluster_group] + (
+            rng.random((count, clusters)) * sizes[cluster_group]
+        ).astype(np.int64)
+        unsupported = np.add.reduceat(cluster_unsupported[picks], starts[present], axis=1)
+        claims = np.add.reduceat(cluster_claims[picks], starts[present], axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            draws[first : first + count, present] = unsupported / claims
+    return _percentiles(draws, confidence)
+
+
+def _table(
+    names: list[str], unsupported: np.ndarray, claims: np.ndarray, intervals: np.ndarray
+) -> list[dict]:
+    risk = unsupported / claims
+    return [
+        {
+            "name": name,
+            "claims": int(claims[i]),
+            "unsupported": int(unsupported[i]),
+            "risk": round(float(risk[i]), 4),
+            "interval": [round(float(intervals[i, 0]), 4), round(float(intervals[i, 1]), 4)],
+        }
+        for i, name in enumerate(names)
+    ]
+
+
+def breakdowns(
+    arrays: dict,
+    samples: int = DEFAULT_BOOTSTRAP_SAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = None,
+) -> dict:
+    """Risk per category, prompt and document, plus an overall interval.
+
+    Each table is a list of rows, one per group, with its ``name``, claim
+    and unsupported counts, risk, and bootstrap interval.  Rows rather than
+    name-keyed objects keep free-text names (prompts, sources) out of the
+    run document's field names.
+    """
+    flags = arrays["unsupported"]
+    if not len(flags):
+        return {"overall": None, "category": [], "prompt": [], "document": []}
+    rng = np.random.default_rng(seed)
+    weights = flags.astype(np.float64)
+
+    result: dict = {}
+    for group in ("prompt", "document"):
+        names, codes = arrays[group]
+        claims = np.bincount(codes, minlength=len(names)).astype(np.float64)
+        unsupported = np.bincount(codes, weights=weights, minlength=len(names))
+        intervals = claim_bootstrap(unsupported, claims, rng, samples, confidence)
+        result[group] = _table(names, unsupported, claims, intervals)
+
+    # Prompts are the clusters for category and overall intervals.
+    prompt_names, prompt_codes = arrays["prompt"]
+    category_names, category_codes = arrays["category"]
+    prompt_claims = np.bincount(prompt_codes, minlength=len(prompt_names)).astype(np.float64)
+    prompt_unsupported = np.bincount(prompt_codes, weights=weights, minlength=len(prompt_names))
+    # A prompt belongs to one category; take the category of its first claim.
+    first_claim = np.unique(prompt_codes, return_index=True)[1]
+    prompt_category = category_codes[first_claim]
+
+    claims = np.bincount(category_codes, minlength=len(category_names)).astype(np.float64)
+    unsupported = np.bincount(category_codes, weights=weights, minlength=len(category_names))
+    intervals = cluster_bootstrap(
+        prompt_unsupported,
+        prompt_claims,
+        prompt_category,
+        len(category_names),
+        rng,
+        samples,
+        confidence,
+    )
+    result["category"] = _table(category_names, unsupported, claims, intervals)
+
+    overall = cluster_bootstrap(
+        prompt_unsupported,
+        prompt_claims,
+        np.zeros(len(prompt_names), dtype=np.int64),
+        1,
+        rng,
+        samples,
+        confidence,
+    )
+    result["overall"] = [round(float(overall[0, 0]), 4), round(float(overall[0, 1]), 4)]
+    return result
@@ -0,0 +1,75 @@
+"""Statistics for deciding the gate from a sample of verified claims."""
+
+import math
+from statistics import NormalDist
+
+
+def _wilson(share: float, n: float, confidence: float) -> tuple[float, float]:
+    """Wilson score interval for a proportion observed over an (effective) sample of n."""
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    centre = (share + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(share * (1 - share) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(centre - half, 0.0), min(centre + half, 1.0)
+
+
+def risk_interval(
+    unsupported: int, verified: int, total: int, confidence: float
+) -> tuple[float, float]:
+    """Confidence interval for the unsupported share of all ``total`` claims.
+
+    ``verified`` claims are a simple random sample (without replacement) of
+    the ``total``.  This is a Wilson score interval with the finite
+    population correction applied to the sample size, clipped to the bounds
+    that hold whatever the unverified claims turn out to be.
+    """
+    if verified >= total:
+        share = unsupported / total if total else 0.0
+        return share, share
+    if verified == 0:
+        return 0.0, 1.0
+
+    low, high = _wilson(
+        unsupported / verified, verified * (total - 1) / (total - verified), confidence
+    )
+    lowest = unsupported / total
+    highest = (unsupported + total - verified) / total
+    return max(low, lowest), min(high, highest)
+
+
+def settled_decision(interval: tuple[float, float], threshold: float) -> str | None:
+    """``approve``/``reject`` once the whole interval is on one side of the threshold."""
+    low, high = interval
+    if low >= threshold:
+        return "reject"
+    if high < threshold:
+        return "approve"
+    return None
+
+
+def looks(total: int, min_claims: int, check_every: int) -> list[int]:
+    """Sample sizes at which a sequential test checks its stopping rule."""
+    return list(range(min(min_claims, total), total, max(check_every, 1)))
+
+
+def clustered_risk_interval(
+    clusters: list[tuple[int, int]], confidence: float
+) -> tuple[float, float]:
+    """Confidence interval for the unsupported share pooled over clusters.
+
+    ``clusters`` holds (unsupported, claims) per prompt.  Claims from one
+    response share its errors, so the variance is the cluster-robust
+    (linearised ratio) estimate over prompts rather than over claims.  Its
+    ratio to the independent-claims variance (the design effect) shrinks the
+    sample to an effective size for a Wilson interval, which stays sensible
+    when no (or every) claim is unsupported.
+    """
+    claims = sum(count for _, count in clusters)
+    if len(clusters) < 2 or not claims:
+        return 0.0, 1.0
+
+    share = sum(unsupported for unsupported, _ in clusters) / claims
+    residuals = sum((unsupported - share * count) ** 2 for unsupported, count in clusters)
+    variance = len(clusters) / (len(clusters) - 1) * residuals / claims**2
+    independent = share * (1 - share) / claims
+    design_effect = max(variance / independent, 1.0) if independent else 1.0
+    return _wilson(share, claims / design_effect, confidence)
@@ -2,50 +2,189 @@
 
 import json
 import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 import boto3
 
+from src.wrappers import bedrock_pool
+
 _client = boto3.client(
     "bedrock-runtime",
     region_name=os.environ.get("AWS_REGION", "us-east-1"),
 )
 
 
-def call_llm(prompt: str, system: str = "") -> str:
-    """Call Claude via invoke_model and return the assistant text."""
-    model_id = os.environ.get(
-        "BEDROCK_INFERENCE_PROFILE_ID", "anthropic.claude-3-sonnet-20240229-v1:0"
-    )
+DEFAULT_MIN_CONFIDENCE = 0.8
+CACHE_CONTROL = {"type": "ephemeral"}
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+_usage: ContextVar[dict | None] = ContextVar("bedrock_usage", default=None)
+_usage_lock = threading.Lock()
+
+
+def _invoke(model_for: Callable[[dict], str], body: dict) -> dict:
+    """invoke_model through the endpoint pool if one is configured, else ``_client``.
+
+    ``model_for`` picks the model id given the endpoint (``{}`` for ``_client``).
+    """
+    kwargs = {
+        "body": json.dumps(body),
+        "contentType": "application/json",
+        "accept": "application/json",
+    }
+    endpoints = bedrock_pool.pool()
+    if endpoints:
+        response = bedrock_pool.invoke(endpoints, model_for, **kwargs)
+        return json.loads(response["body"])  # type: ignore[no-any-return]
+    response = _client.invoke_model(modelId=model_for({}), **kwargs)
+    return json.loads(response["body"].read())  # type: ignore[no-any-return]
+
+
+def default_model() -> str:
+    """The model id used when neither the call nor the endpoint names one."""
+    return os.environ.get("BEDROCK_INFERENCE_PROFILE_ID", "anthropic.claude-3-sonnet-20240229-v1:0")
+
 
+def llm_body(prompt: str, system: str = "", prefix: str = "", cache: bool = False) -> dict:
+    """Anthropic messages request body for ``call_llm`` (and batch records).
+
+    ``prefix`` is sent before ``prompt`` in the user turn.  With ``cache``,
+    the prefix ends in a prompt-cache breakpoint, so calls sharing the system
+    prompt and prefix re-read them from the cache instead of processing them
+    again.  A system prompt alone is below the minimum cacheable length, so
+    it gets no breakpoint of its own.
+    """
+    content: str | list[dict] = prefix + prompt
+    if cache and prefix:
+        content = [
+            {"type": "text", "text": prefix, "cache_control": CACHE_CONTROL},
+            {"type": "text", "text": prompt},
+        ]
     body: dict = {
         "anthropic_version": "bedrock-2023-05-31",
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": [{"role": "user", "content": content}],
         "max_tokens": 4096,
         "temperature": 0,
     }
 
     if system:
         body["system"] = system
+    return body
 
-    response = _client.invoke_model(
-        modelId=model_id,
-        body=json.dumps(body),
-        contentType="application/json",
-        accept="application/json",
-    )
 
-    result = json.loads(response["body"].read())
+def llm_text(result: dict) -> str:
+    """The assistant text of a parsed messages response."""
     return result["content"][0]["text"]  # type: ignore[no-any-return]
 
 
-def embed(text: str) -> list[float]:
-    """Generate an embedding vector via Titan."""
+def call_llm(
+    prompt: str,
+    system: str = "",
+    model_id: str | None = None,
+    prefix: str = "",
+    cache: bool = False,
+) -> str:
+    """Call Claude via invoke_model and return the assistant text.
+
+    ``model_id`` overrides ``BEDROCK_INFERENCE_PROFILE_ID`` (and any
+    endpoint's own inference profile) for this call.  ``prefix`` and
+    ``cache`` are as for ``llm_body``.
+    """
+    body = llm_body(prompt, system, prefix, cache)
+    start = time.monotonic()
+    result = _invoke(lambda endpoint: model_id or endpoint.get("model_id") or default_model(), body)
+    record_usage(result.get("usage") or {}, time.monotonic() - start)
+    return llm_text(result)
+
+
+@contextmanager
+def track_usage() -> Iterator[dict]:
+    """Total the token usage of every call_llm made inside the block (this context only).
+
+    Yields a dict of ``calls``, ``input_tokens``, ``output_tokens``,
+    ``cache_creation_input_tokens``, ``cache_read_input_tokens`` and
+    ``llm_seconds``, updated as calls complete.
+    """
+    totals: dict = {"calls": 0, **dict.fromkeys(USAGE_FIELDS, 0), "llm_seconds": 0.0}
+    token = _usage.set(totals)
+    try:
+        yield totals
+    finally:
+        _usage.reset(token)
+
+
+def record_usage(usage: dict, seconds: float) -> None:
+    """Add one call's usage to the totals of the enclosing ``track_usage`` block, if any."""
+    totals = _usage.get()
+    if totals is None:
+        return
+    # Calls fanned out to threads with copy_context share one totals dict.
+    with _usage_lock:
+        totals["calls"] += 1
+        for field in USAGE_FIELDS:
+            totals[field] += usage.get(field) or 0
+        totals["llm_seconds"] = round(totals["llm_seconds"] + seconds, 3)
+
+
+def model_route(config: dict, agent: str) -> dict:
+    """Models an agent calls, from the config's ``models`` block.
+
+    An entry is a model id, or a mapping with ``model``, an optional
+    ``cascade`` (a cheaper first-tier model tried before ``model``) and
+    ``min_confidence`` (the first tier's self-reported confidence needed to
+    accept its answer).  A missing ``model`` means the default model.
+    """
+    entry = (config.get("models") or {}).get(agent) or {}
+    if isinstance(entry, str):
+        entry = {"model": entry}
+    return {
+        "model": entry.get("model"),
+        "cascade": entry.get("cascade"),
+        "min_confidence": entry.get("min_confidence", DEFAULT_MIN_CONFIDENCE),
+    }
+
+
+def embedding_options(config: dict) -> dict:
+    """embed() keyword arguments from the config's ``embedding`` block.
+
+    Only settings that are present are returned, so an unconfigured
+    deployment keeps Titan's defaults (1024 dimensions, normalised).
+    """
+    embedding = config.get("embedding") or {}
+    return {key: embedding[key] for key in ("dimensions", "normalize") if key in embedding}
+
+
+def embed_options(dimensions: int | None = None, normalize: bool | None = None) -> dict:
+    """embed() keyword arguments for the settings that are given.
+
+    Search backends pass their options through this, so an unset setting is
+    never sent as an explicit None.
+    """
+    options = {"dimensions": dimensions, "normalize": normalize}
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def embed(text: str, dimensions: int | None = None, normalize: bool | None = None) -> list[float]:
+    """Generate an embedding vector via Titan.
+
+    Titan v2 accepts ``dimensions`` of 256, 512, or 1024 and a ``normalize``
+    flag; both are omitted from the request unless given.
+    """
     model_id = os.environ.get("BEDROCK_EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
 
-    response = _client.invoke_model(
-        modelId=model_id,
-        body=json.dumps({"inputText": text}),
-        accept="application/json",
-        contentType="application/json",
-    )
-    return json.loads(response["body"].read())["embedding"]  # type: ignore[no-any-return]
+    body: dict = {"inputText": text}
+    if dimensions is not None:
+        body["dimensions"] = dimensions
+    if normalize is not None:
+        body["normalize"] = normalize
+
+    return _invoke(lambda endpoint: model_id, body)["embedding"]  # type: ignore[no-any-return]
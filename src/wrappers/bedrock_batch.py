@@ -0,0 +1,196 @@
+"""Bedrock batch inference -- run a stage's LLM calls as one offline job.
+
+Enabled by a ``batch`` block in the config.  A stage's requests are written
+as JSONL records (``{"recordId", "modelInput"}``), submitted as a
+model-invocation job, polled until the job ends, and the outputs are mapped
+back to the requests by record id.  Batch jobs are priced below on-demand
+and draw on a separate quota, so large offline runs neither cost as much
+nor compete with interactive gates.
+
+The transport is pluggable through ``batch.transport``:
+
+* ``bedrock`` (default) stages the input in S3 under ``batch.s3_uri`` and
+  runs the job with ``batch.role_arn``.
+* ``local`` keeps the job files under ``batch.directory`` and answers each
+  record on the spot; tests patch ``_run_local``.
+
+Stages smaller than ``batch.min_records`` (Bedrock's per-job minimum, 100)
+and records the job failed fall back to on-demand ``call_llm``.
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import boto3
+
+from src.ingest.s3_source import parse_uri
+from src.wrappers import bedrock
+from src.wrappers.bedrock import call_llm, default_model, llm_body, llm_text, record_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 60.0
+DEFAULT_TIMEOUT = 24 * 3600.0
+DEFAULT_MIN_RECORDS = 100
+DONE = {"Completed", "PartiallyCompleted"}
+FAILED = {"Failed", "Stopped", "Expired"}
+INPUT_FILE = "input.jsonl"
+# Bedrock names each output file after its input file.
+OUTPUT_FILE = INPUT_FILE + ".out"
+
+
+@cache
+def _s3() -> Any:
+    return boto3.client("s3", region_name=os.environ.get("AWS_REGION", "us-east-1"))
+
+
+@cache
+def _control() -> Any:
+    # Batch jobs are managed by the control-plane client, not bedrock-runtime.
+    return boto3.client("bedrock", region_name=os.environ.get("AWS_REGION", "us-east-1"))
+
+
+def to_jsonl(rows: list[dict]) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def from_jsonl(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.decode().splitlines() if line.strip()]
+
+
+def records(bodies: list[dict]) -> list[dict]:
+    """Batch input records for request bodies; record ids keep the input order."""
+    return [{"recordId": f"{i:08d}", "modelInput": body} for i, body in enumerate(bodies)]
+
+
+def _bedrock_transport(batch: dict) -> dict[str, Callable]:
+    role_arn = batch.get("role_arn")
+    s3_uri = batch.get("s3_uri")
+    if not role_arn or not s3_uri:
+        raise ValueError("The bedrock batch transport requires batch.role_arn and batch.s3_uri.")
+    root = s3_uri.rstrip("/")
+
+    def submit(job_name: str, model_id: str, rows: list[dict]) -> str:
+        input_uri = f"{root}/{job_name}/{INPUT_FILE}"
+        bucket, key = parse_uri(input_uri)
+        _s3().put_object(Bucket=bucket, Key=key, Body=to_jsonl(rows))
+        response = _control().create_model_invocation_job(
+            jobName=job_name,
+            roleArn=role_arn,
+            modelId=model_id,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": input_uri, "s3InputFormat": "JSONL"}},
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"{root}/{job_name}/output/"}},
+        )
+        return response["jobArn"]  # type: ignore[no-any-return]
+
+    def status(job_arn: str) -> str:
+        job = _control().get_model_invocation_job(jobIdentifier=job_arn)
+        return job["status"]  # type: ignore[no-any-return]
+
+    def results(job_arn: str) -> list[dict]:
+        job = _control().get_model_invocation_job(jobIdentifier=job_arn)
+        output_uri = job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"].rstrip("/")
+        # Outputs land under a folder named after the job id, the ARN's last part.
+        bucket, key = parse_uri(f"{output_uri}/{job_arn.rsplit('/', 1)[-1]}/{OUTPUT_FILE}")
+        return from_jsonl(_s3().get_object(Bucket=bucket, Key=key)["Body"].read())
+
+    return {"submit": submit, "status": status, "results": results}
+
+
+def _run_local(model_id: str, body: dict) -> dict:
+    return bedrock._invoke(lambda endpoint: model_id, body)
+
+
+def _local_transport(batch: dict) -> dict[str, Callable]:
+    if not batch.get("directory"):
+        raise ValueError("The local batch transport requires batch.directory.")
+    root = Path(batch["directory"])
+
+    def submit(job_name: str, model_id: str, rows: list[dict]) -> str:
+        job_dir = root / job_name
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / INPUT_FILE).write_bytes(to_jsonl(rows))
+        outputs = []
+        for row in rows:
+            try:
+                outputs.append({**row, "modelOutput": _run_local(model_id, row["modelInput"])})
+            except Exception as exc:
+                outputs.append({**row, "error": {"errorMessage": str(exc)}})
+        (job_dir / OUTPUT_FILE).write_bytes(to_jsonl(outputs))
+        return str(job_dir)
+
+    def status(job_dir: str) -> str:
+        return "Completed" if (Path(job_dir) / OUTPUT_FILE).exists() else "InProgress"
+
+    def results(job_dir: str) -> list[dict]:
+        return from_jsonl((Path(job_dir) / OUTPUT_FILE).read_bytes())
+
+    return {"submit": submit, "status": status, "results": results}
+
+
+def transport(batch: dict) -> dict[str, Callable]:
+    """``submit``, ``status`` and ``results`` functions of ``batch.transport``."""
+    name = batch.get("transport", "bedrock")
+    if name == "bedrock":
+        return _bedrock_transport(batch)
+    if name == "local":
+        return _local_transport(batch)
+    raise ValueError(f"Unknown batch transport: {name}")
+
+
+def run_job(bodies: list[dict], model_id: str, batch: dict, stage: str) -> list[dict | None]:
+    """Run request bodies as one batch job; parsed outputs in input order.
+
+    A record the job failed is None.  Raises RuntimeError if the job itself
+    fails and TimeoutError if it outlasts ``batch.timeout`` seconds.
+    """
+    functions = transport(batch)
+    rows = records(bodies)
+    job_name = f"llm-gate-{stage}-{uuid4().hex[:12]}"
+    job = functions["submit"](job_name, model_id, rows)
+    logger.info("Submitted batch job %s with %d records", job_name, len(rows))
+
+    deadline = time.monotonic() + batch.get("timeout", DEFAULT_TIMEOUT)
+    while (status := functions["status"](job)) not in DONE:
+        if status in FAILED:
+            raise RuntimeError(f"Batch job {job_name} ended with status {status}.")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch job {job_name} did not finish in time.")
+        time.sleep(batch.get("poll_interval", DEFAULT_POLL_INTERVAL))
+
+    outputs = {row["recordId"]: row.get("modelOutput") for row in functions["results"](job)}
+    return [outputs.get(row["recordId"]) for row in rows]
+
+
+def complete(requests: list[dict], model_id: str | None, batch: dict, stage: str) -> list[str]:
+    """Assistant text for each request (``llm_body`` keyword arguments), in order.
+
+    ``model_id`` None means the default model.  Usage is recorded as for
+    ``call_llm``.
+    """
+    if len(requests) < batch.get("min_records", DEFAULT_MIN_RECORDS):
+        return [call_llm(**request, model_id=model_id) for request in requests]
+
+    bodies = [llm_body(**request) for request in requests]
+    outputs = run_job(bodies, model_id or default_model(), batch, stage)
+    failed = sum(output is None for output in outputs)
+    if failed:
+        logger.warning(
+            "Batch job failed %d of %d records; retrying them on demand", failed, len(outputs)
+        )
+
+    texts = []
+    for request, output in zip(requests, outputs, strict=True):
+        if output is None:
+            texts.append(call_llm(**request, model_id=model_id))
+            continue
+        record_usage(output.get("usage") or {}, 0.0)
+        texts.append(llm_text(output))
+    return texts
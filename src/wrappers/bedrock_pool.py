@@ -0,0 +1,207 @@
+"""Bedrock endpoint pool -- spread calls over several regions/inference profiles.
+
+Configured with ``BEDROCK_ENDPOINTS``, a JSON list such as::
+
+    [{"region": "us-east-1", "weight": 2},
+     {"region": "us-west-2", "model_id": "us.anthropic.claude-3-5-sonnet-20240620-v1:0"}]
+
+Each call goes to the healthy endpoint with the fewest outstanding requests
+per unit of ``weight``.  A slow region holds its requests longer, so it is
+sent proportionally fewer; latency is tracked per endpoint for ``stats``.
+An endpoint that throttles or cannot be reached cools down with exponential
+backoff while the call fails over to the next best endpoint, so aggregate
+throughput is the sum of the regions' quotas and one slow region does not
+stall a run.
+
+Pool clients make a single attempt per call; failing over to another
+region beats retrying a throttled one.  A cooling endpoint is never called
+early: when only cooling endpoints are left, the call sleeps until the
+first one recovers.  After every endpoint has failed the call goes round
+the pool again, up to ``MAX_ROUNDS`` passes, and it waits for at most
+``MAX_WAIT`` seconds in all.  ``configure`` accepts ready-made clients,
+which is how tests run the pool against local stubs.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError, ReadTimeoutError
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+COOLDOWN_BASE = 1.0
+COOLDOWN_CAP = 30.0
+LATENCY_SMOOTHING = 0.2
+MAX_ROUNDS = 4
+MAX_WAIT = 60.0
+
+_lock = threading.Lock()
+_pool: list[dict] | None = None
+_configured = False
+
+
+def new_endpoint(
+    region: str, weight: float = 1.0, model_id: str | None = None, client: Any = None
+) -> dict:
+    """Endpoint state; ``client`` defaults to a single-attempt bedrock-runtime client."""
+    if client is None:
+        client = boto3.client(
+            "bedrock-runtime",
+            region_name=region,
+            config=Config(retries={"max_attempts": 1, "mode": "standard"}),
+        )
+    return {
+        "region": region,
+        "weight": float(weight),
+        "model_id": model_id,
+        "client": client,
+        "outstanding": 0,
+        "latency": None,
+        "cooldown_until": 0.0,
+        "failures": 0,
+        "requests": 0,
+        "failovers": 0,
+    }
+
+
+def configure(endpoints: list[dict] | None) -> None:
+    """Replace the pool; each entry holds ``new_endpoint`` keyword arguments."""
+    global _pool, _configured
+    with _lock:
+        _pool = [new_endpoint(**entry) for entry in endpoints] if endpoints else None
+        _configured = True
+
+
+def pool() -> list[dict] | None:
+    """The configured pool, read from ``BEDROCK_ENDPOINTS`` on first use; None if unset."""
+    if not _configured:
+        raw = os.environ.get("BEDROCK_ENDPOINTS")
+        configure(json.loads(raw) if raw else None)
+    return _pool
+
+
+def _pick(endpoints: list[dict], now: float) -> dict | None:
+    """The best healthy endpoint, or None if all of them are cooling down."""
+    healthy = [e for e in endpoints if e["cooldown_until"] <= now]
+    if not healthy:
+        return None
+    # Least outstanding per weight; under sequential load (no outstanding calls)
+    # the fewest requests per weight, i.e. weighted round-robin.
+    return min(
+        healthy,
+        key=lambda e: (e["outstanding"] / e["weight"], e["requests"] / e["weight"]),
+    )
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code") in THROTTLE_CODES
+    return isinstance(exc, (ConnectionError, ReadTimeoutError))
+
+
+def invoke(endpoints: list[dict], model_for: Callable[[dict], str], **kwargs: Any) -> dict:
+    """invoke_model on the best endpoint, failing over on throttling or outages.
+
+    ``model_for`` maps the chosen endpoint to the model id to call.  The
+    response body is read before returning, as ``{"body": bytes}``.  When
+    only cooling endpoints are left the call sleeps until the first recovers,
+    and once every endpoint has failed it goes round the pool again, within
+    ``MAX_ROUNDS`` and ``MAX_WAIT``.
+    """
+    if not endpoints:
+        raise ValueError("The Bedrock endpoint pool is empty.")
+    tried: set[int] = set()
+    last_error: Exception | None = None
+    rounds = 1
+    deadline = time.monotonic() + MAX_WAIT
+    while True:
+        with _lock:
+            now = time.monotonic()
+            untried = [e for e in endpoints if id(e) not in tried]
+            if not untried and rounds < MAX_ROUNDS:
+                tried.clear()
+                rounds += 1
+                untried = endpoints
+            if not untried:
+                break
+            endpoint = _pick(untried, now)
+            if endpoint is None:
+                wait = min(e["cooldown_until"] for e in untried) - now
+            else:
+                tried.add(id(endpoint))
+                endpoint["outstanding"] += 1
+                endpoint["requests"] += 1
+        if endpoint is None:
+            if now + wait > deadline:
+                break
+            logger.info("Every Bedrock endpoint is cooling down; waiting %.1fs", wait)
+            time.sleep(wait)
+            continue
+
+        start = time.monotonic()
+        try:
+            response = endpoint["client"].invoke_model(modelId=model_for(endpoint), **kwargs)
+            body = response["body"].read()
+        except Exception as exc:
+            with _lock:
+                endpoint["outstanding"] -= 1
+                if not _is_retryable(exc):
+                    raise
+                endpoint["failures"] += 1
+                endpoint["failovers"] += 1
+                cooldown = min(COOLDOWN_BASE * 2 ** (endpoint["failures"] - 1), COOLDOWN_CAP)
+                endpoint["cooldown_until"] = time.monotonic() + cooldown
+            logger.warning(
+                "Bedrock endpoint %s unavailable (%s); cooling down %.1fs",
+                endpoint["region"],
+                exc,
+                cooldown,
+            )
+            last_error = exc
+            continue
+
+        elapsed = time.monotonic() - start
+        with _lock:
+            endpoint["outstanding"] -= 1
+            endpoint["failures"] = 0
+            previous = endpoint["latency"]
+            endpoint["latency"] = (
+                elapsed if previous is None else previous + LATENCY_SMOOTHING * (elapsed - previous)
+            )
+        return {"body": body}
+
+    if last_error is None:
+        raise TimeoutError("Every Bedrock endpoint is cooling down.")
+    raise last_error
+
+
+def stats() -> list[dict]:
+    """Per-endpoint health, load and latency, for logs and dashboards."""
+    now = time.monotonic()
+    with _lock:
+        return [
+            {
+                "region": e["region"],
+                "model_id": e["model_id"],
+                "weight": e["weight"],
+                "healthy": e["cooldown_until"] <= now,
+                "outstanding": e["outstanding"],
+                "requests": e["requests"],
+                "failovers": e["failovers"],
+                "latency_ms": None if e["latency"] is None else round(e["latency"] * 1000, 1),
+            }
+            for e in _pool or []
+        ]
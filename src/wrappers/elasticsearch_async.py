@@ -0,0 +1,91 @@
+"""Async Elasticsearch helper -- the search helpers for async callers.
+
+Same queries and transport settings as ``elasticsearch_helper`` (pool size,
+compression, timeouts, retries with backoff), over an ``AsyncElasticsearch``
+client on the httpx async transport.  An async client's connection pool
+belongs to the event loop that created it, so there is one client per
+running loop.  Code running in worker threads uses the synchronous helpers,
+whose pool is shared and thread-safe.
+
+The retrieval cache is not consulted here; it stays with the sync helpers.
+"""
+
+import asyncio
+import weakref
+
+from elastic_transport import HttpxAsyncHttpNode
+from elasticsearch import AsyncElasticsearch
+
+from src.wrappers.bedrock import embed, embed_options
+from src.wrappers.elasticsearch_helper import (
+    check_embedding_dims,
+    client_options,
+    knn_clause,
+    match_query,
+    sources,
+)
+
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncElasticsearch] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def client() -> AsyncElasticsearch:
+    """The async client for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    es = _clients.get(loop)
+    if es is None:
+        es = AsyncElasticsearch(**client_options(), node_class=HttpxAsyncHttpNode)
+        _clients[loop] = es
+    return es
+
+
+async def close_client() -> None:
+    """Close the running loop's client and its pooled connections."""
+    es = _clients.pop(asyncio.get_running_loop(), None)
+    if es is not None:
+        await es.close()
+
+
+async def index_doc(index: str, doc_id: str, body: dict) -> None:
+    await client().index(index=index, id=doc_id, document=body)
+
+
+async def search_docs(
+    query: str,
+    index: str = "trusted_docs",
+    filters: dict | None = None,
+    size: int | None = None,
+) -> list[dict]:
+    kwargs: dict = {"size": size} if size is not None else {}
+    response = await client().search(index=index, query=match_query(query, filters), **kwargs)
+    return sources(response)
+
+
+async def knn_search(
+    vector: list[float],
+    index: str = "trusted_docs",
+    k: int = 5,
+    filters: dict | None = None,
+    num_candidates: int = 100,
+) -> list[dict]:
+    # The dimension lookup is cached after the first call per index.
+    await asyncio.to_thread(check_embedding_dims, index, vector)
+    response = await client().search(
+        index=index, knn=knn_clause(vector, k, filters, num_candidates)
+    )
+    return sources(response)
+
+
+async def vector_search(
+    text: str,
+    index: str = "trusted_docs",
+    k: int = 5,
+    filters: dict | None = None,
+    num_candidates: int = 100,
+    dimensions: int | None = None,
+    normalize: bool | None = None,
+) -> list[dict]:
+    """Embed text (in a worker thread; Bedrock is synchronous) and kNN search."""
+    vector = await asyncio.to_thread(embed, text, **embed_options(dimensions, normalize))
+    return await knn_search(vector, index, k, filters, num_candidates)
@@ -1,39 +1,453 @@
 """Elasticsearch helper -- keyword and vector search against trusted docs."""
 
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
 
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, helpers
 
-from src.wrappers.bedrock import embed
+from src.wrappers.bedrock import embed, embed_options
 
 _hosts = [os.environ.get("ES_HOST", "http://localhost:9200")]
 _api_key = os.environ.get("ES_API_KEY")
 
-_kwargs: dict = {"hosts": _hosts}
-if _api_key:
-    _kwargs["api_key"] = _api_key
 
-es = Elasticsearch(**_kwargs)
+def client_options() -> dict:
+    """Transport settings shared by the sync client and the async clients.
+
+    Pooled connections are persistent, so a pool of ``ES_MAX_CONNECTIONS``
+    per node keeps that many keep-alive connections open; callers beyond it
+    wait for a free connection instead of opening new ones.  Timeouts and
+    429/502/503/504 responses are retried ``ES_MAX_RETRIES`` times with
+    jittered exponential backoff.
+    """
+    options: dict = {
+        "hosts": _hosts,
+        "connections_per_node": int(os.environ.get("ES_MAX_CONNECTIONS", "25")),
+        "http_compress": os.environ.get("ES_HTTP_COMPRESS", "true").lower() == "true",
+        "request_timeout": float(os.environ.get("ES_REQUEST_TIMEOUT", "10")),
+        "max_retries": int(os.environ.get("ES_MAX_RETRIES", "3")),
+        "retry_on_timeout": True,
+        "retry_on_status": (429, 502, 503, 504),
+        "retry_backoff_base": float(os.environ.get("ES_RETRY_BACKOFF", "0.2")),
+        "retry_backoff_cap": 5.0,
+    }
+    if _api_key:
+        options["api_key"] = _api_key
+    return options
+
+
+es = Elasticsearch(**client_options())
+
+# Retrieval cache: an in-process LRU (ES_CACHE_SIZE entries, 0 = off) and an
+# optional shared directory tier (ES_CACHE_DIR), both expiring after
+# ES_CACHE_TTL seconds.  Keys include the index generation, which is
+# re-resolved at most every ES_CACHE_GENERATION_TTL seconds.  Expired disk
+# entries are pruned on write, at most once per TTL per process, since keys
+# from an old generation are never read again.
+_cache_size = int(os.environ.get("ES_CACHE_SIZE", "0"))
+_cache_ttl = float(os.environ.get("ES_CACHE_TTL", "300"))
+_cache_dir = os.environ.get("ES_CACHE_DIR")
+_generation_ttl = float(os.environ.get("ES_CACHE_GENERATION_TTL", "10"))
+
+_cache: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+_generations: dict[str, tuple[float, str]] = {}
+_cache_lock = threading.Lock()
+_last_prune: float | None = None
 
 
 def index_doc(index: str, doc_id: str, body: dict) -> None:
     es.index(index=index, id=doc_id, document=body)
 
 
-def search_docs(query: str, index: str = "trusted_docs") -> list[dict]:
-    response = es.search(index=index, query={"match": {"content": query}})
-    return [hit["_source"] for hit in response["hits"]["hits"]]
+def bulk_index(index: str, docs: list[tuple[str, dict]]) -> None:
+    actions = [{"_index": index, "_id": doc_id, "_source": body} for doc_id, body in docs]
+    helpers.bulk(es, actions)
+
+
+# Adds params.values to a list field, sorted and without repeats; a no-op
+# when nothing is new, so unchanged documents are not rewritten.
+_ADD_VALUES_SCRIPT = """
+def values = ctx._source[params.field];
+if (values == null) { values = new ArrayList(); }
+boolean changed = false;
+for (def value : params.values) {
+  if (!values.contains(value)) { values.add(value); changed = true; }
+}
+if (changed) { Collections.sort(values); ctx._source[params.field] = values; }
+else { ctx.op = 'noop'; }
+"""
+
+
+def bulk_add_values(index: str, field: str, updates: list[tuple[str, list[str]]]) -> None:
+    """Merge values into a list field of each document, keeping what is already there."""
+    actions = [
+        {
+            "_op_type": "update",
+            "_index": index,
+            "_id": doc_id,
+            "script": {
+                "source": _ADD_VALUES_SCRIPT,
+                "lang": "painless",
+                "params": {"field": field, "values": values},
+            },
+        }
+        for doc_id, values in updates
+    ]
+    helpers.bulk(es, actions)
+
+
+def get_doc(index: str, doc_id: str) -> dict | None:
+    response = es.options(ignore_status=404).get(index=index, id=doc_id)
+    return response["_source"] if response.get("found") else None  # type: ignore[no-any-return]
+
+
+def top_doc(index: str, field: str, value: str, sort_field: str) -> dict | None:
+    """The document with ``field == value`` and the highest ``sort_field``, if any."""
+    response = es.options(ignore_status=404).search(
+        index=index, query={"term": {field: value}}, sort=[{sort_field: "desc"}], size=1
+    )
+    hits = response.get("hits", {}).get("hits", [])
+    return hits[0]["_source"] if hits else None
+
+
+def delete_doc(index: str, doc_id: str) -> None:
+    es.options(ignore_status=404).delete(index=index, id=doc_id)
+
+
+def bulk_delete(index: str, doc_ids: list[str]) -> None:
+    """Delete documents in bulk requests; ids already gone are not an error."""
+    actions = [{"_op_type": "delete", "_index": index, "_id": doc_id} for doc_id in doc_ids]
+    helpers.bulk(es, actions, ignore_status=404)
+
+
+def existing_ids(index: str, doc_ids: list[str]) -> set[str]:
+    if not doc_ids:
+        return set()
+    response = es.options(ignore_status=404).mget(index=index, ids=doc_ids, source=False)
+    return {doc["_id"] for doc in response.get("docs", []) if doc.get("found")}
+
+
+def scan_docs(index: str) -> Iterator[dict]:
+    """Every document source in the index, streamed with a scroll."""
+    for hit in helpers.scan(es, index=index, query={"query": {"match_all": {}}}):
+        yield hit["_source"]
 
 
-def vector_search(text: str, index: str = "trusted_docs", k: int = 5) -> list[dict]:
-    vector = embed(text)
-    response = es.search(
-        index=index,
-        knn={
-            "field": "embedding",
-            "query_vector": vector,
-            "k": k,
-            "num_candidates": 100,
-        },
+def get_index_settings(index: str) -> dict | None:
+    response = es.options(ignore_status=404).indices.get_settings(index=index, flat_settings=True)
+    if "error" in response:
+        return None
+    return next(iter(response.values()))["settings"]  # type: ignore[no-any-return]
+
+
+def put_index_settings(index: str, settings: dict) -> None:
+    es.indices.put_settings(index=index, settings=settings)
+
+
+def refresh_index(index: str) -> None:
+    es.indices.refresh(index=index)
+
+
+def force_merge(index: str, max_num_segments: int) -> None:
+    es.options(request_timeout=3600).indices.forcemerge(
+        index=index, max_num_segments=max_num_segments
     )
+
+
+def list_indices(pattern: str) -> list[str]:
+    response = es.options(ignore_status=404).indices.get(index=pattern)
+    if "error" in response:
+        return []
+    return sorted(response)
+
+
+def alias_target(alias: str) -> str | None:
+    """Concrete index behind an alias (the name itself for a plain index)."""
+    indices = list_indices(alias)
+    return indices[-1] if indices else None
+
+
+def get_mappings(index: str) -> dict:
+    response = es.indices.get_mapping(index=index)
+    return next(iter(response.values()))["mappings"]  # type: ignore[no-any-return]
+
+
+def create_index(index: str, mappings: dict | None = None) -> None:
+    if mappings:
+        es.indices.create(index=index, mappings=mappings)
+    else:
+        es.indices.create(index=index)
+
+
+def ensure_index(index: str, mappings: dict) -> None:
+    """Create index with mappings, or add any missing fields to an existing one."""
+    if es.indices.exists(index=index):
+        es.indices.put_mapping(index=index, **mappings)
+    else:
+        es.indices.create(index=index, mappings=mappings)
+
+
+def delete_index(index: str) -> None:
+    es.options(ignore_status=404).indices.delete(index=index)
+
+
+def copy_index(source: str, dest: str) -> None:
+    es.options(request_timeout=3600).reindex(
+        source={"index": source}, dest={"index": dest}, wait_for_completion=True
+    )
+
+
+def swap_alias(alias: str, index: str, previous: str | None) -> None:
+    """Atomically point alias at index, detaching it from (or replacing) previous."""
+    actions: list[dict] = [{"add": {"index": index, "alias": alias}}]
+    if previous == alias:
+        actions.insert(0, {"remove_index": {"index": alias}})
+    elif previous:
+        actions.insert(0, {"remove": {"index": previous, "alias": alias}})
+    es.indices.update_aliases(actions=actions)
+
+
+def filter_clauses(filters: dict) -> list[dict]:
+    """Term filters from ``{field: value}``; a list value matches any of its items."""
+    return [
+        {"terms": {field: value}} if isinstance(value, list) else {"term": {field: value}}
+        for field, value in filters.items()
+    ]
+
+
+def match_query(query: str, filters: dict | None = None) -> dict:
+    """``match`` on content, wrapped in a bool query when there are filters."""
+    match = {"match": {"content": query}}
+    if filters:
+        return {"bool": {"must": [match], "filter": filter_clauses(filters)}}
+    return match
+
+
+def knn_clause(
+    vector: list[float], k: int, filters: dict | None = None, num_candidates: int = 100
+) -> dict:
+    """kNN clause on ``embedding``; ``filters`` apply inside it."""
+    knn: dict = {
+        "field": "embedding",
+        "query_vector": vector,
+        "k": k,
+        "num_candidates": max(num_candidates, k),
+    }
+    if filters:
+        knn["filter"] = filter_clauses(filters)
+    return knn
+
+
+def sources(response: Any) -> list[dict]:
     return [hit["_source"] for hit in response["hits"]["hits"]]
+
+
+def index_generation(index: str) -> str:
+    """Concrete index behind ``index`` plus its ingest generation marker.
+
+    Changes when a blue/green alias is swapped or an ingest bumps the
+    marker, so cache keys built from it never match pre-ingest results.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _generations.get(index)
+    if cached and now - cached[0] < _generation_ttl:
+        return cached[1]
+
+    response = es.options(ignore_status=404).indices.get_mapping(index=index)
+    if "error" in response:
+        generation = "missing"
+    else:
+        concrete = sorted(response)[-1]
+        meta = response[concrete]["mappings"].get("_meta", {})
+        generation = f"{concrete}@{meta.get('ingest_generation', '')}"
+    with _cache_lock:
+        _generations[index] = (now, generation)
+    return generation
+
+
+def bump_generation(index: str) -> None:
+    """Mark the index as changed so every cached result for it goes stale."""
+    es.indices.put_mapping(index=index, meta={"ingest_generation": uuid4().hex})
+    invalidate_cache()
+
+
+def invalidate_cache() -> None:
+    """Drop this process's cached results and generation lookups."""
+    with _cache_lock:
+        _cache.clear()
+        _generations.clear()
+
+
+def _read_disk_cache(key: str) -> list[dict] | None:
+    path = Path(_cache_dir or "") / f"{key}.json"
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry["stored"] >= _cache_ttl:
+        path.unlink(missing_ok=True)
+        return None
+    return entry["results"]  # type: ignore[no-any-return]
+
+
+def _prune_disk_cache(directory: Path) -> None:
+    """Delete entries (and abandoned temp files) older than the TTL."""
+    global _last_prune
+    now = time.monotonic()
+    with _cache_lock:
+        if _last_prune is not None and now - _last_prune < _cache_ttl:
+            return
+        _last_prune = now
+
+    cutoff = time.time() - _cache_ttl
+    for path in directory.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+        except OSError:
+            continue
+
+
+def _write_disk_cache(key: str, results: list[dict]) -> None:
+    directory = Path(_cache_dir or "")
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f"{key}.{uuid4().hex}.tmp"
+    tmp_path.write_text(json.dumps({"stored": time.time(), "results": results}), encoding="utf-8")
+    os.replace(tmp_path, directory / f"{key}.json")
+    _prune_disk_cache(directory)
+
+
+def _cached(index: str, params: dict, search: Callable[[], list[dict]]) -> list[dict]:
+    """Serve a search from the memory or disk tier, or run it and store the results."""
+    if not _cache_size and not _cache_dir:
+        return search()
+
+    params = {**params, "index": index, "generation": index_generation(index)}
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and now - entry[0] < _cache_ttl:
+            _cache.move_to_end(key)
+            return entry[1]
+
+    results = _read_disk_cache(key) if _cache_dir else None
+    if results is None:
+        results = search()
+        if _cache_dir:
+            _write_disk_cache(key, results)
+
+    if _cache_size:
+        with _cache_lock:
+            _cache[key] = (now, results)
+            _cache.move_to_end(key)
+            while len(_cache) > _cache_size:
+                _cache.popitem(last=False)
+    return results
+
+
+def search_docs(
+    query: str,
+    index: str = "trusted_docs",
+    filters: dict | None = None,
+    size: int | None = None,
+) -> list[dict]:
+    def search() -> list[dict]:
+        kwargs: dict = {"size": size} if size is not None else {}
+        response = es.search(index=index, query=match_query(query, filters), **kwargs)
+        return sources(response)
+
+    # The match query's analyzer lowercases and splits on whitespace anyway.
+    normalised = " ".join(query.lower().split())
+    params = {"search": "match", "query": normalised, "filters": filters, "size": size}
+    return _cached(index, params, search)
+
+
+_embedding_dims: dict[str, int | None] = {}
+
+
+def embedding_dims(index: str, refresh: bool = False) -> int | None:
+    """Dimension of the index's ``embedding`` field (cached), or None if unmapped."""
+    if refresh or index not in _embedding_dims:
+        response = es.options(ignore_status=404).indices.get_field_mapping(
+            index=index, fields="embedding"
+        )
+        dims = None
+        if "error" not in response:
+            for mapping in response.values():
+                field = mapping["mappings"].get("embedding")
+                if field:
+                    dims = field["mapping"]["embedding"].get("dims")
+        _embedding_dims[index] = dims
+    return _embedding_dims[index]
+
+
+def check_embedding_dims(index: str, vector: list[float]) -> None:
+    """Refuse to query an index whose vectors have a different dimension.
+
+    A mismatch is re-checked against a fresh mapping once, in case a
+    blue/green alias moved to a generation built with new settings.
+    """
+    dims = embedding_dims(index)
+    if dims is not None and dims != len(vector):
+        dims = embedding_dims(index, refresh=True)
+    if dims is not None and dims != len(vector):
+        raise ValueError(
+            f"Index {index} holds {dims}-dimension embeddings but the query embedding "
+            f"has {len(vector)}; check the embedding config matches the ingest."
+        )
+
+
+def knn_search(
+    vector: list[float],
+    index: str = "trusted_docs",
+    k: int = 5,
+    filters: dict | None = None,
+    num_candidates: int = 100,
+) -> list[dict]:
+    """kNN search for an embedded query; ``filters`` apply inside the kNN clause."""
+    check_embedding_dims(index, vector)
+    response = es.search(index=index, knn=knn_clause(vector, k, filters, num_candidates))
+    return sources(response)
+
+
+def vector_search(
+    text: str,
+    index: str = "trusted_docs",
+    k: int = 5,
+    filters: dict | None = None,
+    num_candidates: int = 100,
+    dimensions: int | None = None,
+    normalize: bool | None = None,
+) -> list[dict]:
+    """Embed text and kNN search; ``filters`` are applied inside the kNN clause.
+
+    ``dimensions`` and ``normalize`` must match the settings the index was
+    built with.  A cache hit skips the embedding call as well as the search.
+    """
+
+    def search() -> list[dict]:
+        vector = embed(text, **embed_options(dimensions, normalize))
+        return knn_search(vector, index, k, filters, num_candidates)
+
+    # Case can change the embedding, so only whitespace is normalised.
+    params = {
+        "search": "knn",
+        "query": " ".join(text.split()),
+        "k": k,
+        "filters": filters,
+        "num_candidates": num_candidates,
+        "dimensions": dimensions,
+        "normalize": normalize,
+    }
+    return _cached(index, params, search)
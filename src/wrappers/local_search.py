@@ -0,0 +1,279 @@
+"""Local search -- in-process keyword and vector search over a snapshot file.
+
+Drop-in replacement for the ``search_docs``/``vector_search`` pair in
+``elasticsearch_helper`` when ``retrieval.backend`` is ``local``: ``index``
+is the path of a snapshot exported by the ingest, and no Elasticsearch
+cluster is needed.  Keyword search is BM25 over an inverted index built when
+the snapshot is loaded; vector search is exact brute-force similarity over
+the memory-mapped embedding matrix.
+
+Snapshot layout: an 8-byte magic, a little-endian uint64 header length, a
+JSON header (``dims``, ``count``, ``chunks`` -- every chunk's source without
+its embedding), zero padding to a 64-byte boundary, then a ``count x dims``
+float32 matrix.
+"""
+
+import json
+import math
+import os
+import re
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from src.wrappers.bedrock import embed, embed_options
+
+SNAPSHOT_MAGIC = b"LRGSNAP1"
+KEYWORD_RESULTS = 10  # Elasticsearch's default search size
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_ALIGNMENT = 64
+_TOKEN_RE = re.compile(r"\w+")
+_snapshots: dict[str, tuple[int, dict]] = {}
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def write_snapshot(path: str, docs: Iterable[dict]) -> int:
+    """Write docs (sources with an ``embedding``) to a snapshot file; return the count.
+
+    The file is written next to ``path`` and renamed into place, so readers
+    that already mapped the previous snapshot are unaffected.
+    """
+    chunks = []
+    vectors = []
+    for doc in docs:
+        source = dict(doc)
+        vectors.append(source.pop("embedding"))
+        chunks.append(source)
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(chunks), -1 if chunks else 0)
+
+    header = json.dumps({"dims": matrix.shape[1], "count": len(chunks), "chunks": chunks}).encode(
+        "utf-8"
+    )
+    prefix = len(SNAPSHOT_MAGIC) + 8 + len(header)
+    padding = -prefix % _ALIGNMENT
+
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(SNAPSHOT_MAGIC)
+        fh.write(struct.pack("<Q", len(header)))
+        fh.write(header)
+        fh.write(b"\0" * padding)
+        fh.write(matrix.tobytes())
+    os.replace(tmp_path, file_path)
+    return len(chunks)
+
+
+def _build_bm25(chunks: list[dict]) -> dict:
+    postings: dict[str, dict[int, int]] = {}
+    lengths = np.zeros(len(chunks), dtype=np.float32)
+    for doc, chunk in enumerate(chunks):
+        tokens = tokenize(chunk.get("content", ""))
+        lengths[doc] = len(tokens)
+        for token in tokens:
+            counts = postings.setdefault(token, {})
+            counts[doc] = counts.get(doc, 0) + 1
+    return {
+        "postings": {
+            term: (
+                np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)),
+                np.fromiter(counts.values(), dtype=np.float32, count=len(counts)),
+            )
+            for term, counts in postings.items()
+        },
+        "lengths": lengths,
+        "avg_length": float(lengths.mean()) if len(chunks) else 0.0,
+    }
+
+
+def load_snapshot(path: str) -> dict:
+    """Load (or reuse) the snapshot at path; a re-exported file is reloaded."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _snapshots.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "rb") as fh:
+        if fh.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a retrieval snapshot: {path}")
+        (header_length,) = struct.unpack("<Q", fh.read(8))
+        header = json.loads(fh.read(header_length))
+    offset = len(SNAPSHOT_MAGIC) + 8 + header_length
+    offset += -offset % _ALIGNMENT
+
+    count, dims = header["count"], header["dims"]
+    vectors = (
+        np.memmap(path, dtype=np.float32, mode="r", offset=offset, shape=(count, dims))
+        if count
+        else np.zeros((0, dims), dtype=np.float32)
+    )
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+
+    snapshot = {
+        "chunks": header["chunks"],
+        "vectors": vectors,
+        "norms": norms,
+        "dims": dims,
+        "bm25": _build_bm25(header["chunks"]),
+        "masks": {},
+    }
+    _snapshots[path] = (mtime, snapshot)
+    return snapshot
+
+
+def _matches(value: object, wanted: object) -> bool:
+    values = value if isinstance(value, list) else [value]
+    options = wanted if isinstance(wanted, list) else [wanted]
+    return any(v in options for v in values)
+
+
+def _filter_mask(snapshot: dict, filters: dict | None) -> np.ndarray | None:
+    """Boolean mask of chunks matching every filter (term semantics), cached per filter."""
+    if not filters:
+        return None
+    key = json.dumps(filters, sort_keys=True)
+    if key not in snapshot["masks"]:
+        snapshot["masks"][key] = np.array(
+            [
+                all(_matches(chunk.get(field), wanted) for field, wanted in filters.items())
+                for chunk in snapshot["chunks"]
+            ],
+            dtype=bool,
+        )
+    return snapshot["masks"][key]  # type: ignore[no-any-return]
+
+
+def _top(snapshot: dict, scores: np.ndarray, k: int) -> list[dict]:
+    """The k best-scoring chunks, with their embedding, like an Elasticsearch ``_source``."""
+    k = min(k, int(np.count_nonzero(np.isfinite(scores))))
+    if k <= 0:
+        return []
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [{**snapshot["chunks"][i], "embedding": snapshot["vectors"][i].tolist()} for i in best]
+
+
+def bm25_scores(snapshot: dict, query: str) -> np.ndarray:
+    bm25 = snapshot["bm25"]
+    count = len(snapshot["chunks"])
+    scores = np.zeros(count, dtype=np.float32)
+    for term in tokenize(query):
+        posting = bm25["postings"].get(term)
+        if posting is None:
+            continue
+        docs, freqs = posting
+        idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+        lengths = bm25["lengths"][docs] / (bm25["avg_length"] or 1.0)
+        scores[docs] += (
+            idf * freqs * (BM25_K1 + 1) / (freqs + BM25_K1 * (1 - BM25_B + BM25_B * lengths))
+        )
+    return scores
+
+
+def keyword_ranking(
+    snapshot: dict, query: str, size: int, filters: dict | None = None
+) -> list[dict]:
+    scores = bm25_scores(snapshot, query)
+    scores[scores <= 0] = -np.inf
+    mask = _filter_mask(snapshot, filters)
+    if mask is not None:
+        scores[~mask] = -np.inf
+    return _top(snapshot, scores, size)
+
+
+def vector_ranking(
+    snapshot: dict, vector: np.ndarray, k: int, filters: dict | None = None
+) -> list[dict]:
+    scores = (snapshot["vectors"] @ vector) / (snapshot["norms"] * (np.linalg.norm(vector) or 1.0))
+    mask = _filter_mask(snapshot, filters)
+    if mask is not None:
+        scores = np.where(mask, scores, -np.inf)
+    return _top(snapshot, scores, k)
+
+
+def search_docs(
+    query: str, index: str, filters: dict | None = None, size: int | None = None
+) -> list[dict]:
+    """BM25 keyword search; like a ``match`` query, only chunks sharing a term are returned."""
+    return keyword_ranking(load_snapshot(index), query, size or KEYWORD_RESULTS, filters)
+
+
+def knn_search(
+    vector: list[float],
+    index: str,
+    k: int = 5,
+    filters: dict | None = None,
+    num_candidates: int = 100,
+) -> list[dict]:
+    """Exact cosine kNN over the snapshot; ``num_candidates`` is accepted and ignored."""
+    snapshot = load_snapshot(index)
+    if len(vector) != snapshot["dims"]:
+        raise ValueError(
+            f"Snapshot {index} holds {snapshot['dims']}-dimension embeddings but the query "
+            f"embedding has {len(vector)}; check the embedding config matches the ingest."
+        )
+    return vector_ranking(snapshot, np.asarray(vector, dtype=np.float32), k, filters)
+
+
+def vector_search(
+    text: str,
+    index: str,
+    k: int = 5,
+    filters: dict | None = None,
+    num_candidates: int = 100,
+    dimensions: int | None = None,
+    normalize: bool | None = None,
+) -> list[dict]:
+    vector = embed(text, **embed_options(dimensions, normalize))
+    return knn_search(vector, index, k, filters, num_candidates)
+
+
+def memory_index(docs: list[dict]) -> dict:
+    """Index already-retrieved docs (sources with ``embedding``) like a loaded snapshot.
+
+    Used to re-rank a candidate pool in-process without another search.
+    """
+    chunks = [{key: value for key, value in doc.items() if key != "embedding"} for doc in docs]
+    vectors = np.asarray([doc["embedding"] for doc in docs], dtype=np.float32)
+    vectors = vectors.reshape(len(docs), -1 if docs else 0)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+    return {
+        "chunks": chunks,
+        "vectors": vectors,
+        "norms": norms,
+        "dims": vectors.shape[1],
+        "bm25": _build_bm25(chunks),
+        "masks": {},
+    }
+
+
+def rerank(
+    pool: dict, text: str, anchor: list[float], k: int, size: int = KEYWORD_RESULTS
+) -> tuple[list[dict], list[dict]]:
+    """(keyword results, vector results) for one claim, ranked within a candidate pool.
+
+    Keyword results are the pool's BM25 ranking for the claim.  There is no
+    embedding of the claim itself: its query vector is the pool's shared
+    ``anchor`` (the embedded claim group) moved towards the pool vectors the
+    claim matches lexically, weighted by their BM25 share (a Rocchio
+    update), so each claim's vector ranking follows its own terms.
+    """
+    if not pool["chunks"]:
+        return [], []
+    query = np.asarray(anchor, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+    lexical = bm25_scores(pool, text)
+    if lexical.sum() > 0:
+        weights = lexical / lexical.sum()
+        query = query + weights @ (pool["vectors"] / pool["norms"][:, None])
+    return keyword_ranking(pool, text, size), vector_ranking(pool, query, k)
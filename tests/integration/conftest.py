@@ -39,7 +39,7 @@ requires_ollama = pytest.mark.skipif(
 )
 
 
-def _fake_embed(text):
+def _fake_embed(text, **kwargs):
     """Hash-based fake embedding to avoid requiring AWS Bedrock for Titan."""
     h = hashlib.sha256(text.encode("utf-8")).hexdigest()
     return [int(h[i : i + 2], 16) / 255.0 for i in range(0, 512, 2)]
@@ -68,6 +68,12 @@ class TestEvaluate:
             "reliability_score",
             "decision",
             "claims",
+            "risk_interval",
+            "rounds",
+            "breakdown",
+            "early_stop",
+            "usage",
+            "prompt_bank",
         }
         assert set(body.keys()) == expected_keys
 
@@ -0,0 +1,187 @@
+"""Unit tests for src.wrappers.bedrock_batch -- AWS is mocked, the local transport runs."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.wrappers import bedrock_batch
+from src.wrappers.bedrock import track_usage
+from src.wrappers.bedrock_batch import complete, from_jsonl, records, run_job, to_jsonl, transport
+
+MODULE = "src.wrappers.bedrock_batch"
+
+
+def _echo(model_id, body):
+    prompt = body["messages"][0]["content"]
+    return {
+        "content": [{"text": f"{model_id}:{prompt}"}],
+        "usage": {"input_tokens": 3, "output_tokens": 2},
+    }
+
+
+def _local(tmp_path, **extra):
+    return {"transport": "local", "directory": str(tmp_path), "min_records": 1, **extra}
+
+
+class TestRecords:
+    def test_record_ids_keep_order(self):
+        rows = records([{"a": 1}, {"b": 2}])
+        assert [row["recordId"] for row in rows] == ["00000000", "00000001"]
+        assert rows[1]["modelInput"] == {"b": 2}
+
+    def test_jsonl_round_trip(self):
+        rows = [{"recordId": "1", "modelInput": {"x": "é"}}, {"recordId": "2"}]
+        assert from_jsonl(to_jsonl(rows)) == rows
+
+
+class TestTransport:
+    def test_unknown_transport_rejected(self):
+        with pytest.raises(ValueError, match="Unknown batch transport"):
+            transport({"transport": "carrier-pigeon"})
+
+    def test_bedrock_requires_role_and_bucket(self):
+        with pytest.raises(ValueError, match="role_arn"):
+            transport({"s3_uri": "s3://bucket/batch"})
+
+    def test_local_requires_directory(self):
+        with pytest.raises(ValueError, match="directory"):
+            transport({"transport": "local"})
+
+    def test_bedrock_submits_job_and_reads_output(self):
+        control = MagicMock()
+        control.create_model_invocation_job.return_value = {"jobArn": "arn:aws:bedrock:job/abc123"}
+        control.get_model_invocation_job.return_value = {
+            "status": "Completed",
+            "outputDataConfig": {"s3OutputDataConfig": {"s3Uri": "s3://bucket/batch/j/output/"}},
+        }
+        s3 = MagicMock()
+        s3.get_object.return_value = {
+            "Body": MagicMock(read=lambda: to_jsonl([{"recordId": "0", "modelOutput": {}}]))
+        }
+        functions = transport({"role_arn": "role", "s3_uri": "s3://bucket/batch/"})
+        with (
+            patch(f"{MODULE}._control", return_value=control),
+            patch(f"{MODULE}._s3", return_value=s3),
+        ):
+            job = functions["submit"]("j", "model", [{"recordId": "0", "modelInput": {}}])
+            assert functions["status"](job) == "Completed"
+            rows = functions["results"](job)
+
+        assert job == "arn:aws:bedrock:job/abc123"
+        assert s3.put_object.call_args.kwargs["Key"] == "batch/j/input.jsonl"
+        kwargs = control.create_model_invocation_job.call_args.kwargs
+        assert kwargs["roleArn"] == "role"
+        assert kwargs["modelId"] == "model"
+        assert kwargs["inputDataConfig"]["s3InputDataConfig"]["s3Uri"] == (
+            "s3://bucket/batch/j/input.jsonl"
+        )
+        assert s3.get_object.call_args.kwargs == {
+            "Bucket": "bucket",
+            "Key": "batch/j/output/abc123/input.jsonl.out",
+        }
+        assert rows == [{"recordId": "0", "modelOutput": {}}]
+
+
+class TestRunJob:
+    def test_polls_until_done(self):
+        functions = {
+            "submit": MagicMock(return_value="job"),
+            "status": MagicMock(side_effect=["Submitted", "InProgress", "Completed"]),
+            "results": MagicMock(return_value=[{"recordId": "00000000", "modelOutput": {"ok": 1}}]),
+        }
+        with (
+            patch(f"{MODULE}.transport", return_value=functions),
+            patch(f"{MODULE}.time.sleep") as sleep,
+        ):
+            outputs = run_job([{}], "model", {"poll_interval": 5}, "verify")
+        assert outputs == [{"ok": 1}]
+        assert sleep.call_count == 2
+        sleep.assert_called_with(5)
+
+    def test_failed_job_raises(self):
+        functions = {
+            "submit": MagicMock(return_value="job"),
+            "status": MagicMock(return_value="Failed"),
+            "results": MagicMock(),
+        }
+        with (
+            patch(f"{MODULE}.transport", return_value=functions),
+            pytest.raises(RuntimeError, match="Failed"),
+        ):
+            run_job([{}], "model", {}, "verify")
+
+    def test_timeout_raises(self):
+        functions = {
+            "submit": MagicMock(return_value="job"),
+            "status": MagicMock(return_value="InProgress"),
+            "results": MagicMock(),
+        }
+        with (
+            patch(f"{MODULE}.transport", return_value=functions),
+            patch(f"{MODULE}.time.sleep"),
+            pytest.raises(TimeoutError),
+        ):
+            run_job([{}], "model", {"timeout": 0}, "verify")
+
+
+class TestComplete:
+    def test_local_job_maps_outputs_in_order(self, tmp_path):
+        requests = [{"prompt": "one"}, {"prompt": "two", "system": "sys"}]
+        with patch(f"{MODULE}._run_local", side_effect=_echo), track_usage() as usage:
+            texts = complete(requests, "haiku", _local(tmp_path), "verify")
+
+        assert texts == ["haiku:one", "haiku:two"]
+        assert usage["calls"] == 2
+        assert usage["input_tokens"] == 6
+        (job_dir,) = tmp_path.iterdir()
+        assert job_dir.name.startswith("llm-gate-verify-")
+        rows = from_jsonl((job_dir / "input.jsonl").read_bytes())
+        assert rows[1]["modelInput"]["system"] == "sys"
+
+    def test_default_model_when_unset(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("BEDROCK_INFERENCE_PROFILE_ID", "default-model")
+        with patch(f"{MODULE}._run_local", side_effect=_echo):
+            texts = complete([{"prompt": "x"}], None, _local(tmp_path), "extract")
+        assert texts == ["default-model:x"]
+
+    def test_small_stage_runs_on_demand(self, tmp_path):
+        batch = _local(tmp_path, min_records=100)
+        with (
+            patch(f"{MODULE}.call_llm", return_value="direct") as call_llm,
+            patch(f"{MODULE}._run_local") as run_local,
+        ):
+            texts = complete([{"prompt": "x"}], "haiku", batch, "verify")
+        assert texts == ["direct"]
+        call_llm.assert_called_once_with(prompt="x", model_id="haiku")
+        run_local.assert_not_called()
+        assert not list(tmp_path.iterdir())
+
+    def test_failed_records_retried_on_demand(self, tmp_path):
+        def flaky(model_id, body):
+            if body["messages"][0]["content"] == "bad":
+                raise RuntimeError("model error")
+            return _echo(model_id, body)
+
+        with (
+            patch(f"{MODULE}._run_local", side_effect=flaky),
+            patch(f"{MODULE}.call_llm", return_value="retried") as call_llm,
+        ):
+            texts = complete([{"prompt": "ok"}, {"prompt": "bad"}], "m", _local(tmp_path), "v")
+
+        assert texts == ["m:ok", "retried"]
+        call_llm.assert_called_once_with(prompt="bad", model_id="m")
+        output = from_jsonl(next(tmp_path.iterdir()).joinpath("input.jsonl.out").read_bytes())
+        assert output[1]["error"] == {"errorMessage": "model error"}
+
+    def test_cache_breakpoints_survive_batching(self, tmp_path):
+        with patch(f"{MODULE}._run_local", side_effect=_echo):
+            complete([{"prompt": "c", "prefix": "p", "cache": True}], "m", _local(tmp_path), "v")
+        row = from_jsonl(next(tmp_path.iterdir()).joinpath("input.jsonl").read_bytes())[0]
+        content = row["modelInput"]["messages"][0]["content"]
+        assert content[0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_local_stand_in_calls_the_requested_model(self):
+        with patch.object(bedrock_batch.bedrock, "_invoke", return_value={"ok": 1}) as invoke:
+            assert bedrock_batch._run_local("m", {"body": 1}) == {"ok": 1}
+        model_for = invoke.call_args.args[0]
+        assert model_for({"model_id": "other"}) == "m"
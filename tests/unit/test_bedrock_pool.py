@@ -0,0 +1,216 @@
+"""Tests for the multi-region Bedrock endpoint pool, using stub clients."""
+
+import io
+import json
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from src.wrappers import bedrock_pool
+
+
+class StubClient:
+    """invoke_model stand-in: answers with its region, or raises queued errors."""
+
+    def __init__(self, region, errors=(), delay=0.0, barrier=None):
+        self.region = region
+        self.errors = list(errors)
+        self.delay = delay
+        self.barrier = barrier
+        self.calls = []
+
+    def invoke_model(self, modelId, **kwargs):
+        self.calls.append(modelId)
+        time.sleep(self.delay)
+        if self.barrier:
+            self.barrier.wait(timeout=5)
+        if self.errors:
+            raise self.errors.pop(0)
+        text = json.dumps({"content": [{"text": self.region}], "embedding": [1.0]})
+        return {"body": io.BytesIO(text.encode())}
+
+
+def _error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+@pytest.fixture(autouse=True)
+def _reset_pool(monkeypatch):
+    monkeypatch.setattr(bedrock_pool, "_pool", None)
+    monkeypatch.setattr(bedrock_pool, "_configured", False)
+
+
+def _configure(*clients, weights=None):
+    bedrock_pool.configure(
+        [
+            {"region": client.region, "client": client, "weight": (weights or {}).get(i, 1)}
+            for i, client in enumerate(clients)
+        ]
+    )
+    return bedrock_pool.pool()
+
+
+def _call(endpoints, model="m"):
+    response = bedrock_pool.invoke(endpoints, lambda endpoint: model, body="{}")
+    return json.loads(response["body"])["content"][0]["text"]
+
+
+class TestConfiguration:
+    def test_unset_means_no_pool(self, monkeypatch):
+        monkeypatch.delenv("BEDROCK_ENDPOINTS", raising=False)
+        assert bedrock_pool.pool() is None
+
+    def test_read_from_environment(self, monkeypatch):
+        monkeypatch.setenv(
+            "BEDROCK_ENDPOINTS",
+            '[{"region": "us-east-1", "weight": 2}, {"region": "us-west-2", "model_id": "p"}]',
+        )
+        endpoints = bedrock_pool.pool()
+        assert [e["region"] for e in endpoints] == ["us-east-1", "us-west-2"]
+        assert endpoints[0]["weight"] == 2.0
+        assert endpoints[1]["model_id"] == "p"
+
+
+class TestRouting:
+    def test_sequential_calls_follow_weights(self):
+        east, west = StubClient("us-east-1"), StubClient("us-west-2")
+        endpoints = _configure(east, west, weights={0: 3})
+
+        for _ in range(40):
+            _call(endpoints)
+
+        assert len(east.calls) == 30
+        assert len(west.calls) == 10
+
+    def test_concurrent_calls_spread_by_outstanding_requests(self):
+        # Every call stays in flight until all 20 have been routed.
+        barrier = threading.Barrier(20)
+        east = StubClient("us-east-1", barrier=barrier)
+        west = StubClient("us-west-2", barrier=barrier)
+        endpoints = _configure(east, west, weights={0: 3})
+
+        threads = [threading.Thread(target=_call, args=(endpoints,)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(east.calls) == 15
+        assert len(west.calls) == 5
+        assert all(e["outstanding"] == 0 for e in endpoints)
+
+    def test_latency_tracked(self):
+        endpoints = _configure(StubClient("us-east-1", delay=0.01))
+        _call(endpoints)
+
+        stats = bedrock_pool.stats()
+        assert stats[0]["latency_ms"] >= 10
+        assert stats[0]["requests"] == 1
+        assert stats[0]["healthy"] is True
+
+
+class TestFailover:
+    def test_throttled_endpoint_fails_over_and_cools_down(self):
+        east = StubClient("us-east-1", errors=[_error("ThrottlingException")])
+        west = StubClient("us-west-2")
+        endpoints = _configure(east, west, weights={0: 10})
+
+        assert _call(endpoints) == "us-west-2"
+        assert _call(endpoints) == "us-west-2"  # east is cooling down
+        assert len(east.calls) == 1
+        stats = bedrock_pool.stats()
+        assert stats[0]["healthy"] is False
+        assert stats[0]["failovers"] == 1
+
+    def test_unreachable_endpoint_fails_over(self):
+        east = StubClient("us-east-1", errors=[EndpointConnectionError(endpoint_url="x")])
+        endpoints = _configure(east, StubClient("us-west-2"))
+
+        assert _call(endpoints) == "us-west-2"
+
+    def test_recovered_endpoint_used_again(self, monkeypatch):
+        monkeypatch.setattr(bedrock_pool, "COOLDOWN_BASE", 0.0)
+        east = StubClient("us-east-1", errors=[_error("ThrottlingException")])
+        endpoints = _configure(east, StubClient("us-west-2"), weights={0: 10})
+
+        _call(endpoints)
+        assert _call(endpoints) == "us-east-1"
+
+    def test_other_errors_are_not_retried(self):
+        east = StubClient("us-east-1", errors=[_error("ValidationException")])
+        west = StubClient("us-west-2")
+        endpoints = _configure(east, west, weights={0: 10})
+
+        with pytest.raises(ClientError, match="ValidationException"):
+            _call(endpoints)
+        assert west.calls == []
+
+    def test_all_throttled_raises(self, monkeypatch):
+        monkeypatch.setattr(bedrock_pool, "COOLDOWN_BASE", 0.0)
+        east = StubClient("us-east-1", errors=[_error("ThrottlingException")] * 9)
+        west = StubClient("us-west-2", errors=[_error("ServiceUnavailableException")] * 9)
+        endpoints = _configure(east, west)
+
+        with pytest.raises(ClientError):
+            _call(endpoints)
+        assert len(east.calls) == len(west.calls) == bedrock_pool.MAX_ROUNDS
+
+    def test_single_region_waits_for_cooldown(self, monkeypatch):
+        monkeypatch.setattr(bedrock_pool, "COOLDOWN_BASE", 0.05)
+        east = StubClient("us-east-1", errors=[_error("ThrottlingException")])
+        endpoints = _configure(east)
+
+        start = time.monotonic()
+        assert _call(endpoints) == "us-east-1"
+        assert time.monotonic() - start >= 0.05
+        assert len(east.calls) == 2
+
+    def test_call_during_cooldown_waits_for_it(self, monkeypatch):
+        monkeypatch.setattr(bedrock_pool, "COOLDOWN_BASE", 0.1)
+        monkeypatch.setattr(bedrock_pool, "MAX_ROUNDS", 1)
+        east = StubClient("us-east-1", errors=[_error("ThrottlingException")])
+        endpoints = _configure(east)
+        with pytest.raises(ClientError):
+            _call(endpoints)
+        cooldown_until = endpoints[0]["cooldown_until"]
+
+        called_at = []
+        invoke_model = east.invoke_model
+        east.invoke_model = lambda **kw: called_at.append(time.monotonic()) or invoke_model(**kw)
+        assert _call(endpoints) == "us-east-1"
+
+        assert len(called_at) == 1
+        assert called_at[0] >= cooldown_until
+        assert endpoints[0]["failures"] == 0
+
+    def test_wait_beyond_budget_raises(self, monkeypatch):
+        monkeypatch.setattr(bedrock_pool, "MAX_WAIT", 0.5)
+        east = StubClient("us-east-1", errors=[_error("ThrottlingException")])
+        endpoints = _configure(east)
+
+        with pytest.raises(ClientError):
+            _call(endpoints)
+        assert len(east.calls) == 1
+
+
+class TestBedrockWrapper:
+    def test_call_llm_uses_endpoint_profile_unless_overridden(self):
+        from src.wrappers.bedrock import call_llm
+
+        east = StubClient("us-east-1")
+        bedrock_pool.configure([{"region": "us-east-1", "client": east, "model_id": "us.profile"}])
+
+        assert call_llm("hi") == "us-east-1"
+        call_llm("hi", model_id="haiku")
+        assert east.calls == ["us.profile", "haiku"]
+
+    def test_embed_goes_through_pool(self):
+        from src.wrappers.bedrock import embed
+
+        east = StubClient("us-east-1")
+        bedrock_pool.configure([{"region": "us-east-1", "client": east, "model_id": "us.profile"}])
+
+        assert embed("text") == [1.0]
+        assert east.calls == ["amazon.titan-embed-text-v2:0"]
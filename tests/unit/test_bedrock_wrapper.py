@@ -100,6 +100,126 @@ class TestEmbed:
             assert kwargs["accept"] == "application/json"
             assert kwargs["contentType"] == "application/json"
 
+    def test_sends_dimensions_and_normalize(self):
+        """embed requests reduced, normalised vectors when asked."""
+        with patch("src.wrappers.bedrock._client") as mock_client:
+            mock_client.invoke_model.return_value = _make_invoke_model_response()
+            from src.wrappers.bedrock import embed
+
+            embed("some text", dimensions=256, normalize=True)
+            _, kwargs = mock_client.invoke_model.call_args
+            assert json.loads(kwargs["body"]) == {
+                "inputText": "some text",
+                "dimensions": 256,
+                "normalize": True,
+            }
+
+    def test_embedding_options_only_include_configured_keys(self):
+        from src.wrappers.bedrock import embedding_options
+
+        assert embedding_options({}) == {}
+        assert embedding_options({"embedding": {"dimensions": 512}}) == {"dimensions": 512}
+
+    def test_embed_options_drop_unset_settings(self):
+        from src.wrappers.bedrock import embed_options
+
+        assert embed_options() == {}
+        assert embed_options(256, None) == {"dimensions": 256}
+        assert embed_options(None, False) == {"normalize": False}
+
+
+class TestModelRoute:
+    def test_defaults_when_unconfigured(self):
+        from src.wrappers.bedrock import model_route
+
+        assert model_route({}, "verify_claims") == {
+            "model": None,
+            "cascade": None,
+            "min_confidence": 0.8,
+        }
+
+    def test_plain_model_id(self):
+        from src.wrappers.bedrock import model_route
+
+        route = model_route({"models": {"extract_claims": "haiku"}}, "extract_claims")
+        assert route["model"] == "haiku"
+        assert route["cascade"] is None
+
+    def test_cascade_entry(self):
+        from src.wrappers.bedrock import model_route
+
+        config = {"models": {"verify_claims": {"cascade": "haiku", "min_confidence": 0.9}}}
+        route = model_route(config, "verify_claims")
+        assert route == {"model": None, "cascade": "haiku", "min_confidence": 0.9}
+
+    def test_model_id_overrides_environment(self):
+        with patch("src.wrappers.bedrock._client") as mock_client:
+            body = MagicMock()
+            body.read.return_value = json.dumps({"content": [{"text": "ok"}]})
+            mock_client.invoke_model.return_value = {"body": body}
+            from src.wrappers.bedrock import call_llm
+
+            call_llm("hi", model_id="haiku")
+            assert mock_client.invoke_model.call_args.kwargs["modelId"] == "haiku"
+
+
+def _llm_client(mock_client, usage=None):
+    body = MagicMock()
+    body.read.return_value = json.dumps({"content": [{"text": "ok"}], "usage": usage or {}})
+    mock_client.invoke_model.return_value = {"body": body}
+
+
+class TestPromptCache:
+    def test_uncached_prefix_is_prepended(self):
+        with patch("src.wrappers.bedrock._client") as mock_client:
+            _llm_client(mock_client)
+            from src.wrappers.bedrock import call_llm
+
+            call_llm("Claim: x", system="sys", prefix="Evidence: y\n\n")
+            body = json.loads(mock_client.invoke_model.call_args.kwargs["body"])
+            assert body["system"] == "sys"
+            assert body["messages"][0]["content"] == "Evidence: y\n\nClaim: x"
+
+    def test_cache_breakpoint_ends_the_prefix(self):
+        with patch("src.wrappers.bedrock._client") as mock_client:
+            _llm_client(mock_client)
+            from src.wrappers.bedrock import call_llm
+
+            call_llm("Claim: x", system="sys", prefix="Evidence: y\n\n", cache=True)
+            body = json.loads(mock_client.invoke_model.call_args.kwargs["body"])
+            assert body["system"] == "sys"
+            assert body["messages"][0]["content"] == [
+                {
+                    "type": "text",
+                    "text": "Evidence: y\n\n",
+                    "cache_control": {"type": "ephemeral"},
+                },
+                {"type": "text", "text": "Claim: x"},
+            ]
+
+    def test_track_usage_totals_calls(self):
+        usage = {
+            "input_tokens": 10,
+            "output_tokens": 5,
+            "cache_creation_input_tokens": 1200,
+            "cache_read_input_tokens": 0,
+        }
+        with patch("src.wrappers.bedrock._client") as mock_client:
+            _llm_client(mock_client, usage)
+            from src.wrappers.bedrock import call_llm, track_usage
+
+            with track_usage() as totals:
+                call_llm("a")
+                call_llm("b")
+            call_llm("outside")
+
+        assert totals["calls"] == 2
+        assert totals["input_tokens"] == 20
+        assert totals["output_tokens"] == 10
+        assert totals["cache_creation_input_tokens"] == 2400
+        assert totals["cache_read_input_tokens"] == 0
+        assert totals["llm_seconds"] >= 0
+
 
 # ---------------------------------------------------------------------------
 # Module-level client test
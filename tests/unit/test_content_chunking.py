@@ -0,0 +1,62 @@
+"""Tests for content-defined chunking."""
+
+import random
+
+import pytest
+
+from src.ingest.content_chunking import is_sentence_end, iter_content_defined_chunks
+
+
+def _corpus(seed, n_sentences):
+    rng = random.Random(seed)
+    vocab = [f"tok{i}" for i in range(2000)]
+    words = []
+    for _ in range(n_sentences):
+        length = rng.randint(8, 25)
+        words.extend(rng.choice(vocab) for _ in range(length - 1))
+        words.append(rng.choice(vocab) + ".")
+    return words
+
+
+class TestIsSentenceEnd:
+    def test_terminal_punctuation(self):
+        assert is_sentence_end("done.")
+        assert is_sentence_end("really?")
+        assert is_sentence_end('"stop!"')
+        assert not is_sentence_end("e.g")
+        assert not is_sentence_end("word")
+
+
+class TestContentDefinedChunks:
+    def test_round_trips_all_words(self):
+        words = _corpus(1, 200)
+        chunks = list(iter_content_defined_chunks(words, 50, 150, 400))
+        assert " ".join(chunks).split() == words
+
+    def test_chunk_sizes_bounded(self):
+        words = _corpus(2, 400)
+        chunks = list(iter_content_defined_chunks(words, 50, 150, 400))
+        sizes = [len(c.split()) for c in chunks]
+        assert max(sizes) <= 400
+        assert all(size >= 50 for size in sizes[:-1])
+
+    def test_boundaries_snap_to_sentence_ends(self):
+        words = _corpus(3, 300)
+        chunks = list(iter_content_defined_chunks(words, 50, 150, 400))
+        assert all(is_sentence_end(c.split()[-1]) for c in chunks[:-1])
+
+    def test_hard_cut_at_max_without_sentence_end(self):
+        words = [f"w{i}" for i in range(25)]
+        chunks = list(iter_content_defined_chunks(words, 2, 5, 10))
+        assert [len(c.split()) for c in chunks] == [10, 10, 5]
+
+    def test_insertion_only_changes_neighbouring_chunks(self):
+        words = _corpus(4, 600)
+        before = list(iter_content_defined_chunks(words, 50, 150, 400))
+        edited = words[:300] + _corpus(5, 5) + words[300:]
+        after = list(iter_content_defined_chunks(edited, 50, 150, 400))
+        assert len(set(before) - set(after)) <= 2
+
+    def test_invalid_sizes_raise(self):
+        with pytest.raises(ValueError):
+            list(iter_content_defined_chunks(["a"], min_words=10, avg_words=5, max_words=20))
@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.wrappers import elasticsearch_async
+
+MOCK_SEARCH_RESPONSE = {
+    "hits": {"hits": [{"_source": {"content": "doc text", "embedding": [0.1, 0.2]}, "_id": "1"}]}
+}
+MODULE = "src.wrappers.elasticsearch_async"
+
+
+@pytest.fixture()
+def mock_client():
+    mock_es = MagicMock()
+    mock_es.search = AsyncMock(return_value=MOCK_SEARCH_RESPONSE)
+    mock_es.index = AsyncMock()
+    with (
+        patch(f"{MODULE}.client", return_value=mock_es),
+        patch(f"{MODULE}.check_embedding_dims"),
+        patch(f"{MODULE}.embed", return_value=[0.1, 0.2]) as mock_embed,
+    ):
+        mock_es.embed = mock_embed
+        yield mock_es
+
+
+class TestClient:
+    def test_transport_settings_applied(self):
+        async def build():
+            es = elasticsearch_async.client()
+            node = next(iter(es.transport.node_pool.all()))
+            await elasticsearch_async.close_client()
+            return es, node
+
+        with patch.dict(
+            "os.environ",
+            {"ES_MAX_CONNECTIONS": "64", "ES_REQUEST_TIMEOUT": "2.5", "ES_MAX_RETRIES": "5"},
+        ):
+            es, node = asyncio.run(build())
+
+        assert node.config.connections_per_node == 64
+        assert node.config.http_compress is True
+        assert es._request_timeout == 2.5
+        assert es._max_retries == 5
+        assert es._retry_on_timeout is True
+        assert es._retry_backoff_base > 0
+
+    def test_one_client_per_event_loop(self):
+        async def pair():
+            first, second = elasticsearch_async.client(), elasticsearch_async.client()
+            await elasticsearch_async.close_client()
+            return first, second
+
+        first, second = asyncio.run(pair())
+        other, _ = asyncio.run(pair())
+
+        assert first is second
+        assert other is not first
+
+
+class TestSearch:
+    def test_search_docs_with_filters(self, mock_client):
+        results = asyncio.run(
+            elasticsearch_async.search_docs("refunds", index="docs", filters={"tags": "a"})
+        )
+
+        assert results == [{"content": "doc text", "embedding": [0.1, 0.2]}]
+        query = mock_client.search.call_args.kwargs["query"]
+        assert query["bool"]["filter"] == [{"term": {"tags": "a"}}]
+
+    def test_vector_search_embeds_and_searches(self, mock_client):
+        asyncio.run(elasticsearch_async.vector_search("refunds", index="docs", k=3, dimensions=256))
+
+        mock_client.embed.assert_called_once_with("refunds", dimensions=256)
+        knn = mock_client.search.call_args.kwargs["knn"]
+        assert knn["query_vector"] == [0.1, 0.2]
+        assert knn["k"] == 3
+
+    def test_index_doc(self, mock_client):
+        asyncio.run(elasticsearch_async.index_doc("runs", "r1", {"decision": "PASS"}))
+
+        mock_client.index.assert_awaited_once_with(
+            index="runs", id="r1", document={"decision": "PASS"}
+        )
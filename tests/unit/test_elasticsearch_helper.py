@@ -1,3 +1,5 @@
+import os
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -45,6 +47,162 @@ def test_index_doc_calls_es_index(mock_es):
     mock_es.index.assert_called_once_with(index="my_index", id="42", document=body)
 
 
+def test_bulk_index_builds_actions(mock_es):
+    from src.wrappers.elasticsearch_helper import bulk_index
+
+    with patch("src.wrappers.elasticsearch_helper.helpers") as mock_helpers:
+        bulk_index("my_index", [("1", {"content": "a"}), ("2", {"content": "b"})])
+
+    mock_helpers.bulk.assert_called_once_with(
+        mock_es,
+        [
+            {"_index": "my_index", "_id": "1", "_source": {"content": "a"}},
+            {"_index": "my_index", "_id": "2", "_source": {"content": "b"}},
+        ],
+    )
+
+
+def test_bulk_add_values_merges_with_a_script(mock_es):
+    from src.wrappers.elasticsearch_helper import bulk_add_values
+
+    with patch("src.wrappers.elasticsearch_helper.helpers") as mock_helpers:
+        bulk_add_values("my_index", "duplicate_sources", [("1", ["a.md"])])
+
+    (action,) = mock_helpers.bulk.call_args.args[1]
+    assert action["_op_type"] == "update"
+    assert action["_id"] == "1"
+    assert "doc" not in action
+    assert action["script"]["params"] == {"field": "duplicate_sources", "values": ["a.md"]}
+
+
+def test_delete_doc_ignores_missing(mock_es):
+    from src.wrappers.elasticsearch_helper import delete_doc
+
+    delete_doc(index="my_index", doc_id="42")
+
+    mock_es.options.assert_called_once_with(ignore_status=404)
+    mock_es.options.return_value.delete.assert_called_once_with(index="my_index", id="42")
+
+
+def test_bulk_delete_ignores_missing(mock_es):
+    from src.wrappers.elasticsearch_helper import bulk_delete
+
+    with patch("src.wrappers.elasticsearch_helper.helpers") as mock_helpers:
+        bulk_delete("my_index", ["1", "2"])
+
+    mock_helpers.bulk.assert_called_once_with(
+        mock_es,
+        [
+            {"_op_type": "delete", "_index": "my_index", "_id": "1"},
+            {"_op_type": "delete", "_index": "my_index", "_id": "2"},
+        ],
+        ignore_status=404,
+    )
+
+
+def test_get_doc_returns_source_or_none(mock_es):
+    from src.wrappers.elasticsearch_helper import get_doc
+
+    mock_es.options.return_value.get.return_value = {"found": True, "_source": {"a": 1}}
+    assert get_doc("my_index", "42") == {"a": 1}
+    mock_es.options.return_value.get.return_value = {"found": False}
+    assert get_doc("my_index", "43") is None
+
+
+def test_top_doc_sorts_descending(mock_es):
+    from src.wrappers.elasticsearch_helper import top_doc
+
+    mock_es.options.return_value.search.return_value = MOCK_SEARCH_RESPONSE
+    assert top_doc("bank", "fingerprint", "abc", "version") == {
+        "content": "doc text",
+        "embedding": [0.1, 0.2],
+    }
+    mock_es.options.return_value.search.assert_called_once_with(
+        index="bank",
+        query={"term": {"fingerprint": "abc"}},
+        sort=[{"version": "desc"}],
+        size=1,
+    )
+    mock_es.options.return_value.search.return_value = EMPTY_SEARCH_RESPONSE
+    assert top_doc("bank", "fingerprint", "abc", "version") is None
+
+
+def test_existing_ids_returns_found_ids(mock_es):
+    from src.wrappers.elasticsearch_helper import existing_ids
+
+    mock_es.options.return_value.mget.return_value = {
+        "docs": [{"_id": "a", "found": True}, {"_id": "b", "found": False}]
+    }
+    assert existing_ids("my_index", ["a", "b"]) == {"a"}
+    mock_es.options.return_value.mget.assert_called_once_with(
+        index="my_index", ids=["a", "b"], source=False
+    )
+
+
+def test_existing_ids_missing_index_and_empty_input(mock_es):
+    from src.wrappers.elasticsearch_helper import existing_ids
+
+    mock_es.options.return_value.mget.return_value = {"error": {"type": "index_not_found"}}
+    assert existing_ids("missing", ["a"]) == set()
+    assert existing_ids("missing", []) == set()
+    assert mock_es.options.return_value.mget.call_count == 1
+
+
+def test_get_index_settings_flat(mock_es):
+    from src.wrappers.elasticsearch_helper import get_index_settings
+
+    mock_es.options.return_value.indices.get_settings.return_value = {
+        "my_index-v2": {"settings": {"index.number_of_replicas": "1"}}
+    }
+    assert get_index_settings("my_index") == {"index.number_of_replicas": "1"}
+
+
+def test_get_index_settings_missing_index(mock_es):
+    from src.wrappers.elasticsearch_helper import get_index_settings
+
+    mock_es.options.return_value.indices.get_settings.return_value = {
+        "error": {"type": "index_not_found_exception"},
+        "status": 404,
+    }
+    assert get_index_settings("missing") is None
+
+
+def test_swap_alias_moves_alias_atomically(mock_es):
+    from src.wrappers.elasticsearch_helper import swap_alias
+
+    swap_alias("docs", "docs-v2", "docs-v1")
+
+    mock_es.indices.update_aliases.assert_called_once_with(
+        actions=[
+            {"remove": {"index": "docs-v1", "alias": "docs"}},
+            {"add": {"index": "docs-v2", "alias": "docs"}},
+        ]
+    )
+
+
+def test_swap_alias_replaces_plain_index(mock_es):
+    from src.wrappers.elasticsearch_helper import swap_alias
+
+    swap_alias("docs", "docs-v1", "docs")
+
+    mock_es.indices.update_aliases.assert_called_once_with(
+        actions=[
+            {"remove_index": {"index": "docs"}},
+            {"add": {"index": "docs-v1", "alias": "docs"}},
+        ]
+    )
+
+
+def test_alias_target_resolves_concrete_index(mock_es):
+    from src.wrappers.elasticsearch_helper import alias_target
+
+    mock_es.options.return_value.indices.get.return_value = {"docs-v3": {"aliases": {"docs": {}}}}
+    assert alias_target("docs") == "docs-v3"
+
+    mock_es.options.return_value.indices.get.return_value = {"error": {}, "status": 404}
+    assert alias_target("docs") is None
+
+
 def test_search_docs_returns_source(mock_es):
     from src.wrappers.elasticsearch_helper import search_docs
 
@@ -106,6 +264,102 @@ def test_vector_search_returns_source(mock_es, mock_embed):
     assert results[1] == {"content": "other doc", "embedding": [0.3, 0.4]}
 
 
+def test_search_docs_with_filters_uses_bool_filter(mock_es):
+    from src.wrappers.elasticsearch_helper import search_docs
+
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    search_docs("refund window", filters={"tags": ["refunds", "billing"], "doc_type": "md"})
+
+    mock_es.search.assert_called_once_with(
+        index="trusted_docs",
+        query={
+            "bool": {
+                "must": [{"match": {"content": "refund window"}}],
+                "filter": [
+                    {"terms": {"tags": ["refunds", "billing"]}},
+                    {"term": {"doc_type": "md"}},
+                ],
+            }
+        },
+    )
+
+
+def test_vector_search_filters_inside_knn(mock_es, mock_embed):
+    from src.wrappers.elasticsearch_helper import vector_search
+
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    vector_search("refund window", filters={"tags": "refunds"}, num_candidates=40)
+
+    knn = mock_es.search.call_args.kwargs["knn"]
+    assert knn["filter"] == [{"term": {"tags": "refunds"}}]
+    assert knn["num_candidates"] == 40
+
+
+def test_vector_search_passes_embedding_options(mock_es, mock_embed):
+    from src.wrappers.elasticsearch_helper import vector_search
+
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    vector_search("search text", dimensions=256, normalize=True)
+
+    mock_embed.assert_called_once_with("search text", dimensions=256, normalize=True)
+
+
+def _field_mapping(dims):
+    return {"idx-v1": {"mappings": {"embedding": {"mapping": {"embedding": {"dims": dims}}}}}}
+
+
+def test_vector_search_refuses_dimension_mismatch(mock_es, mock_embed):
+    from src.wrappers import elasticsearch_helper
+
+    elasticsearch_helper._embedding_dims.clear()
+    mock_es.options.return_value.indices.get_field_mapping.return_value = _field_mapping(512)
+
+    with pytest.raises(ValueError, match="512-dimension"):
+        elasticsearch_helper.vector_search("search text", index="idx")
+    mock_es.search.assert_not_called()
+
+
+def test_embedding_dims_cached_and_refreshed_on_mismatch(mock_es, mock_embed):
+    from src.wrappers import elasticsearch_helper
+
+    elasticsearch_helper._embedding_dims.clear()
+    get_mapping = mock_es.options.return_value.indices.get_field_mapping
+    get_mapping.return_value = _field_mapping(3)
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+
+    elasticsearch_helper.vector_search("a", index="idx")
+    elasticsearch_helper.vector_search("b", index="idx")
+    assert get_mapping.call_count == 1
+
+    mock_embed.return_value = [0.1] * 4
+    get_mapping.return_value = _field_mapping(4)
+    elasticsearch_helper.vector_search("c", index="idx")
+    assert get_mapping.call_count == 2
+
+
+def test_ensure_index_creates_missing_index(mock_es):
+    from src.wrappers.elasticsearch_helper import ensure_index
+
+    mock_es.indices.exists.return_value = False
+    ensure_index("idx", {"properties": {"tags": {"type": "keyword"}}})
+
+    mock_es.indices.create.assert_called_once_with(
+        index="idx", mappings={"properties": {"tags": {"type": "keyword"}}}
+    )
+
+
+def test_ensure_index_adds_fields_to_existing_index(mock_es):
+    from src.wrappers.elasticsearch_helper import ensure_index
+
+    mock_es.indices.exists.return_value = True
+    ensure_index("idx", {"properties": {"tags": {"type": "keyword"}}})
+
+    mock_es.indices.put_mapping.assert_called_once_with(
+        index="idx", properties={"tags": {"type": "keyword"}}
+    )
+    mock_es.indices.create.assert_not_called()
+
+
 def test_empty_results_return_empty_list(mock_es):
     from src.wrappers.elasticsearch_helper import search_docs, vector_search
 
@@ -127,3 +381,145 @@ def test_es_client_initialized_once_at_module_level():
 
     mod = importlib.import_module("src.wrappers.elasticsearch_helper")
     assert mod.es is elasticsearch_helper.es
+
+
+def test_scan_docs_yields_sources(mock_es):
+    from src.wrappers.elasticsearch_helper import scan_docs
+
+    with patch("src.wrappers.elasticsearch_helper.helpers.scan") as mock_scan:
+        mock_scan.return_value = iter([{"_id": "1", "_source": {"content": "a"}}])
+        assert list(scan_docs("idx")) == [{"content": "a"}]
+        mock_scan.assert_called_once_with(mock_es, index="idx", query={"query": {"match_all": {}}})
+
+
+def test_search_docs_size(mock_es):
+    from src.wrappers.elasticsearch_helper import search_docs
+
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    search_docs("pool query", size=50)
+
+    assert mock_es.search.call_args.kwargs["size"] == 50
+
+
+def test_knn_search_raises_num_candidates_to_k(mock_es):
+    from src.wrappers.elasticsearch_helper import knn_search
+
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    knn_search([0.1, 0.2, 0.3], k=200)
+
+    knn = mock_es.search.call_args.kwargs["knn"]
+    assert knn["k"] == 200
+    assert knn["num_candidates"] == 200
+
+
+@pytest.fixture()
+def cache(mock_es, tmp_path):
+    from src.wrappers import elasticsearch_helper
+
+    elasticsearch_helper.invalidate_cache()
+    mock_es.options.return_value.indices.get_mapping.return_value = {
+        "docs-v1": {"mappings": {"_meta": {"ingest_generation": "g1"}}}
+    }
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    with (
+        patch.object(elasticsearch_helper, "_cache_size", 2),
+        patch.object(elasticsearch_helper, "_cache_dir", None),
+    ):
+        yield elasticsearch_helper
+    elasticsearch_helper.invalidate_cache()
+
+
+def test_cache_off_by_default(mock_es):
+    from src.wrappers.elasticsearch_helper import search_docs
+
+    mock_es.search.return_value = MOCK_SEARCH_RESPONSE
+    search_docs("hello")
+    search_docs("hello")
+
+    assert mock_es.search.call_count == 2
+
+
+def test_repeated_keyword_query_served_from_cache(cache, mock_es):
+    first = cache.search_docs("Refund  Policy", index="docs")
+    second = cache.search_docs("refund policy", index="docs")
+
+    assert first == second
+    assert mock_es.search.call_count == 1
+
+
+def test_cached_vector_search_skips_embedding(cache, mock_es, mock_embed):
+    cache.vector_search("refund policy", index="docs")
+    cache.vector_search("refund policy", index="docs")
+
+    assert mock_embed.call_count == 1
+    assert mock_es.search.call_count == 1
+
+
+def test_cache_key_includes_k_and_filters(cache, mock_es):
+    cache.vector_search("refund policy", index="docs", k=3)
+    cache.vector_search("refund policy", index="docs", k=5)
+    cache.search_docs("refund policy", index="docs", filters={"tags": "a"})
+    cache.search_docs("refund policy", index="docs", filters={"tags": "b"})
+
+    assert mock_es.search.call_count == 4
+
+
+def test_lru_evicts_oldest(cache, mock_es):
+    for query in ("a", "b", "c", "a"):
+        cache.search_docs(query, index="docs")
+
+    assert mock_es.search.call_count == 4
+
+
+def test_entries_expire_after_ttl(cache, mock_es):
+    with patch.object(cache, "_cache_ttl", 0):
+        cache.search_docs("a", index="docs")
+        cache.search_docs("a", index="docs")
+
+    assert mock_es.search.call_count == 2
+
+
+def test_new_generation_misses_cache(cache, mock_es):
+    cache.search_docs("a", index="docs")
+    mock_es.options.return_value.indices.get_mapping.return_value = {"docs-v2": {"mappings": {}}}
+    with patch.object(cache, "_generation_ttl", 0):
+        cache.search_docs("a", index="docs")
+
+    assert mock_es.search.call_count == 2
+
+
+def test_bump_generation_marks_index_and_clears_cache(cache, mock_es):
+    cache.search_docs("a", index="docs")
+    cache.bump_generation("docs")
+
+    meta = mock_es.indices.put_mapping.call_args.kwargs["meta"]
+    assert mock_es.indices.put_mapping.call_args.kwargs["index"] == "docs"
+    assert meta["ingest_generation"]
+    assert cache._cache == {}
+
+
+def test_disk_tier_shared_between_processes(cache, mock_es, tmp_path):
+    with patch.object(cache, "_cache_dir", str(tmp_path)):
+        cache.search_docs("a", index="docs")
+        cache.invalidate_cache()  # a fresh process with the same directory
+        results = cache.search_docs("a", index="docs")
+
+    assert mock_es.search.call_count == 1
+    assert results == [hit["_source"] for hit in MOCK_SEARCH_RESPONSE["hits"]["hits"]]
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_expired_disk_entries_pruned_on_write(cache, mock_es, tmp_path):
+    stale = tmp_path / "old-generation.json"
+    stale.write_text("{}")
+    hour_ago = time.time() - 3600
+    os.utime(stale, (hour_ago, hour_ago))
+
+    with (
+        patch.object(cache, "_cache_dir", str(tmp_path)),
+        patch.object(cache, "_last_prune", None),
+    ):
+        cache.search_docs("a", index="docs")
+
+    assert not stale.exists()
+    assert len(list(tmp_path.glob("*.json"))) == 1
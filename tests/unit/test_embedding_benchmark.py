@@ -0,0 +1,68 @@
+"""Tests for the embedding dimension benchmark."""
+
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+
+from src.ingest.embedding_benchmark import recall_at_k, run_benchmark, sample_chunks, top_k
+
+
+def _fake_embed(text, dimensions=1024, normalize=True):
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    return rng.standard_normal(1024)[:dimensions].tolist()
+
+
+def _config(doc_dir):
+    return {
+        "elasticsearch": {"index": "idx"},
+        "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        "ingest": {"chunking": {"chunk_size": 5, "overlap": 0}},
+    }
+
+
+class TestTopK:
+    def test_ranks_by_cosine_similarity(self):
+        corpus = np.array([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]])
+        queries = np.array([[2.0, 0.1]])
+        assert top_k(corpus, queries, 2).tolist() == [[0, 2]]
+
+    def test_k_larger_than_corpus(self):
+        corpus = np.array([[1.0, 0.0]])
+        assert top_k(corpus, np.array([[1.0, 1.0]]), 5).tolist() == [[0]]
+
+
+class TestRecallAtK:
+    def test_partial_overlap(self):
+        truth = np.array([[0, 1], [2, 3]])
+        found = np.array([[1, 0], [2, 4]])
+        assert recall_at_k(truth, found) == 0.75
+
+
+class TestSampleChunks:
+    def test_sample_is_bounded_and_deterministic(self, tmp_path):
+        for i in range(20):
+            (tmp_path / f"doc{i}.txt").write_text(f"document {i} body text here")
+        config = {"doc_sources": [{"type": "local", "path": str(tmp_path)}]}
+
+        first = sample_chunks(config, 5, seed=1)
+
+        assert len(first) == 5
+        assert first == sample_chunks(config, 5, seed=1)
+
+
+class TestRunBenchmark:
+    @patch("src.ingest.embedding_benchmark.embed", side_effect=_fake_embed)
+    @patch("src.ingest.embedding_benchmark.load_config")
+    def test_rows_per_dimension_largest_is_reference(self, mock_config, mock_embed, tmp_path):
+        for i in range(40):
+            (tmp_path / f"doc{i}.txt").write_text(f"chunk number {i} with words")
+        mock_config.return_value = _config(tmp_path)
+
+        rows = run_benchmark("dummy.yaml", [256, 1024], sample=30, queries=5, k=3)
+
+        assert [row["dimensions"] for row in rows] == [1024, 256]
+        assert rows[0]["recall_at_k"] == 1.0
+        assert 0.0 <= rows[1]["recall_at_k"] <= 1.0
+        assert rows[1]["bytes_per_vector"] == 256 * 4
+        mock_embed.assert_any_call("chunk number 0 with words", dimensions=256, normalize=True)
@@ -2,7 +2,7 @@
 
 from unittest.mock import patch
 
-from src.agents.extract_claims import extract_claims, parse_claims
+from src.agents.extract_claims import extract_claims, is_claim_list, parse_claims
 
 CLAIMS_RESPONSE = (
     "1. The return policy allows returns within 30 days.\n2. Shipping is free for orders over $50."
@@ -100,6 +100,18 @@ class TestExtractClaims:
         extract_claims(state)
         assert mock_llm.call_count == 2
 
+    @patch("src.agents.extract_claims.call_llm", return_value=CLAIMS_RESPONSE)
+    def test_no_cache_breakpoints(self, mock_llm):
+        state = {
+            "responses": [{"prompt": "p", "response": "Returns take 30 days."}],
+            "config": {"prompt_cache": True},
+        }
+        extract_claims(state)
+        kwargs = mock_llm.call_args.kwargs
+        assert kwargs["prompt"].endswith("Returns take 30 days.")
+        assert "cache" not in kwargs
+        assert "prefix" not in kwargs
+
     @patch("src.agents.extract_claims.call_llm")
     def test_empty_responses_no_llm_call(self, mock_llm):
         state = {"responses": []}
@@ -121,3 +133,64 @@ class TestExtractClaims:
         extract_claims(state)
         assert len(state["claims"]) == 3
         assert state["claims"][2]["source_prompt"] == "p2"
+
+
+CASCADE_CONFIG = {"models": {"extract_claims": {"model": "strong-model", "cascade": "fast-model"}}}
+
+
+class TestCascade:
+    def _state(self):
+        return {
+            "responses": [{"prompt": "p", "response": "Returns take 30 days."}],
+            "config": CASCADE_CONFIG,
+        }
+
+    def test_is_claim_list(self):
+        assert is_claim_list(CLAIMS_RESPONSE)
+        assert is_claim_list("NO CLAIMS")
+        assert not is_claim_list("Sure! Here are the claims you asked for.")
+
+    @patch("src.agents.extract_claims.call_llm", return_value=CLAIMS_RESPONSE)
+    def test_well_formed_fast_answer_used(self, mock_llm):
+        state = self._state()
+        extract_claims(state)
+
+        assert mock_llm.call_count == 1
+        assert mock_llm.call_args.kwargs["model_id"] == "fast-model"
+        assert len(state["claims"]) == 2
+
+    @patch(
+        "src.agents.extract_claims.call_llm",
+        side_effect=["Sure! Here you go.", CLAIMS_RESPONSE],
+    )
+    def test_malformed_fast_answer_escalates(self, mock_llm):
+        state = self._state()
+        extract_claims(state)
+
+        assert mock_llm.call_args.kwargs["model_id"] == "strong-model"
+        assert len(state["claims"]) == 2
+
+    def test_batch_jobs_escalate_malformed_answers(self, tmp_path):
+        def answer(model_id, body):
+            text = body["messages"][0]["content"]
+            if model_id == "fast-model" and "30 days" in text:
+                return {"content": [{"text": "Sure! Here you go."}]}
+            return {"content": [{"text": f"1. {model_id} claim"}]}
+
+        batch = {"transport": "local", "directory": str(tmp_path), "min_records": 1}
+        state = {
+            "responses": [
+                {"prompt": "p1", "response": "Returns take 30 days."},
+                {"prompt": "p2", "response": "Shipping is free."},
+            ],
+            "config": {**CASCADE_CONFIG, "batch": batch},
+        }
+        with (
+            patch("src.wrappers.bedrock_batch._run_local", side_effect=answer),
+            patch("src.agents.extract_claims.call_llm") as mock_llm,
+        ):
+            extract_claims(state)
+
+        mock_llm.assert_not_called()
+        assert [c["text"] for c in state["claims"]] == ["strong-model claim", "fast-model claim"]
+        assert [c["source_prompt"] for c in state["claims"]] == ["p1", "p2"]
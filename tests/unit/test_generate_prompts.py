@@ -1,8 +1,11 @@
 """Tests for generate_prompts agent."""
 
+import hashlib
+import re
 from unittest.mock import patch
 
-from src.agents.generate_prompts import generate_prompts, parse_prompts
+from src.agents.generate_prompts import generate_prompts, parse_prompts, plan_shards
+from src.wrappers.bedrock import track_usage
 
 
 def _make_state(num_prompts=3):
@@ -87,3 +90,125 @@ class TestGeneratePrompts:
         generate_prompts(state)
         assert isinstance(state["prompts"], list)
         assert all(isinstance(p, str) for p in state["prompts"])
+
+
+class TestPreviousPrompts:
+    @patch("src.agents.generate_prompts.call_llm", return_value=NUMBERED_RESPONSE)
+    def test_previous_prompts_excluded(self, mock_llm):
+        state = _make_state(num_prompts=3)
+        state["previous_prompts"] = ["Do you offer free shipping?"]
+        generate_prompts(state)
+
+        assert "Do you offer free shipping?" not in state["prompts"]
+        assert len(state["prompts"]) == 2
+        assert "Do not repeat" in mock_llm.call_args[0][0]
+
+
+class TestCategories:
+    @patch(
+        "src.agents.generate_prompts.call_llm",
+        return_value="1. [returns] Can I return a TV?\n2. [bogus] Is shipping free?\n3. No tag",
+    )
+    def test_categories_parsed_alongside_prompts(self, mock_llm):
+        state = _make_state(num_prompts=3)
+        generate_prompts(state)
+
+        assert state["prompts"] == ["Can I return a TV?", "Is shipping free?", "No tag"]
+        assert state["prompt_categories"] == ["returns", None, None]
+
+
+def _sharded_state(num_prompts, **generation):
+    state = _make_state(num_prompts)
+    state["config"]["evaluation"]["generation"] = {"shard_size": 5, **generation}
+    return state
+
+
+def _distinct(prompt, system="", model_id=None):
+    """Fake generator: unrelated prompts, unique to the shard's request and position."""
+    count = int(re.search(r"Generate (\d+)", prompt).group(1))
+    lines = []
+    for i in range(count):
+        digest = hashlib.sha256(f"{prompt}{i}".encode()).hexdigest()
+        lines.append(f"{i + 1}. Question {' '.join(digest[k : k + 4] for k in range(0, 24, 4))}")
+    return "\n".join(lines)
+
+
+SHARED_PROMPTS = (
+    "1. Can I return a TV bought on sale?\n"
+    "2. How long does express shipping take to Alaska?\n"
+    "3. Is there a price match guarantee for online orders?\n"
+    "4. Do gift cards ever expire?\n"
+    "5. What warranty covers refurbished laptops?"
+)
+
+
+class TestSharding:
+    def test_small_suite_is_one_shard(self):
+        assert plan_shards(3, ["a", "b"], 25) == [(("a", "b"), 3)]
+
+    def test_large_suite_splits_by_category_and_block(self):
+        assert plan_shards(23, ["a", "b"], 5) == [
+            (("a",), 5),
+            (("a",), 5),
+            (("a",), 2),
+            (("b",), 5),
+            (("b",), 5),
+            (("b",), 1),
+        ]
+
+    @patch("src.agents.generate_prompts.call_llm", side_effect=_distinct)
+    def test_shards_fill_every_category(self, mock_llm):
+        state = _sharded_state(num_prompts=21)
+        generate_prompts(state)
+
+        assert mock_llm.call_count == 6
+        assert len(state["prompts"]) == 21
+        assert len(set(state["prompts"])) == 21
+        assert state["prompt_categories"] == ["returns"] * 7 + ["shipping"] * 7 + ["pricing"] * 7
+
+    @patch("src.agents.generate_prompts.call_llm")
+    def test_duplicates_across_shards_are_topped_up(self, mock_llm):
+        def generate(prompt, system="", model_id=None):
+            if "Do not repeat" in prompt:
+                return _distinct(prompt).replace("Question", "Follow-up")
+            # Every first-round shard returns the same prompts.
+            return SHARED_PROMPTS
+
+        mock_llm.side_effect = generate
+        state = _sharded_state(num_prompts=15)
+        generate_prompts(state)
+
+        assert len(state["prompts"]) == 15
+        assert state["prompts"][:5] == parse_prompts(SHARED_PROMPTS)
+        assert mock_llm.call_count == 3 + 2
+
+    @patch(
+        "src.agents.generate_prompts.call_llm",
+        return_value=(
+            "1. Can I return a TV bought on sale last month?\n"
+            "2. Can I return a TV bought on sale last month please?\n"
+            "3. can i return a tv bought on sale last month"
+        ),
+    )
+    def test_near_duplicates_removed(self, mock_llm):
+        state = _make_state(num_prompts=3)
+        generate_prompts(state)
+        assert state["prompts"] == ["Can I return a TV bought on sale last month?"]
+
+    @patch("src.agents.generate_prompts.call_llm", return_value="")
+    def test_top_up_rounds_bounded(self, mock_llm):
+        state = _sharded_state(num_prompts=15, top_up_rounds=4)
+        generate_prompts(state)
+        assert state["prompts"] == []
+        assert mock_llm.call_count == 3
+
+    def test_shard_usage_counted_in_run_totals(self):
+        def invoke(model_for, body):
+            prompt = body["messages"][0]["content"]
+            return {"content": [{"text": _distinct(prompt)}], "usage": {"output_tokens": 10}}
+
+        state = _sharded_state(num_prompts=15)
+        with patch("src.wrappers.bedrock._invoke", side_effect=invoke), track_usage() as usage:
+            generate_prompts(state)
+        assert usage["calls"] == 3
+        assert usage["output_tokens"] == 30
@@ -0,0 +1,74 @@
+"""Tests for blue/green index generations."""
+
+from unittest.mock import patch
+
+from src.ingest.blue_green import (
+    cleanup_generations,
+    create_generation,
+    generation_number,
+    publish_generation,
+    seed_generation,
+)
+
+MODULE = "src.ingest.blue_green"
+
+
+class TestGenerationNumber:
+    def test_parses_suffix(self):
+        assert generation_number("docs", "docs-v12") == 12
+
+    def test_rejects_other_indices(self):
+        assert generation_number("docs", "docs") is None
+        assert generation_number("docs", "docs-archive-v1") is None
+        assert generation_number("docs", "other-v1") is None
+
+
+class TestCreateGeneration:
+    @patch(f"{MODULE}.create_index")
+    @patch(f"{MODULE}.get_mappings")
+    @patch(f"{MODULE}.list_indices", return_value=[])
+    @patch(f"{MODULE}.alias_target", return_value=None)
+    def test_first_generation(self, mock_target, mock_list, mock_mappings, mock_create):
+        generation = create_generation("docs")
+        assert generation == {"alias": "docs", "index": "docs-v1", "previous": None}
+        mock_create.assert_called_once_with("docs-v1", None)
+        mock_mappings.assert_not_called()
+
+    @patch(f"{MODULE}.create_index")
+    @patch(f"{MODULE}.get_mappings", return_value={"properties": {"content": {"type": "text"}}})
+    @patch(f"{MODULE}.list_indices", return_value=["docs-v2", "docs-v10", "docs-v9"])
+    @patch(f"{MODULE}.alias_target", return_value="docs-v10")
+    def test_next_generation_copies_mappings(
+        self, mock_target, mock_list, mock_mappings, mock_create
+    ):
+        generation = create_generation("docs")
+        assert generation["index"] == "docs-v11"
+        assert generation["previous"] == "docs-v10"
+        mock_mappings.assert_called_once_with("docs-v10")
+        mock_create.assert_called_once_with(
+            "docs-v11", {"properties": {"content": {"type": "text"}}}
+        )
+
+
+class TestPublishAndCleanup:
+    @patch(f"{MODULE}.copy_index")
+    def test_seed_copies_live_index(self, mock_copy):
+        seed_generation({"alias": "docs", "index": "docs-v2", "previous": "docs-v1"})
+        mock_copy.assert_called_once_with("docs-v1", "docs-v2")
+
+    @patch(f"{MODULE}.copy_index")
+    def test_seed_without_live_index_is_noop(self, mock_copy):
+        seed_generation({"alias": "docs", "index": "docs-v1", "previous": None})
+        mock_copy.assert_not_called()
+
+    @patch(f"{MODULE}.swap_alias")
+    def test_publish_swaps_alias(self, mock_swap):
+        publish_generation({"alias": "docs", "index": "docs-v2", "previous": "docs-v1"})
+        mock_swap.assert_called_once_with("docs", "docs-v2", "docs-v1")
+
+    @patch(f"{MODULE}.delete_index")
+    @patch(f"{MODULE}.list_indices", return_value=["docs-v1", "docs-v2", "docs-v3", "docs-v4"])
+    def test_cleanup_keeps_recent_generations(self, mock_list, mock_delete):
+        deleted = cleanup_generations("docs", "docs-v4", keep=1)
+        assert deleted == ["docs-v1", "docs-v2"]
+        assert mock_delete.call_count == 2
@@ -0,0 +1,110 @@
+"""Tests for the ingest checkpoint journal and progress tracking."""
+
+import json
+
+from src.ingest.checkpoint import (
+    append_record,
+    fail_chunks,
+    fail_file,
+    file_read,
+    new_progress,
+    read_journal,
+    settle,
+    start_journal,
+    track_chunk,
+)
+
+
+class TestJournal:
+    def test_missing_journal_is_empty(self, tmp_path):
+        journal = read_journal(str(tmp_path / "none.journal"))
+        assert journal == {"header": None, "done": {}, "failed": {}, "seeded": False}
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "ingest.journal")
+        start_journal(path, "idx", None, {"old.txt": {"chunk_ids": ["x"]}})
+        append_record(path, {"path": "a.txt", "entry": {"chunk_ids": ["a"]}})
+        append_record(path, {"path": "b.txt", "error": "boom"})
+
+        journal = read_journal(path)
+
+        assert journal["header"] == {"target": "idx", "generation": None}
+        assert journal["done"] == {
+            "old.txt": {"chunk_ids": ["x"]},
+            "a.txt": {"chunk_ids": ["a"]},
+        }
+        assert journal["failed"] == {"b.txt": "boom"}
+
+    def test_seeded_record_survives_restart(self, tmp_path):
+        path = str(tmp_path / "ingest.journal")
+        start_journal(path, "idx-v2", None)
+        assert read_journal(path)["seeded"] is False
+        append_record(path, {"seeded": True})
+        assert read_journal(path)["seeded"] is True
+
+        start_journal(path, "idx-v2", None, seeded=True)
+        assert read_journal(path)["seeded"] is True
+
+    def test_latest_record_wins(self, tmp_path):
+        path = str(tmp_path / "ingest.journal")
+        start_journal(path, "idx", None)
+        append_record(path, {"path": "a.txt", "error": "boom"})
+        append_record(path, {"path": "a.txt", "entry": {"chunk_ids": []}})
+
+        journal = read_journal(path)
+
+        assert journal["done"] == {"a.txt": {"chunk_ids": []}}
+        assert journal["failed"] == {}
+
+    def test_truncated_line_ignored(self, tmp_path):
+        path = tmp_path / "ingest.journal"
+        path.write_text(
+            json.dumps({"target": "idx", "generation": None})
+            + "\n"
+            + json.dumps({"path": "a.txt", "entry": {"chunk_ids": []}})
+            + '\n{"path": "b.t'
+        )
+        assert list(read_journal(str(path))["done"]) == ["a.txt"]
+
+
+class TestProgress:
+    def test_file_done_after_read_and_all_chunks_settled(self):
+        progress = new_progress()
+        track_chunk(progress, "a", "c1")
+        track_chunk(progress, "a", "c2")
+        assert file_read(progress, "a") == []
+        assert settle(progress, ["c1"]) == []
+        assert settle(progress, ["c2"]) == ["a"]
+
+    def test_file_without_pending_chunks_done_on_read(self):
+        progress = new_progress()
+        settle(progress, ["c1"])
+        track_chunk(progress, "a", "c1")
+        assert file_read(progress, "a") == ["a"]
+
+    def test_shared_chunk_settles_every_waiting_file(self):
+        progress = new_progress()
+        for path in ("a", "b"):
+            track_chunk(progress, path, "shared")
+            file_read(progress, path)
+        assert settle(progress, ["shared"]) == ["a", "b"]
+
+    def test_failed_chunk_fails_waiting_files_once(self):
+        progress = new_progress()
+        track_chunk(progress, "a", "c1")
+        track_chunk(progress, "a", "c2")
+        assert fail_chunks(progress, ["c1", "c2"]) == ["a"]
+        file_read(progress, "a")
+        assert settle(progress, ["c2"]) == []
+
+    def test_fail_file_is_idempotent(self):
+        progress = new_progress()
+        assert fail_file(progress, "a") is True
+        assert fail_file(progress, "a") is False
+
+    def test_file_failed_before_read_stays_failed(self):
+        progress = new_progress()
+        track_chunk(progress, "a", "x")
+        assert fail_chunks(progress, ["x"]) == ["a"]
+        assert file_read(progress, "a") == []
+        assert "a" not in progress["pending"]
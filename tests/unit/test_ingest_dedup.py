@@ -0,0 +1,60 @@
+"""Tests for MinHash/LSH near-duplicate detection."""
+
+import pytest
+
+from src.ingest.dedup import (
+    estimated_jaccard,
+    find_or_add,
+    minhash_signature,
+    new_lsh_index,
+    shingles,
+)
+
+POLICY = (
+    "Standard shipping takes five to seven business days within the continental "
+    "United States. Orders over fifty dollars ship free. Expedited shipping is "
+    "available for an additional fee and arrives in two business days."
+)
+REGIONAL_COPY = POLICY.replace("continental United States", "continental USA")
+UNRELATED = (
+    "Products are covered by a one year limited warranty against manufacturing "
+    "defects. The warranty does not cover accidental damage or normal wear."
+)
+
+
+class TestSignatures:
+    def test_shingles_short_text_is_single_shingle(self):
+        assert len(shingles("two words", size=3)) == 1
+
+    def test_signature_is_deterministic(self):
+        assert minhash_signature(POLICY) == minhash_signature(POLICY)
+
+    def test_similar_texts_have_high_estimate(self):
+        similarity = estimated_jaccard(minhash_signature(POLICY), minhash_signature(REGIONAL_COPY))
+        assert similarity > 0.7
+
+    def test_unrelated_texts_have_low_estimate(self):
+        similarity = estimated_jaccard(minhash_signature(POLICY), minhash_signature(UNRELATED))
+        assert similarity < 0.2
+
+
+class TestLshIndex:
+    def test_first_occurrence_is_added(self):
+        lsh = new_lsh_index({"threshold": 0.7})
+        assert find_or_add(lsh, "a", POLICY) is None
+        assert "a" in lsh["signatures"]
+
+    def test_near_duplicate_maps_to_canonical(self):
+        lsh = new_lsh_index({"threshold": 0.7})
+        find_or_add(lsh, "a", POLICY)
+        assert find_or_add(lsh, "b", REGIONAL_COPY) == "a"
+        assert "b" not in lsh["signatures"]
+
+    def test_below_threshold_is_kept(self):
+        lsh = new_lsh_index({"threshold": 0.99})
+        find_or_add(lsh, "a", POLICY)
+        assert find_or_add(lsh, "b", REGIONAL_COPY) is None
+
+    def test_bands_must_divide_num_perm(self):
+        with pytest.raises(ValueError):
+            new_lsh_index({"num_perm": 64, "bands": 10})
@@ -0,0 +1,67 @@
+"""Tests for the ingest manifest."""
+
+import json
+
+from src.ingest.manifest import (
+    MANIFEST_VERSION,
+    empty_manifest,
+    file_fingerprint,
+    is_unchanged,
+    load_manifest,
+    save_manifest,
+    stale_chunk_ids,
+)
+
+
+class TestLoadSaveManifest:
+    def test_missing_file_returns_empty(self, tmp_path):
+        manifest = load_manifest(str(tmp_path / "missing.json"), "idx")
+        assert manifest == empty_manifest("idx")
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "manifest.json")
+        manifest = empty_manifest("idx")
+        manifest["files"]["a.txt"] = {"sha256": "abc", "size": 3, "chunk_ids": ["c1"]}
+        save_manifest(path, manifest)
+        assert load_manifest(path, "idx") == manifest
+
+    def test_different_index_returns_empty(self, tmp_path):
+        path = str(tmp_path / "manifest.json")
+        manifest = empty_manifest("old_index")
+        manifest["files"]["a.txt"] = {"sha256": "abc", "size": 3, "chunk_ids": []}
+        save_manifest(path, manifest)
+        assert load_manifest(path, "new_index")["files"] == {}
+
+    def test_different_version_returns_empty(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        path.write_text(
+            json.dumps({"version": MANIFEST_VERSION + 1, "index": "idx", "files": {"a": {}}})
+        )
+        assert load_manifest(str(path), "idx")["files"] == {}
+
+
+class TestFingerprint:
+    def test_hash_and_size(self, tmp_path):
+        path = tmp_path / "doc.txt"
+        path.write_bytes(b"hello")
+        fp = file_fingerprint(path)
+        assert fp["size"] == 5
+        assert fp["sha256"] == "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+
+    def test_is_unchanged(self):
+        fp = {"sha256": "abc", "size": 3}
+        assert is_unchanged({"sha256": "abc", "size": 3, "chunk_ids": []}, fp)
+        assert not is_unchanged({"sha256": "abd", "size": 3}, fp)
+        assert not is_unchanged(None, fp)
+
+
+class TestStaleChunkIds:
+    def test_removed_ids_are_stale(self):
+        previous = {"a": {"chunk_ids": ["c1", "c2"]}, "b": {"chunk_ids": ["c3"]}}
+        current = {"a": {"chunk_ids": ["c1"]}}
+        assert stale_chunk_ids(previous, current) == {"c2", "c3"}
+
+    def test_shared_id_kept_if_any_file_still_produces_it(self):
+        previous = {"a": {"chunk_ids": ["shared"]}, "b": {"chunk_ids": ["shared"]}}
+        current = {"b": {"chunk_ids": ["shared"]}}
+        assert stale_chunk_ids(previous, current) == set()
@@ -0,0 +1,68 @@
+"""Tests for post-ingest index optimisation."""
+
+from unittest.mock import patch
+
+from src.ingest.optimize import begin_bulk_load, end_bulk_load, finalize_index
+
+MODULE = "src.ingest.optimize"
+
+
+class TestBulkLoadSettings:
+    @patch(f"{MODULE}.put_index_settings")
+    @patch(f"{MODULE}.get_index_settings")
+    def test_disables_refresh_and_replicas_and_saves_previous(self, mock_get, mock_put):
+        mock_get.return_value = {"index.refresh_interval": "5s", "index.number_of_replicas": "2"}
+
+        saved = begin_bulk_load("idx")
+
+        mock_put.assert_called_once_with(
+            "idx", {"index.refresh_interval": "-1", "index.number_of_replicas": 0}
+        )
+        assert saved == {"index.refresh_interval": "5s", "index.number_of_replicas": "2"}
+
+    @patch(f"{MODULE}.put_index_settings")
+    @patch(f"{MODULE}.get_index_settings")
+    def test_unset_settings_restored_to_default(self, mock_get, mock_put):
+        mock_get.return_value = {"index.number_of_replicas": "1"}
+        saved = begin_bulk_load("idx")
+        mock_put.reset_mock()
+
+        end_bulk_load("idx", saved)
+
+        mock_put.assert_called_once_with(
+            "idx", {"index.refresh_interval": None, "index.number_of_replicas": "1"}
+        )
+
+    @patch(f"{MODULE}.put_index_settings")
+    @patch(f"{MODULE}.get_index_settings", return_value=None)
+    def test_missing_index_left_alone(self, mock_get, mock_put):
+        saved = begin_bulk_load("idx")
+        end_bulk_load("idx", saved)
+        assert saved is None
+        mock_put.assert_not_called()
+
+
+class TestFinalizeIndex:
+    @patch(f"{MODULE}.vector_search")
+    @patch(f"{MODULE}.force_merge")
+    @patch(f"{MODULE}.refresh_index")
+    def test_refresh_merge_and_timings(self, mock_refresh, mock_merge, mock_search):
+        timings = finalize_index("idx", {})
+
+        mock_refresh.assert_called_once_with("idx")
+        mock_merge.assert_called_once_with("idx", 1)
+        mock_search.assert_not_called()
+        assert set(timings) == {"refresh", "force_merge"}
+
+    @patch(f"{MODULE}.vector_search")
+    @patch(f"{MODULE}.force_merge")
+    @patch(f"{MODULE}.refresh_index")
+    def test_warmup_queries_and_segment_count(self, mock_refresh, mock_merge, mock_search):
+        timings = finalize_index(
+            "idx", {"max_num_segments": 3, "warmup_queries": ["refunds", "shipping"]}
+        )
+
+        mock_merge.assert_called_once_with("idx", 3)
+        assert mock_search.call_count == 2
+        mock_search.assert_called_with("shipping", index="idx")
+        assert "warmup" in timings
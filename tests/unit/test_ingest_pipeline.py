@@ -1,10 +1,37 @@
 """Tests for doc ingest pipeline."""
 
+import hashlib
+import io
+import json
 from unittest.mock import patch
 
 import pytest
 
-from src.ingest.pipeline import chunk_text, clean_text, run_ingest
+from src.ingest.pipeline import (
+    CHUNK_MAPPINGS,
+    MAX_TAG_CHARS,
+    chunk_mappings,
+    chunk_text,
+    chunk_words,
+    clean_text,
+    document_metadata,
+    iter_chunks,
+    iter_clean_words,
+    iter_file_chunks,
+    prepare_document,
+    run_ingest,
+)
+
+
+@pytest.fixture(autouse=True)
+def _nothing_indexed_yet():
+    """Existence checks see an empty index unless a test says otherwise."""
+    with (
+        patch("src.ingest.pipeline.existing_ids", return_value=set()) as mock_existing,
+        patch("src.ingest.pipeline.ensure_index"),
+        patch("src.ingest.pipeline.bump_generation"),
+    ):
+        yield mock_existing
 
 
 class TestCleanText:
@@ -59,8 +86,87 @@ class TestChunkText:
         assert len(last_words) <= 40
 
 
+class TestStreamingCleanAndChunk:
+    RAW = "<div>  Hello <b>wor</b>ld\n\n<p class='x'>second   para</p> tail<br/>end  </div>"
+
+    @pytest.mark.parametrize("block_size", [1, 2, 3, 7, 64])
+    def test_clean_words_match_clean_text_at_any_block_size(self, block_size):
+        words = list(iter_clean_words(io.StringIO(self.RAW), block_size=block_size))
+        assert words == clean_text(self.RAW).split()
+
+    def test_tag_split_across_blocks_is_removed(self):
+        words = list(iter_clean_words(io.StringIO("foo <span class='a b'>bar"), block_size=6))
+        assert words == ["foo", "bar"]
+
+    def test_unclosed_angle_bracket_kept(self):
+        raw = "a < b and c"
+        assert list(iter_clean_words(io.StringIO(raw), block_size=3)) == clean_text(raw).split()
+
+    def test_stray_angle_bracket_not_carried_past_limit(self):
+        body = [f"w{i}" for i in range(3000)]
+        raw = "a < " + " ".join(body) + " <b>end</b>"
+        words = list(iter_clean_words(io.StringIO(raw), block_size=64))
+        assert words == ["a", "<", *body, "end"]
+
+    def test_tag_longer_than_limit_is_literal(self):
+        raw = "a <" + "x " * MAX_TAG_CHARS + "> b"
+        words = list(iter_clean_words(io.StringIO(raw), block_size=256))
+        assert clean_text(raw).split() == ["a", "b"]
+        assert words[:2] == ["a", "<x"]
+        assert words[-1] == "b"
+
+    @pytest.mark.parametrize(
+        ("n_words", "size", "overlap"), [(0, 4, 1), (4, 4, 1), (50, 40, 10), (97, 10, 3)]
+    )
+    def test_iter_chunks_matches_chunk_text(self, n_words, size, overlap):
+        text = " ".join(f"w{i}" for i in range(n_words))
+        assert list(iter_chunks(text.split(), size, overlap)) == chunk_text(text, size, overlap)
+
+    def test_iter_chunks_is_lazy(self):
+        def words():
+            yield from ["a", "b", "c"]
+            raise AssertionError("read past the first chunk")
+
+        assert next(iter_chunks(words(), chunk_size=2, overlap=0)) == "a b"
+
+    def test_file_chunks_match_whole_file_path(self, tmp_path):
+        path = tmp_path / "manual.md"
+        raw = "<h1>Manual</h1>\n" + "\n".join(f"<p>line {i} of   text</p>" for i in range(400))
+        path.write_text(raw)
+        assert list(iter_file_chunks(str(path))) == chunk_text(clean_text(raw))
+
+
+class TestChunkWords:
+    def test_default_is_fixed_offsets(self):
+        words = [f"w{i}" for i in range(100)]
+        assert list(chunk_words(words)) == chunk_text(" ".join(words))
+
+    def test_fixed_respects_size_and_overlap(self):
+        words = [f"w{i}" for i in range(100)]
+        chunking = {"strategy": "fixed", "chunk_size": 40, "overlap": 10}
+        assert list(chunk_words(words, chunking)) == chunk_text(" ".join(words), 40, 10)
+
+    def test_content_defined_strategy(self):
+        words = [f"w{i}." for i in range(30)]
+        chunking = {"strategy": "content_defined", "min_words": 2, "avg_words": 5, "max_words": 10}
+        chunks = list(chunk_words(words, chunking))
+        assert " ".join(chunks).split() == words
+        assert all(len(c.split()) <= 10 for c in chunks)
+
+    def test_unknown_strategy_raises(self):
+        with pytest.raises(ValueError, match="Unknown chunking strategy"):
+            chunk_words([], {"strategy": "semantic"})
+
+
+class TestPrepareDocument:
+    def test_reads_cleans_and_chunks(self, tmp_path):
+        path = tmp_path / "doc.md"
+        path.write_text("<h1>Title</h1>\n\nBody   text")
+        assert prepare_document(str(path)) == ["Title Body text"]
+
+
 class TestRunIngest:
-    @patch("src.ingest.pipeline.index_doc")
+    @patch("src.ingest.pipeline.bulk_index")
     @patch("src.ingest.pipeline.embed", return_value=[0.1, 0.2, 0.3])
     @patch("src.ingest.pipeline.load_config")
     def test_local_files_indexed(self, mock_config, mock_embed, mock_index, tmp_path):
@@ -78,9 +184,10 @@ class TestRunIngest:
         assert result["documents_processed"] == 2
         assert result["chunks_indexed"] >= 2
         assert mock_embed.call_count >= 2
-        assert mock_index.call_count >= 2
+        indexed = [doc for call in mock_index.call_args_list for doc in call.args[1]]
+        assert len(indexed) >= 2
 
-    @patch("src.ingest.pipeline.index_doc")
+    @patch("src.ingest.pipeline.bulk_index")
     @patch("src.ingest.pipeline.embed", return_value=[0.1])
     @patch("src.ingest.pipeline.load_config")
     def test_returns_accurate_counts(self, mock_config, mock_embed, mock_index, tmp_path):
@@ -107,15 +214,15 @@ class TestRunIngest:
             run_ingest("dummy.yaml")
 
     @patch("src.ingest.pipeline.load_config")
-    def test_s3_raises_not_implemented(self, mock_config):
+    def test_s3_without_bucket_raises(self, mock_config):
         mock_config.return_value = {
             "elasticsearch": {"index": "idx"},
-            "doc_sources": [{"type": "s3", "bucket": "my-bucket"}],
+            "doc_sources": [{"type": "s3", "prefix": "docs/"}],
         }
-        with pytest.raises(NotImplementedError):
+        with pytest.raises(ValueError, match="bucket"):
             run_ingest("dummy.yaml")
 
-    @patch("src.ingest.pipeline.index_doc")
+    @patch("src.ingest.pipeline.bulk_index")
     @patch("src.ingest.pipeline.embed", return_value=[0.5])
     @patch("src.ingest.pipeline.load_config")
     def test_recursive_file_discovery(self, mock_config, mock_embed, mock_index, tmp_path):
@@ -142,7 +249,7 @@ class TestRunIngest:
         with pytest.raises(ValueError, match="Unknown source type"):
             run_ingest("dummy.yaml")
 
-    @patch("src.ingest.pipeline.index_doc")
+    @patch("src.ingest.pipeline.bulk_index")
     @patch("src.ingest.pipeline.embed", return_value=[0.1])
     @patch("src.ingest.pipeline.load_config")
     def test_empty_directory_produces_zero(self, mock_config, mock_embed, mock_index, tmp_path):
@@ -158,10 +265,10 @@ class TestRunIngest:
         assert result["documents_processed"] == 0
         assert result["chunks_indexed"] == 0
 
-    @patch("src.ingest.pipeline.index_doc")
+    @patch("src.ingest.pipeline.bulk_index")
     @patch("src.ingest.pipeline.embed", return_value=[0.1])
     @patch("src.ingest.pipeline.load_config")
-    def test_index_doc_receives_content_and_embedding(
+    def test_bulk_index_receives_content_and_embedding(
         self, mock_config, mock_embed, mock_index, tmp_path
     ):
         doc_dir = tmp_path / "docs"
@@ -174,10 +281,907 @@ class TestRunIngest:
         }
 
         run_ingest("dummy.yaml")
-        _, kwargs = mock_index.call_args_list[0]
-        if not kwargs:
-            args = mock_index.call_args_list[0][0]
-            assert args[0] == "my_index"
-            body = args[2]
-            assert "content" in body
-            assert "embedding" in body
+        index, docs = mock_index.call_args_list[0].args
+        assert index == "my_index"
+        doc_id, body = docs[0]
+        assert doc_id == hashlib.sha256(b"test content").hexdigest()
+        assert body == {
+            "content": "test content",
+            "embedding": [0.1],
+            "source": str(doc_dir / "file.txt"),
+            "doc_type": "txt",
+            "tags": [],
+            "position": 0,
+        }
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_chunks_flushed_in_batches(self, mock_config, mock_embed, mock_index, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        for i in range(5):
+            (doc_dir / f"file{i}.txt").write_text(f"document number {i}")
+
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+
+        result = run_ingest("dummy.yaml", batch_size=2)
+        assert result["chunks_indexed"] == 5
+        assert [len(call.args[1]) for call in mock_index.call_args_list] == [2, 2, 1]
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", side_effect=lambda text: [float(len(text))])
+    @patch("src.ingest.pipeline.load_config")
+    def test_worker_pool_preserves_order(self, mock_config, mock_embed, mock_index, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        for i in range(6):
+            (doc_dir / f"file{i}.txt").write_text(f"<p>content   of file {i}</p>")
+
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+
+        result = run_ingest("dummy.yaml", workers=2)
+        assert result["documents_processed"] == 6
+        contents = [
+            body["content"] for call in mock_index.call_args_list for _, body in call.args[1]
+        ]
+        assert contents == [f"content of file {i}" for i in range(6)]
+
+
+def _incremental_config(doc_dir, manifest):
+    return {
+        "elasticsearch": {"index": "idx"},
+        "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        "ingest": {"manifest": str(manifest)},
+    }
+
+
+class TestIncrementalIngest:
+    @patch("src.ingest.pipeline.bulk_delete")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_unchanged_files_skipped(
+        self, mock_config, mock_embed, mock_index, mock_delete, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("alpha content")
+        (doc_dir / "b.txt").write_text("beta content")
+        mock_config.return_value = _incremental_config(doc_dir, tmp_path / "manifest.json")
+
+        first = run_ingest("dummy.yaml")
+        assert first["documents_processed"] == 2
+        mock_embed.reset_mock()
+
+        second = run_ingest("dummy.yaml")
+        assert second["documents_processed"] == 0
+        assert second["documents_skipped"] == 2
+        assert second["chunks_indexed"] == 0
+        assert second["chunks_deleted"] == 0
+        mock_embed.assert_not_called()
+        mock_delete.assert_not_called()
+
+    @patch("src.ingest.pipeline.bulk_delete")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_changed_file_reprocessed_and_old_chunk_deleted(
+        self, mock_config, mock_embed, mock_index, mock_delete, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("original text")
+        (doc_dir / "b.txt").write_text("static text")
+        mock_config.return_value = _incremental_config(doc_dir, tmp_path / "manifest.json")
+        run_ingest("dummy.yaml")
+
+        (doc_dir / "a.txt").write_text("edited text")
+        result = run_ingest("dummy.yaml")
+
+        assert result["documents_processed"] == 1
+        assert result["documents_skipped"] == 1
+        assert result["chunks_deleted"] == 1
+        old_id = hashlib.sha256(b"original text").hexdigest()
+        mock_delete.assert_called_once_with("idx", [old_id])
+
+    @patch("src.ingest.pipeline.bulk_delete")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_deleted_file_chunks_removed(
+        self, mock_config, mock_embed, mock_index, mock_delete, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("keep me")
+        (doc_dir / "b.txt").write_text("remove me")
+        mock_config.return_value = _incremental_config(doc_dir, tmp_path / "manifest.json")
+        run_ingest("dummy.yaml")
+
+        (doc_dir / "b.txt").unlink()
+        result = run_ingest("dummy.yaml")
+
+        assert result["chunks_deleted"] == 1
+        mock_delete.assert_called_once_with("idx", [hashlib.sha256(b"remove me").hexdigest()])
+
+    @patch("src.ingest.pipeline.bulk_delete")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_without_manifest_nothing_deleted(
+        self, mock_config, mock_embed, mock_index, mock_delete, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+        run_ingest("dummy.yaml")
+        result = run_ingest("dummy.yaml")
+
+        assert result["documents_processed"] == 1
+        assert result["documents_skipped"] == 0
+        mock_delete.assert_not_called()
+
+
+class TestSkipExistingChunks:
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_already_indexed_chunks_not_embedded(
+        self, mock_config, mock_embed, mock_index, _nothing_indexed_yet, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("already indexed")
+        (doc_dir / "b.txt").write_text("brand new")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+        _nothing_indexed_yet.side_effect = lambda index, ids: (
+            {hashlib.sha256(b"already indexed").hexdigest()} & set(ids)
+        )
+
+        result = run_ingest("dummy.yaml")
+
+        mock_embed.assert_called_once_with("brand new")
+        assert result["chunks_indexed"] == 1
+        assert result["chunks_skipped"] == 1
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_repeated_chunk_embedded_once_per_run(
+        self, mock_config, mock_embed, mock_index, _nothing_indexed_yet, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (doc_dir / name).write_text("Shared legal footer.")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+
+        result = run_ingest("dummy.yaml")
+
+        assert mock_embed.call_count == 1
+        assert result["chunks_indexed"] == 1
+        assert result["chunks_skipped"] == 2
+        checked = [
+            doc_id for call in _nothing_indexed_yet.call_args_list for doc_id in call.args[1]
+        ]
+        assert len(checked) == 1
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_existence_checked_in_batches(
+        self, mock_config, mock_embed, mock_index, _nothing_indexed_yet, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        for i in range(5):
+            (doc_dir / f"file{i}.txt").write_text(f"document {i}")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+
+        run_ingest("dummy.yaml", batch_size=2)
+
+        assert [len(call.args[1]) for call in _nothing_indexed_yet.call_args_list] == [2, 2, 1]
+
+
+class TestNearDuplicateIngest:
+    POLICY = (
+        "Standard shipping takes five to seven business days within the continental "
+        "United States. Orders over fifty dollars ship free. Expedited shipping is "
+        "available for an additional fee and arrives in two business days."
+    )
+
+    @patch("src.ingest.pipeline.bulk_add_values")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_regional_copy_collapsed_into_canonical(
+        self, mock_config, mock_embed, mock_index, mock_update, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "shipping_us.md").write_text(self.POLICY)
+        (doc_dir / "shipping_usa.md").write_text(
+            self.POLICY.replace("continental United States", "continental USA")
+        )
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+            "ingest": {"dedup": {"threshold": 0.7}, "manifest": str(tmp_path / "m.json")},
+        }
+
+        result = run_ingest("dummy.yaml")
+
+        assert result["chunks_indexed"] == 1
+        assert result["chunks_collapsed"] == 1
+        canonical_id = hashlib.sha256(self.POLICY.encode("utf-8")).hexdigest()
+        mock_update.assert_called_once_with(
+            "idx", "duplicate_sources", [(canonical_id, [str(doc_dir / "shipping_usa.md")])]
+        )
+        manifest = json.loads((tmp_path / "m.json").read_text())
+        assert manifest["files"][str(doc_dir / "shipping_usa.md")]["chunk_ids"] == [canonical_id]
+
+    @patch("src.ingest.pipeline.bulk_add_values")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_dedup_off_by_default(self, mock_config, mock_embed, mock_index, mock_update, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.md").write_text(self.POLICY)
+        (doc_dir / "b.md").write_text(self.POLICY.replace("fifty", "sixty"))
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        }
+
+        result = run_ingest("dummy.yaml")
+
+        assert result["chunks_indexed"] == 2
+        assert result["chunks_collapsed"] == 0
+        mock_update.assert_not_called()
+
+
+class TestOptimizeIngest:
+    @patch("src.ingest.pipeline.finalize_index", return_value={"refresh": 0.1})
+    @patch("src.ingest.pipeline.end_bulk_load")
+    @patch("src.ingest.pipeline.begin_bulk_load", return_value={"index.refresh_interval": "1s"})
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_settings_restored_and_timings_reported(
+        self, mock_config, mock_embed, mock_index, mock_begin, mock_end, mock_finalize, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+            "ingest": {"optimize": {"max_num_segments": 1}},
+        }
+
+        result = run_ingest("dummy.yaml")
+
+        mock_begin.assert_called_once_with("idx")
+        mock_end.assert_called_once_with("idx", {"index.refresh_interval": "1s"})
+        mock_finalize.assert_called_once_with("idx", {"max_num_segments": 1}, {})
+        assert result["optimize"] == {"refresh": 0.1}
+
+    @patch("src.ingest.pipeline.finalize_index")
+    @patch("src.ingest.pipeline.end_bulk_load")
+    @patch("src.ingest.pipeline.begin_bulk_load", return_value={})
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_settings_restored_when_load_fails(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_begin,
+        mock_end,
+        mock_finalize,
+        tmp_path,
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+            "ingest": {"optimize": True},
+        }
+
+        with (
+            patch(
+                "src.ingest.pipeline._prepared_documents", side_effect=RuntimeError("load failed")
+            ),
+            pytest.raises(RuntimeError, match="load failed"),
+        ):
+            run_ingest("dummy.yaml")
+
+        mock_end.assert_called_once_with("idx", {})
+        mock_finalize.assert_not_called()
+
+
+GENERATION = {"alias": "idx", "index": "idx-v2", "previous": "idx-v1"}
+
+
+class TestBlueGreenIngest:
+    def _config(self, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        return {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+            "ingest": {"blue_green": {"keep": 2}},
+        }
+
+    @patch("src.ingest.pipeline.cleanup_generations", return_value=["idx-v0"])
+    @patch("src.ingest.pipeline.publish_generation")
+    @patch("src.ingest.pipeline.seed_generation")
+    @patch("src.ingest.pipeline.create_generation")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_loads_new_generation_then_publishes(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_create,
+        mock_seed,
+        mock_publish,
+        mock_cleanup,
+        tmp_path,
+    ):
+        mock_config.return_value = self._config(tmp_path)
+        mock_create.return_value = GENERATION
+
+        result = run_ingest("dummy.yaml")
+
+        mock_create.assert_called_once_with("idx")
+        mock_seed.assert_called_once_with(GENERATION)
+        assert mock_index.call_args.args[0] == "idx-v2"
+        mock_publish.assert_called_once_with(GENERATION)
+        mock_cleanup.assert_called_once_with("idx", "idx-v2", 2)
+        assert result["index_generation"] == "idx-v2"
+        assert result["generations_deleted"] == ["idx-v0"]
+
+    @patch("src.ingest.pipeline.abandon_generation")
+    @patch("src.ingest.pipeline.publish_generation")
+    @patch("src.ingest.pipeline.seed_generation")
+    @patch("src.ingest.pipeline.create_generation")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_failed_load_abandons_generation(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_create,
+        mock_seed,
+        mock_publish,
+        mock_abandon,
+        tmp_path,
+    ):
+        mock_seed.side_effect = RuntimeError("es down")
+        mock_config.return_value = self._config(tmp_path)
+        mock_create.return_value = GENERATION
+
+        with pytest.raises(RuntimeError, match="es down"):
+            run_ingest("dummy.yaml")
+
+        mock_abandon.assert_called_once_with(GENERATION)
+        mock_publish.assert_not_called()
+
+
+def _checkpoint_config(doc_dir, journal, **ingest):
+    return {
+        "elasticsearch": {"index": "idx"},
+        "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+        "ingest": {"checkpoint": str(journal), **ingest},
+    }
+
+
+class TestResumableIngest:
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed")
+    @patch("src.ingest.pipeline.load_config")
+    def test_failed_file_does_not_abort_run(self, mock_config, mock_embed, mock_index, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("good text")
+        (doc_dir / "b.txt").write_text("bad text")
+        journal = tmp_path / "ingest.journal"
+        mock_config.return_value = _checkpoint_config(doc_dir, journal)
+
+        def embed_or_fail(text):
+            if text == "bad text":
+                raise RuntimeError("throttled")
+            return [0.1]
+
+        mock_embed.side_effect = embed_or_fail
+
+        result = run_ingest("dummy.yaml")
+
+        assert result["chunks_indexed"] == 1
+        assert result["documents_failed"] == 1
+        assert result["failed"] == {str(doc_dir / "b.txt"): "throttled"}
+        lines = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert lines[0] == {"target": "idx", "generation": None}
+        assert {"path": str(doc_dir / "a.txt"), "entry": {"chunk_ids": [_id("good text")]}} in (
+            lines
+        )
+        assert {"path": str(doc_dir / "b.txt"), "error": "throttled"} in lines
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_failed_bulk_fails_only_its_files(self, mock_config, mock_embed, mock_index, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("first")
+        (doc_dir / "b.txt").write_text("second")
+        mock_config.return_value = _checkpoint_config(doc_dir, tmp_path / "j", batch_size=1)
+        mock_index.side_effect = [RuntimeError("429"), None]
+
+        result = run_ingest("dummy.yaml")
+
+        assert list(result["failed"]) == [str(doc_dir / "a.txt")]
+        assert result["chunks_indexed"] == 1
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed")
+    @patch("src.ingest.pipeline.load_config")
+    def test_failed_chunk_retried_for_later_file(
+        self, mock_config, mock_embed, mock_index, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("shared text")
+        (doc_dir / "b.txt").write_text(" ".join(f"word{i}" for i in range(20)))
+        (doc_dir / "c.txt").write_text("shared text")
+        journal = tmp_path / "ingest.journal"
+        mock_config.return_value = _checkpoint_config(
+            doc_dir,
+            journal,
+            batch_size=1,
+            embed_concurrency=1,
+            chunking={"chunk_size": 2, "overlap": 0},
+        )
+        mock_embed.side_effect = [RuntimeError("throttled")] + [[0.1]] * 20
+
+        result = run_ingest("dummy.yaml")
+
+        assert result["failed"] == {str(doc_dir / "a.txt"): "throttled"}
+        assert result["chunks_indexed"] == 11
+        lines = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert {"path": str(doc_dir / "c.txt"), "entry": {"chunk_ids": [_id("shared text")]}} in (
+            lines
+        )
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_failed_existence_check_fails_only_its_files(
+        self, mock_config, mock_embed, mock_index, _nothing_indexed_yet, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("first")
+        (doc_dir / "b.txt").write_text("second")
+        mock_config.return_value = _checkpoint_config(doc_dir, tmp_path / "j", batch_size=1)
+        _nothing_indexed_yet.side_effect = [RuntimeError("mget timed out"), set()]
+
+        result = run_ingest("dummy.yaml")
+
+        assert result["failed"] == {str(doc_dir / "a.txt"): "mget timed out"}
+        assert result["chunks_indexed"] == 1
+
+    @patch("src.ingest.pipeline.bulk_delete")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_failed_stale_delete_retried_next_run(
+        self, mock_config, mock_embed, mock_index, mock_delete, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("keep me")
+        (doc_dir / "b.txt").write_text("remove me")
+        manifest = tmp_path / "manifest.json"
+        mock_config.return_value = {
+            **_checkpoint_config(doc_dir, tmp_path / "j"),
+            "ingest": {"checkpoint": str(tmp_path / "j"), "manifest": str(manifest)},
+        }
+        run_ingest("dummy.yaml")
+
+        (doc_dir / "b.txt").unlink()
+        mock_delete.side_effect = [RuntimeError("es down"), None]
+        result = run_ingest("dummy.yaml")
+
+        assert result["failed"] == {str(doc_dir / "b.txt"): "es down"}
+        assert result["chunks_deleted"] == 0
+        assert str(doc_dir / "b.txt") in json.loads(manifest.read_text())["files"]
+
+        result = run_ingest("dummy.yaml")
+        assert result["chunks_deleted"] == 1
+        assert mock_delete.call_args.args == ("idx", [_id("remove me")])
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_resume_skips_done_files_and_retries_failed(
+        self, mock_config, mock_embed, mock_index, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("done already")
+        (doc_dir / "b.txt").write_text("failed before")
+        journal = tmp_path / "ingest.journal"
+        journal.write_text(
+            json.dumps({"target": "idx", "generation": None})
+            + "\n"
+            + json.dumps({"path": str(doc_dir / "a.txt"), "entry": {"chunk_ids": ["x"]}})
+            + "\n"
+            + json.dumps({"path": str(doc_dir / "b.txt"), "error": "throttled"})
+            + "\n"
+        )
+        mock_config.return_value = _checkpoint_config(doc_dir, journal)
+
+        result = run_ingest("dummy.yaml", resume=True)
+
+        mock_embed.assert_called_once_with("failed before")
+        assert result["documents_resumed"] == 1
+        assert result["documents_processed"] == 1
+        assert result["failed"] == {}
+        assert not journal.exists()
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_without_resume_journal_is_ignored(self, mock_config, mock_embed, mock_index, tmp_path):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        journal = tmp_path / "ingest.journal"
+        journal.write_text(
+            json.dumps({"target": "idx", "generation": None})
+            + "\n"
+            + json.dumps({"path": str(doc_dir / "a.txt"), "entry": {"chunk_ids": ["x"]}})
+            + "\n"
+        )
+        mock_config.return_value = _checkpoint_config(doc_dir, journal)
+
+        result = run_ingest("dummy.yaml")
+
+        assert result["documents_processed"] == 1
+        assert result["documents_resumed"] == 0
+
+    @patch("src.ingest.pipeline.load_config")
+    def test_resume_requires_checkpoint(self, mock_config, tmp_path):
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(tmp_path)}],
+        }
+        with pytest.raises(ValueError, match="checkpoint"):
+            run_ingest("dummy.yaml", resume=True)
+
+    @patch("src.ingest.pipeline.cleanup_generations", return_value=[])
+    @patch("src.ingest.pipeline.publish_generation")
+    @patch("src.ingest.pipeline.seed_generation")
+    @patch("src.ingest.pipeline.create_generation")
+    @patch("src.ingest.pipeline.is_live", return_value=False)
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_resume_reuses_unpublished_generation(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_live,
+        mock_create,
+        mock_seed,
+        mock_publish,
+        mock_cleanup,
+        tmp_path,
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        journal = tmp_path / "ingest.journal"
+        journal.write_text(
+            json.dumps({"target": "idx-v2", "generation": GENERATION})
+            + "\n"
+            + json.dumps({"seeded": True})
+            + "\n"
+        )
+        mock_config.return_value = _checkpoint_config(doc_dir, journal, blue_green=True)
+
+        run_ingest("dummy.yaml", resume=True)
+
+        mock_create.assert_not_called()
+        mock_seed.assert_not_called()
+        assert mock_index.call_args.args[0] == "idx-v2"
+        mock_publish.assert_called_once_with(GENERATION)
+
+    @patch("src.ingest.pipeline.cleanup_generations", return_value=[])
+    @patch("src.ingest.pipeline.publish_generation")
+    @patch("src.ingest.pipeline.seed_generation")
+    @patch("src.ingest.pipeline.create_generation", return_value=GENERATION)
+    @patch("src.ingest.pipeline.is_live", return_value=False)
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_resume_after_crash_during_seed_seeds_again(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_live,
+        mock_create,
+        mock_seed,
+        mock_publish,
+        mock_cleanup,
+        tmp_path,
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        journal = tmp_path / "ingest.journal"
+        mock_config.return_value = _checkpoint_config(doc_dir, journal, blue_green=True)
+        mock_seed.side_effect = [TimeoutError("copy_index timed out"), None]
+
+        with pytest.raises(TimeoutError):
+            run_ingest("dummy.yaml")
+        mock_publish.assert_not_called()
+
+        run_ingest("dummy.yaml", resume=True)
+
+        mock_create.assert_called_once()
+        assert mock_seed.call_args_list == [((GENERATION,),), ((GENERATION,),)]
+        mock_publish.assert_called_once_with(GENERATION)
+
+    @patch("src.ingest.pipeline.cleanup_generations", return_value=[])
+    @patch("src.ingest.pipeline.publish_generation")
+    @patch("src.ingest.pipeline.abandon_generation")
+    @patch("src.ingest.pipeline.seed_generation")
+    @patch("src.ingest.pipeline.create_generation")
+    @patch("src.ingest.pipeline.is_live", return_value=False)
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_fresh_run_drops_unpublished_generation(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_live,
+        mock_create,
+        mock_seed,
+        mock_abandon,
+        mock_publish,
+        mock_cleanup,
+        tmp_path,
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        journal = tmp_path / "ingest.journal"
+        journal.write_text(json.dumps({"target": "idx-v2", "generation": GENERATION}) + "\n")
+        mock_config.return_value = _checkpoint_config(doc_dir, journal, blue_green=True)
+        mock_create.return_value = {**GENERATION, "index": "idx-v3"}
+
+        run_ingest("dummy.yaml")
+
+        mock_abandon.assert_called_once_with(GENERATION)
+        mock_create.assert_called_once_with("idx")
+        assert mock_index.call_args.args[0] == "idx-v3"
+
+    @patch("src.ingest.pipeline.abandon_generation")
+    @patch("src.ingest.pipeline.seed_generation")
+    @patch("src.ingest.pipeline.create_generation", return_value=GENERATION)
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_aborted_run_keeps_generation_for_resume(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_create,
+        mock_seed,
+        mock_abandon,
+        tmp_path,
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        journal = tmp_path / "ingest.journal"
+        mock_config.return_value = _checkpoint_config(doc_dir, journal, blue_green=True)
+        mock_seed.side_effect = RuntimeError("es down")
+
+        with pytest.raises(RuntimeError):
+            run_ingest("dummy.yaml")
+
+        mock_abandon.assert_not_called()
+        header = json.loads(journal.read_text().splitlines()[0])
+        assert header == {"target": "idx-v2", "generation": GENERATION}
+
+
+def _id(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TestChunkMetadata:
+    def test_document_metadata_from_source(self):
+        source = {"type": "local", "path": "docs", "doc_type": "policy", "tags": ["refunds"]}
+        assert document_metadata("docs/a.md", source) == {
+            "source": "docs/a.md",
+            "doc_type": "policy",
+            "tags": ["refunds"],
+        }
+
+    def test_doc_type_defaults_to_extension(self):
+        assert document_metadata("s3://b/kb/faq.md", {"type": "s3"})["doc_type"] == "md"
+
+    @patch("src.ingest.pipeline.ensure_index")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_chunks_carry_source_tags_and_position(
+        self, mock_config, mock_embed, mock_index, mock_ensure, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "refunds.md").write_text(" ".join(f"w{i}" for i in range(600)))
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir), "tags": ["refunds"]}],
+        }
+
+        run_ingest("dummy.yaml")
+
+        bodies = [body for call in mock_index.call_args_list for _, body in call.args[1]]
+        assert [body["position"] for body in bodies] == [0, 1]
+        assert {body["source"] for body in bodies} == {str(doc_dir / "refunds.md")}
+        assert all(body["tags"] == ["refunds"] for body in bodies)
+        mock_ensure.assert_called_once_with("idx", CHUNK_MAPPINGS)
+
+
+class TestEmbeddingSettings:
+    def test_default_mapping_leaves_embedding_dynamic(self):
+        assert chunk_mappings({}) == CHUNK_MAPPINGS
+
+    def test_reduced_dimension_mapping(self):
+        embedding = chunk_mappings({"dimensions": 256, "normalize": True})["properties"][
+            "embedding"
+        ]
+        assert embedding == {
+            "type": "dense_vector",
+            "dims": 256,
+            "index": True,
+            "similarity": "dot_product",
+        }
+
+    def test_unnormalised_vectors_use_cosine(self):
+        mappings = chunk_mappings({"dimensions": 512, "normalize": False})
+        assert mappings["properties"]["embedding"]["similarity"] == "cosine"
+
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_ingest_embeds_with_configured_settings(
+        self, mock_config, mock_embed, mock_index, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+            "embedding": {"dimensions": 256, "normalize": True},
+        }
+
+        run_ingest("dummy.yaml")
+
+        mock_embed.assert_called_once_with("text", dimensions=256, normalize=True)
+
+
+class TestSnapshotExport:
+    @patch("src.ingest.pipeline.export_snapshot", return_value=7)
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_snapshot_exported_after_load(
+        self, mock_config, mock_embed, mock_index, mock_export, tmp_path
+    ):
+        doc_dir = tmp_path / "docs"
+        doc_dir.mkdir()
+        (doc_dir / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(doc_dir)}],
+            "ingest": {"snapshot": "out/docs.snapshot"},
+        }
+
+        result = run_ingest("dummy.yaml")
+
+        mock_export.assert_called_once_with("idx", "out/docs.snapshot")
+        assert result["snapshot_chunks"] == 7
+
+    @patch("src.ingest.pipeline.export_snapshot")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_no_snapshot_by_default(
+        self, mock_config, mock_embed, mock_index, mock_export, tmp_path
+    ):
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(tmp_path)}],
+        }
+        result = run_ingest("dummy.yaml")
+        mock_export.assert_not_called()
+        assert "snapshot_chunks" not in result
+
+
+class TestCacheInvalidation:
+    @patch("src.ingest.pipeline.bump_generation")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_generation_bumped_when_index_changed(
+        self, mock_config, mock_embed, mock_index, mock_bump, tmp_path
+    ):
+        (tmp_path / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(tmp_path)}],
+        }
+
+        run_ingest("dummy.yaml")
+
+        mock_bump.assert_called_once_with("idx")
+
+    @patch("src.ingest.pipeline.bump_generation")
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_generation_kept_when_nothing_changed(
+        self, mock_config, mock_embed, mock_index, mock_bump, _nothing_indexed_yet, tmp_path
+    ):
+        (tmp_path / "a.txt").write_text("text")
+        mock_config.return_value = {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "local", "path": str(tmp_path)}],
+        }
+        _nothing_indexed_yet.side_effect = lambda index, ids: set(ids)
+
+        run_ingest("dummy.yaml")
+
+        mock_bump.assert_not_called()
@@ -0,0 +1,129 @@
+"""Tests for the in-process local retrieval backend."""
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.wrappers.local_search import (
+    load_snapshot,
+    memory_index,
+    rerank,
+    search_docs,
+    vector_search,
+    write_snapshot,
+)
+
+DOCS = [
+    {
+        "content": "Refunds are issued within 30 days of purchase.",
+        "tags": ["refunds"],
+        "embedding": [1.0, 0.0, 0.0],
+    },
+    {
+        "content": "Shipping takes 5 business days.",
+        "tags": ["shipping"],
+        "embedding": [0.0, 1.0, 0.0],
+    },
+    {
+        "content": "Refunds for digital goods are not available after download.",
+        "tags": ["refunds", "digital"],
+        "embedding": [0.8, 0.0, 0.6],
+    },
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "docs.snapshot")
+    write_snapshot(path, DOCS)
+    return path
+
+
+class TestSnapshot:
+    def test_round_trip_without_embeddings_in_chunks(self, snapshot):
+        loaded = load_snapshot(snapshot)
+
+        assert loaded["dims"] == 3
+        assert [chunk["content"] for chunk in loaded["chunks"]] == [doc["content"] for doc in DOCS]
+        assert "embedding" not in loaded["chunks"][0]
+        assert isinstance(loaded["vectors"], np.memmap)
+        np.testing.assert_allclose(loaded["vectors"][2], [0.8, 0.0, 0.6])
+
+    def test_reloaded_after_reexport(self, snapshot):
+        load_snapshot(snapshot)
+        write_snapshot(snapshot, DOCS[:1])
+        stat = os.stat(snapshot)
+        os.utime(snapshot, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert len(load_snapshot(snapshot)["chunks"]) == 1
+
+    def test_empty_snapshot(self, tmp_path):
+        path = str(tmp_path / "empty.snapshot")
+        assert write_snapshot(path, []) == 0
+        assert search_docs("refunds", index=path) == []
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "not.snapshot"
+        path.write_bytes(b"hello world, not a snapshot")
+        with pytest.raises(ValueError, match="Not a retrieval snapshot"):
+            load_snapshot(str(path))
+
+
+class TestKeywordSearch:
+    def test_only_matching_chunks_ranked_by_bm25(self, snapshot):
+        results = search_docs("refunds digital download", index=snapshot)
+
+        assert [doc["content"] for doc in results] == [
+            DOCS[2]["content"],
+            DOCS[0]["content"],
+        ]
+
+    def test_filters_restrict_results(self, snapshot):
+        results = search_docs("refunds", index=snapshot, filters={"tags": "digital"})
+        assert [doc["content"] for doc in results] == [DOCS[2]["content"]]
+
+    def test_no_matching_terms(self, snapshot):
+        assert search_docs("warranty", index=snapshot) == []
+
+
+class TestVectorSearch:
+    @patch("src.wrappers.local_search.embed", return_value=[1.0, 0.0, 0.1])
+    def test_nearest_by_cosine(self, mock_embed, snapshot):
+        results = vector_search("refund policy", index=snapshot, k=2, dimensions=3)
+
+        assert [doc["content"] for doc in results] == [DOCS[0]["content"], DOCS[2]["content"]]
+        mock_embed.assert_called_once_with("refund policy", dimensions=3)
+
+    @patch("src.wrappers.local_search.embed", return_value=[1.0, 0.0, 0.0])
+    def test_filters_applied_before_top_k(self, mock_embed, snapshot):
+        results = vector_search("x", index=snapshot, k=1, filters={"tags": ["shipping"]})
+        assert [doc["content"] for doc in results] == [DOCS[1]["content"]]
+
+    @patch("src.wrappers.local_search.embed", return_value=[1.0, 0.0])
+    def test_dimension_mismatch_refused(self, mock_embed, snapshot):
+        with pytest.raises(ValueError, match="3-dimension"):
+            vector_search("x", index=snapshot)
+
+
+class TestRerank:
+    def test_each_claim_ranked_by_its_own_terms(self):
+        pool = memory_index(DOCS)
+        anchor = [0.5, 0.5, 0.0]
+
+        refund_kw, refund_vec = rerank(pool, "refunds within 30 days", anchor, k=1)
+        shipping_kw, shipping_vec = rerank(pool, "shipping business days", anchor, k=1)
+
+        assert refund_kw[0]["content"] == DOCS[0]["content"]
+        assert refund_vec[0]["content"] == DOCS[0]["content"]
+        assert shipping_kw[0]["content"] == DOCS[1]["content"]
+        assert shipping_vec[0]["content"] == DOCS[1]["content"]
+
+    def test_no_lexical_match_falls_back_to_anchor(self):
+        keyword, vector = rerank(memory_index(DOCS), "warranty", [0.0, 1.0, 0.0], k=1)
+        assert keyword == []
+        assert vector[0]["content"] == DOCS[1]["content"]
+
+    def test_empty_pool(self):
+        assert rerank(memory_index([]), "anything", [1.0, 0.0, 0.0], k=5) == ([], [])
@@ -57,6 +57,19 @@ class TestRunWorkflow:
         for mock in mocks:
             mock.assert_called_once_with(state)
 
+    @patch(f"{MODULE}.score_risk")
+    @patch(f"{MODULE}.verify_claims")
+    @patch(f"{MODULE}.retrieve_evidence")
+    @patch(f"{MODULE}.extract_claims")
+    @patch(f"{MODULE}.run_model")
+    @patch(f"{MODULE}.generate_prompts")
+    def test_usage_recorded(self, *mocks):
+        _name_mocks(mocks, AGENT_NAMES)
+        state = {"config": {}}
+        run_workflow(state)
+        assert state["usage"]["calls"] == 0
+        assert state["usage"]["cache_read_input_tokens"] == 0
+
     @patch(f"{MODULE}.score_risk")
     @patch(f"{MODULE}.verify_claims")
     @patch(f"{MODULE}.retrieve_evidence")
@@ -100,6 +113,88 @@ class TestRunWorkflow:
             assert "score_risk" in info_messages
 
 
+ADAPTIVE_CONFIG = {
+    "evaluation": {"adaptive": {"target_width": 0.3, "max_rounds": 4}},
+    "thresholds": {"reject": 0.3},
+}
+
+
+class TestAdaptiveRounds:
+    @staticmethod
+    def _round_agents(labels_per_round):
+        rounds = iter(labels_per_round)
+
+        def generate(state):
+            state["labels"] = next(rounds)
+            offset = len(state["previous_prompts"])
+            state["prompts"] = [f"p{offset + i}" for i in range(len(state["labels"]))]
+
+        def passthrough(key, source):
+            def agent(state):
+                state[key] = list(state[source])
+
+            return agent
+
+        def verify(state):
+            state["verdicts"] = [
+                {"verdict": label, "source_prompt": prompt}
+                for prompt, label in zip(state["evidence"], state["labels"], strict=True)
+            ]
+
+        return [
+            generate,
+            passthrough("responses", "prompts"),
+            passthrough("claims", "responses"),
+            passthrough("evidence", "claims"),
+            verify,
+        ]
+
+    def _run(self, labels_per_round, config=None):
+        agents = self._round_agents(labels_per_round)
+        names = AGENT_NAMES[:5]
+        patches = [
+            patch(f"{MODULE}.{name}", side_effect=agent, __name__=name)
+            for name, agent in zip(names, agents, strict=True)
+        ]
+        state = {"config": config or ADAPTIVE_CONFIG}
+        for p in patches:
+            p.start()
+        try:
+            run_workflow(state)
+        finally:
+            for p in patches:
+                p.stop()
+        return state
+
+    def test_stops_when_interval_narrow_enough(self):
+        noisy = ["unsupported", "supported", "unsupported", "unsupported"]
+        state = self._run([noisy, ["supported"] * 20, ["supported"] * 20, ["supported"] * 20])
+
+        assert state["rounds"] == 2
+        assert len(state["verdicts"]) == 24
+        assert state["score"]["rounds"] == 2
+        low, high = state["score"]["risk_interval"]
+        assert high - low <= 0.3
+
+    def test_max_rounds_caps_evaluation(self):
+        state = self._run([["unsupported", "supported"]] * 4)
+
+        assert state["rounds"] == 4
+        assert state["prompts"] == [f"p{i}" for i in range(8)]
+
+    def test_true_uses_defaults(self):
+        config = {**ADAPTIVE_CONFIG, "evaluation": {"adaptive": True}}
+        state = self._run([["supported"] * 20] * 5, config)
+
+        assert state["rounds"] >= 1
+        assert state["score"]["rounds"] == state["rounds"]
+
+    def test_rejects_combination_with_early_stop(self):
+        config = {**ADAPTIVE_CONFIG, "verification": {"early_stop": {"confidence": 0.95}}}
+        with pytest.raises(ValueError, match="cannot be combined"):
+            self._run([["supported"]], config)
+
+
 class TestBuildResponse:
     def test_extracts_correct_fields(self):
         state = {
@@ -176,5 +271,11 @@ class TestBuildResponse:
             "reliability_score",
             "decision",
             "claims",
+            "risk_interval",
+            "rounds",
+            "breakdown",
+            "early_stop",
+            "usage",
+            "prompt_bank",
         }
         assert set(result.keys()) == expected_keys
@@ -0,0 +1,173 @@
+"""Unit tests for src.prompt_bank -- local banks on tmp_path, Elasticsearch mocked."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src import prompt_bank
+from src.agents.generate_prompts import generate_prompts
+
+MODULE = "src.prompt_bank"
+
+
+def _config(tmp_path, **bank):
+    return {
+        "use_case": "customer support chatbot",
+        "evaluation": {"num_prompts": 3, "prompt_categories": ["returns", "shipping"]},
+        "prompt_bank": {"path": str(tmp_path), **bank},
+    }
+
+
+def _generator():
+    """Fake generate(): numbered prompts continuing from the last call."""
+    made = []
+
+    def generate(config, count, exclude):
+        new = [("returns", f"Prompt {len(made) + i}") for i in range(count)]
+        made.extend(new)
+        return new
+
+    return MagicMock(side_effect=generate)
+
+
+class TestFingerprint:
+    def test_category_order_does_not_matter(self, tmp_path):
+        config = _config(tmp_path)
+        reordered = _config(tmp_path)
+        reordered["evaluation"]["prompt_categories"] = ["shipping", "returns"]
+        assert prompt_bank.fingerprint(config) == prompt_bank.fingerprint(reordered)
+
+    def test_use_case_and_model_change_it(self, tmp_path):
+        config = _config(tmp_path)
+        other_use_case = {**config, "use_case": "billing assistant"}
+        other_model = {**config, "models": {"generate_prompts": "haiku"}}
+        fingerprints = {prompt_bank.fingerprint(c) for c in (config, other_use_case, other_model)}
+        assert len(fingerprints) == 3
+
+
+class TestTake:
+    def test_empty_bank_generated_and_saved(self, tmp_path):
+        config = _config(tmp_path)
+        generate = _generator()
+        prompts, entry = prompt_bank.take(config, 3, [], generate)
+
+        assert [p for _, p in prompts] == ["Prompt 0", "Prompt 1", "Prompt 2"]
+        assert entry["version"] == 1
+        assert (tmp_path / entry["fingerprint"] / "v1.json").exists()
+        generate.assert_called_once_with(config, 3, [])
+
+    def test_later_runs_reuse_the_bank(self, tmp_path):
+        config = _config(tmp_path)
+        first, _ = prompt_bank.take(config, 3, [], _generator())
+        generate = _generator()
+        second, entry = prompt_bank.take(config, 3, [], generate)
+
+        assert second == first
+        assert entry["version"] == 1
+        generate.assert_not_called()
+
+    def test_short_bank_extended_as_new_version(self, tmp_path):
+        config = _config(tmp_path)
+        generate = _generator()
+        prompt_bank.take(config, 2, [], generate)
+        prompts, entry = prompt_bank.take(config, 2, ["Prompt 0"], generate)
+
+        assert [p for _, p in prompts] == ["Prompt 1", "Prompt 2"]
+        assert entry["version"] == 2
+        assert generate.call_args.args[1:] == (1, ["Prompt 0", "Prompt 0", "Prompt 1"])
+        assert len(entry["prompts"]) == 3
+        assert prompt_bank.load(config, 1)["prompts"] == entry["prompts"][:2]
+
+    def test_pinned_version_is_never_extended(self, tmp_path):
+        config = _config(tmp_path)
+        prompt_bank.take(config, 2, [], _generator())
+        prompt_bank.extend(config, _generator(), 2)
+
+        pinned = _config(tmp_path, version=1)
+        generate = _generator()
+        prompts, entry = prompt_bank.take(pinned, 3, [], generate)
+        assert len(prompts) == 2
+        assert entry["version"] == 1
+        generate.assert_not_called()
+
+    def test_missing_pinned_version_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="version 7"):
+            prompt_bank.take(_config(tmp_path, version=7), 3, [], _generator())
+
+    def test_seeded_sample_is_reproducible(self, tmp_path):
+        config = _config(tmp_path)
+        prompt_bank.take(config, 10, [], _generator())
+        sampled = _config(tmp_path, sample=True, seed=3)
+        first, _ = prompt_bank.take(sampled, 4, [], _generator())
+        second, _ = prompt_bank.take(sampled, 4, [], _generator())
+        assert first == second
+        assert first != prompt_bank.take(config, 4, [], _generator())[0]
+
+
+class TestOperations:
+    def test_refresh_replaces_prompts(self, tmp_path):
+        config = _config(tmp_path)
+        prompt_bank.take(config, 3, [], _generator())
+        generate = MagicMock(return_value=[("shipping", "Fresh prompt")])
+        entry = prompt_bank.refresh(config, generate, 1)
+
+        assert entry["version"] == 2
+        assert entry["prompts"] == [{"prompt": "Fresh prompt", "category": "shipping"}]
+        generate.assert_called_once_with(config, 1, [])
+
+    def test_extend_appends_and_excludes_existing(self, tmp_path):
+        config = _config(tmp_path)
+        prompt_bank.take(config, 2, [], _generator())
+        generate = MagicMock(return_value=[(None, "Extra")])
+        entry = prompt_bank.extend(config, generate, 1)
+
+        assert [p["prompt"] for p in entry["prompts"]] == ["Prompt 0", "Prompt 1", "Extra"]
+        assert generate.call_args.args[2] == ["Prompt 0", "Prompt 1"]
+
+    def test_unknown_backend_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown prompt bank backend"):
+            prompt_bank.load(_config(tmp_path, backend="sqlite"))
+
+
+class TestElasticsearchBackend:
+    def test_latest_version_looked_up_by_fingerprint(self, tmp_path):
+        config = _config(tmp_path, backend="elasticsearch", index="bank")
+        key = prompt_bank.fingerprint(config)
+        with patch(f"{MODULE}.elasticsearch_helper") as helper:
+            helper.top_doc.return_value = {"version": 4}
+            assert prompt_bank.load(config) == {"version": 4}
+            prompt_bank.load(config, 2)
+
+        helper.top_doc.assert_called_once_with("bank", "fingerprint", key, "version")
+        helper.get_doc.assert_called_once_with("bank", f"{key}-v2")
+
+    def test_each_version_is_its_own_document(self, tmp_path):
+        config = _config(tmp_path, backend="elasticsearch")
+        with patch(f"{MODULE}.elasticsearch_helper") as helper:
+            entry = prompt_bank.save(config, [("returns", "p")], {"version": 1})
+
+        helper.ensure_index.assert_called_once_with("prompt-bank", prompt_bank.MAPPINGS)
+        doc_id = helper.index_doc.call_args.args[1]
+        assert doc_id == f"{entry['fingerprint']}-v2"
+
+
+class TestGeneratePromptsWithBank:
+    @patch(
+        "src.agents.generate_prompts.call_llm",
+        return_value="1. [returns] Can I return a TV?\n2. [shipping] Is shipping free?\n"
+        "3. [returns] Are refunds instant?",
+    )
+    def test_second_run_skips_generation(self, mock_llm, tmp_path):
+        first = {"config": _config(tmp_path)}
+        generate_prompts(first)
+        second = {"config": _config(tmp_path)}
+        generate_prompts(second)
+
+        assert mock_llm.call_count == 1
+        assert second["prompts"] == first["prompts"]
+        assert second["prompts"][0] == "Can I return a TV?"
+        assert second["prompt_categories"] == ["returns", "shipping", "returns"]
+        assert second["prompt_bank"] == {
+            "fingerprint": prompt_bank.fingerprint(second["config"]),
+            "version": 1,
+        }
@@ -2,6 +2,8 @@
 
 from unittest.mock import patch
 
+import pytest
+
 from src.agents.retrieve_evidence import deduplicate, retrieve_evidence
 
 KEYWORD_RESULTS = [{"content": "doc A"}, {"content": "doc B"}]
@@ -105,3 +107,93 @@ class TestRetrieveEvidence:
         assert state["evidence"] == []
         mock_keyword.assert_not_called()
         mock_vector.assert_not_called()
+
+    @patch("src.agents.retrieve_evidence.vector_search", return_value=[])
+    @patch("src.agents.retrieve_evidence.search_docs", return_value=[])
+    def test_configured_filters_passed_to_both_searches(self, mock_keyword, mock_vector):
+        claim = {"text": "refunds take 30 days", "source_prompt": "p", "source_response": "r"}
+        state = _make_state([claim])
+        state["config"]["retrieval"] = {"filters": {"tags": ["refunds"]}, "num_candidates": 50}
+
+        retrieve_evidence(state)
+
+        mock_keyword.assert_called_once_with(
+            "refunds take 30 days", index="test_index", filters={"tags": ["refunds"]}
+        )
+        mock_vector.assert_called_once_with(
+            "refunds take 30 days",
+            index="test_index",
+            filters={"tags": ["refunds"]},
+            num_candidates=50,
+        )
+
+    @patch("src.agents.retrieve_evidence.local_search")
+    @patch("src.agents.retrieve_evidence.vector_search")
+    @patch("src.agents.retrieve_evidence.search_docs")
+    def test_local_backend_searches_snapshot(self, mock_keyword, mock_vector, mock_local):
+        mock_local.search_docs.return_value = KEYWORD_RESULTS
+        mock_local.vector_search.return_value = VECTOR_RESULTS
+        claim = {"text": "claim", "source_prompt": "p", "source_response": "r"}
+        state = _make_state([claim])
+        state["config"]["retrieval"] = {"backend": "local", "snapshot": "docs.snapshot"}
+
+        retrieve_evidence(state)
+
+        mock_local.search_docs.assert_called_once_with("claim", index="docs.snapshot")
+        mock_local.vector_search.assert_called_once_with("claim", index="docs.snapshot")
+        mock_keyword.assert_not_called()
+        mock_vector.assert_not_called()
+        assert len(state["evidence"][0]["documents"]) == 3
+
+    def test_local_backend_requires_snapshot(self):
+        state = _make_state([])
+        state["config"]["retrieval"] = {"backend": "local"}
+        with pytest.raises(ValueError, match="snapshot"):
+            retrieve_evidence(state)
+
+    def test_unknown_backend_rejected(self):
+        state = _make_state([])
+        state["config"]["retrieval"] = {"backend": "solr"}
+        with pytest.raises(ValueError, match="solr"):
+            retrieve_evidence(state)
+
+
+POOL = [
+    {"content": "Refunds are issued within 30 days.", "embedding": [1.0, 0.0]},
+    {"content": "Shipping takes 5 business days.", "embedding": [0.0, 1.0]},
+]
+
+
+class TestResponseLevelRetrieval:
+    @patch("src.agents.retrieve_evidence.vector_search")
+    @patch("src.agents.retrieve_evidence.embed", return_value=[0.5, 0.5])
+    @patch("src.agents.retrieve_evidence.knn_search", return_value=POOL[1:])
+    @patch("src.agents.retrieve_evidence.search_docs", return_value=POOL[:1])
+    def test_one_pool_per_response(self, mock_keyword, mock_knn, mock_embed, mock_vector):
+        claims = [
+            {"text": "Refunds take 30 days.", "source_prompt": "p", "source_response": "r1"},
+            {"text": "Shipping takes 5 days.", "source_prompt": "p", "source_response": "r1"},
+            {"text": "Refunds are issued.", "source_prompt": "p", "source_response": "r2"},
+        ]
+        state = _make_state(claims)
+        state["config"]["retrieval"] = {"mode": "response", "pool_size": 20}
+
+        retrieve_evidence(state)
+
+        assert mock_embed.call_count == 2
+        assert mock_keyword.call_count == 2
+        mock_keyword.assert_any_call(
+            "Refunds take 30 days. Shipping takes 5 days.", index="test_index", size=20
+        )
+        mock_knn.assert_any_call([0.5, 0.5], index="test_index", k=20)
+        mock_vector.assert_not_called()
+        first, second, _ = state["evidence"]
+        assert first["claim"] is claims[0]
+        assert first["documents"][0]["content"] == POOL[0]["content"]
+        assert second["documents"][0]["content"] == POOL[1]["content"]
+
+    def test_unknown_mode_rejected(self):
+        state = _make_state([])
+        state["config"]["retrieval"] = {"mode": "paragraph"}
+        with pytest.raises(ValueError, match="paragraph"):
+            retrieve_evidence(state)
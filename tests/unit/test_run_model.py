@@ -62,6 +62,14 @@ class TestRunModel:
         assert state["responses"][0] == {"prompt": "p1", "response": "resp1"}
         assert state["responses"][1] == {"prompt": "p2", "response": "resp2"}
 
+    @patch("src.agents.run_model.call_llm", side_effect=["resp1", "resp2"])
+    def test_categories_carried_onto_responses(self, mock_llm):
+        state = _make_state(["p1", "p2"], provider="bedrock")
+        state["prompt_categories"] = ["edge_cases", None]
+        run_model(state)
+        assert state["responses"][0]["category"] == "edge_cases"
+        assert state["responses"][1]["category"] is None
+
     @patch("src.agents.run_model.call_llm")
     def test_each_response_has_keys(self, mock_llm):
         mock_llm.return_value = "answer"
@@ -0,0 +1,156 @@
+"""Tests for the S3 document source, against moto's in-process S3."""
+
+import hashlib
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from src.ingest.pipeline import chunk_text, clean_text, iter_file_chunks, run_ingest
+from src.ingest.s3_source import (
+    _client,
+    _process_client,
+    iter_object_blocks,
+    iter_object_text,
+    list_documents,
+    parse_uri,
+)
+
+BUCKET = "trusted-docs"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    _process_client.cache_clear()
+    with mock_aws():
+        client = _client()
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+    _process_client.cache_clear()
+
+
+class TestParseUri:
+    def test_splits_bucket_and_key(self):
+        assert parse_uri("s3://bucket/a/b.md") == ("bucket", "a/b.md")
+
+    def test_rejects_bucket_only(self):
+        with pytest.raises(ValueError):
+            parse_uri("s3://bucket")
+
+
+class TestClient:
+    def test_one_client_per_process(self, s3):
+        assert _client() is s3
+        with patch("src.ingest.s3_source.os.getpid", return_value=-1):
+            forked = _client()
+        assert forked is not s3
+        assert _client() is s3
+
+
+class TestListDocuments:
+    def test_lists_documents_under_prefix_with_etag(self, s3):
+        s3.put_object(Bucket=BUCKET, Key="docs/b.md", Body=b"bee")
+        s3.put_object(Bucket=BUCKET, Key="docs/a.txt", Body=b"a")
+        s3.put_object(Bucket=BUCKET, Key="docs/image.png", Body=b"x")
+        s3.put_object(Bucket=BUCKET, Key="other/c.txt", Body=b"c")
+
+        listed = list(list_documents({"bucket": BUCKET, "prefix": "docs/"}))
+
+        assert [uri for uri, _ in listed] == [
+            f"s3://{BUCKET}/docs/a.txt",
+            f"s3://{BUCKET}/docs/b.md",
+        ]
+        etag = s3.head_object(Bucket=BUCKET, Key="docs/b.md")["ETag"].strip('"')
+        assert listed[1][1] == {"etag": etag, "size": 3}
+
+    def test_paginates(self, s3):
+        for i in range(1005):
+            s3.put_object(Bucket=BUCKET, Key=f"doc{i:04d}.txt", Body=b"x")
+
+        assert len(list(list_documents({"bucket": BUCKET}))) == 1005
+
+
+class TestStreamObject:
+    def test_ranges_reassemble_in_order(self, s3):
+        body = bytes(range(256)) * 40
+        s3.put_object(Bucket=BUCKET, Key="big.txt", Body=body)
+
+        blocks = list(iter_object_blocks(f"s3://{BUCKET}/big.txt", range_bytes=1000))
+
+        assert len(blocks) == 11
+        assert b"".join(blocks) == body
+
+    def test_empty_object_yields_nothing(self, s3):
+        s3.put_object(Bucket=BUCKET, Key="empty.txt", Body=b"")
+        assert list(iter_object_blocks(f"s3://{BUCKET}/empty.txt")) == []
+
+    def test_multibyte_character_split_across_ranges(self, s3):
+        text = "Café policy — naïve résumé. " * 50
+        s3.put_object(Bucket=BUCKET, Key="utf8.md", Body=text.encode("utf-8"))
+
+        blocks = list(iter_object_text(f"s3://{BUCKET}/utf8.md", range_bytes=7))
+
+        assert "".join(blocks) == text
+
+    def test_object_replaced_mid_read_fails(self, s3):
+        s3.put_object(Bucket=BUCKET, Key="doc.txt", Body=b"a" * 100)
+        blocks = iter_object_blocks(f"s3://{BUCKET}/doc.txt", range_bytes=10, concurrency=1)
+        next(blocks)
+        s3.put_object(Bucket=BUCKET, Key="doc.txt", Body=b"b" * 100)
+
+        with pytest.raises(ClientError):
+            list(blocks)
+
+    def test_file_chunks_match_local_cleaning(self, s3):
+        raw = "<h1>Refunds</h1>\n" + "\n".join(f"<p>rule {i} applies</p>" for i in range(300))
+        s3.put_object(Bucket=BUCKET, Key="refunds.md", Body=raw.encode("utf-8"))
+
+        chunks = list(iter_file_chunks(f"s3://{BUCKET}/refunds.md"))
+
+        assert chunks == chunk_text(clean_text(raw))
+
+
+class TestS3Ingest:
+    def _config(self, manifest):
+        return {
+            "elasticsearch": {"index": "idx"},
+            "doc_sources": [{"type": "s3", "bucket": BUCKET, "prefix": "kb/"}],
+            "ingest": {"manifest": str(manifest)},
+        }
+
+    @patch("src.ingest.pipeline.bump_generation")
+    @patch("src.ingest.pipeline.ensure_index")
+    @patch("src.ingest.pipeline.bulk_delete")
+    @patch("src.ingest.pipeline.existing_ids", return_value=set())
+    @patch("src.ingest.pipeline.bulk_index")
+    @patch("src.ingest.pipeline.embed", return_value=[0.1])
+    @patch("src.ingest.pipeline.load_config")
+    def test_unchanged_objects_skipped_by_etag(
+        self,
+        mock_config,
+        mock_embed,
+        mock_index,
+        mock_existing,
+        mock_delete,
+        mock_ensure,
+        mock_bump,
+        s3,
+        tmp_path,
+    ):
+        s3.put_object(Bucket=BUCKET, Key="kb/a.txt", Body=b"first policy")
+        s3.put_object(Bucket=BUCKET, Key="kb/b.txt", Body=b"second policy")
+        mock_config.return_value = self._config(tmp_path / "manifest.json")
+
+        first = run_ingest("dummy.yaml")
+        s3.put_object(Bucket=BUCKET, Key="kb/b.txt", Body=b"second policy, revised")
+        second = run_ingest("dummy.yaml")
+
+        assert first["documents_processed"] == 2
+        assert second["documents_processed"] == 1
+        assert second["documents_skipped"] == 1
+        assert mock_embed.call_args.args[0] == "second policy, revised"
+        mock_delete.assert_called_once_with("idx", [hashlib.sha256(b"second policy").hexdigest()])
@@ -76,6 +76,9 @@ class TestScoreRisk:
             "supported",
             "weakly_supported",
             "unsupported",
+            "risk_interval",
+            "rounds",
+            "breakdown",
         }
         assert set(state["score"].keys()) == expected_keys
 
@@ -87,3 +90,34 @@ class TestScoreRisk:
         assert state["score"]["supported"] == 2
         assert state["score"]["weakly_supported"] == 1
         assert state["score"]["unsupported"] == 1
+
+    def test_early_stop_decision_and_report(self):
+        state = _make_state(["unsupported", "supported"], reject=0.6)
+        state["early_stop"] = {"decision": "reject", "confidence": 0.95}
+        score_risk(state)
+        assert state["score"]["decision"] == "reject"
+        assert state["score"]["early_stop"]["confidence"] == 0.95
+
+    def test_risk_interval_clustered_by_prompt(self):
+        state = _make_state([])
+        state["verdicts"] = [
+            {"verdict": label, "source_prompt": f"p{i // 2}"}
+            for i, label in enumerate(["unsupported", "supported"] * 10)
+        ]
+        score_risk(state)
+        low, high = state["score"]["risk_interval"]
+        assert low < 0.5 < high
+        assert state["score"]["rounds"] == 1
+
+    def test_breakdown_by_category(self):
+        state = _make_state([])
+        state["verdicts"] = [
+            {"verdict": "unsupported", "category": "edge_cases", "source_prompt": "p1"},
+            {"verdict": "supported", "category": "factual_recall", "source_prompt": "p2"},
+        ]
+        state["config"]["scoring"] = {"bootstrap_samples": 50, "seed": 1}
+        score_risk(state)
+        breakdown = state["score"]["breakdown"]
+        risk = {row["name"]: row["risk"] for row in breakdown["category"]}
+        assert risk == {"edge_cases": 1.0, "factual_recall": 0.0}
+        assert set(breakdown) == {"overall", "category", "prompt", "document"}
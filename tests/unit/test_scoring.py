@@ -0,0 +1,108 @@
+"""Tests for the vectorised risk breakdowns."""
+
+import time
+
+import numpy as np
+
+from src.scoring import breakdowns, encode, verdict_arrays
+
+
+def _verdicts(rows):
+    """rows: (verdict, prompt, category, document)"""
+    return [
+        {
+            "verdict": verdict,
+            "source_prompt": prompt,
+            "category": category,
+            "evidence_source": document,
+        }
+        for verdict, prompt, category, document in rows
+    ]
+
+
+ROWS = [
+    ("unsupported", "p1", "edge_cases", "a.md"),
+    ("unsupported", "p1", "edge_cases", "b.md"),
+    ("supported", "p2", "edge_cases", "a.md"),
+    ("supported", "p3", "factual_recall", "a.md"),
+    ("weakly_supported", "p3", "factual_recall", None),
+    ("supported", "p4", "factual_recall", "b.md"),
+]
+
+
+class TestEncode:
+    def test_first_seen_order_and_unknown(self):
+        names, codes = encode(["b", None, "a", "b"])
+        assert names == ["b", "unknown", "a"]
+        assert codes.tolist() == [0, 1, 2, 0]
+
+
+class TestVerdictArrays:
+    def test_flags_and_groups(self):
+        arrays = verdict_arrays(_verdicts(ROWS))
+        assert arrays["unsupported"].tolist() == [True, True, False, False, False, False]
+        assert arrays["weakly_supported"].sum() == 1
+        assert arrays["category"][0] == ["edge_cases", "factual_recall"]
+        assert arrays["document"][0] == ["a.md", "b.md", "unknown"]
+
+
+def _rows(table):
+    return {row["name"]: row for row in table}
+
+
+class TestBreakdowns:
+    def test_counts_and_risk_per_group(self):
+        result = breakdowns(verdict_arrays(_verdicts(ROWS)), samples=200, seed=0)
+
+        assert _rows(result["category"])["edge_cases"]["claims"] == 3
+        assert _rows(result["category"])["edge_cases"]["unsupported"] == 2
+        assert _rows(result["category"])["edge_cases"]["risk"] == 0.6667
+        assert _rows(result["category"])["factual_recall"]["risk"] == 0.0
+        assert _rows(result["prompt"])["p1"]["risk"] == 1.0
+        assert _rows(result["document"])["a.md"]["unsupported"] == 1
+        assert _rows(result["document"])["unknown"]["claims"] == 1
+
+    def test_intervals_contain_point_estimates(self):
+        result = breakdowns(verdict_arrays(_verdicts(ROWS)), samples=200, seed=0)
+
+        for table in ("category", "prompt", "document"):
+            for row in result[table]:
+                low, high = row["interval"]
+                assert low <= row["risk"] <= high
+        low, high = result["overall"]
+        assert low <= 2 / 6 <= high
+
+    def test_seed_makes_intervals_reproducible(self):
+        arrays = verdict_arrays(_verdicts(ROWS))
+        assert breakdowns(arrays, samples=100, seed=3) == breakdowns(arrays, samples=100, seed=3)
+
+    def test_empty(self):
+        result = breakdowns(verdict_arrays([]))
+        assert result == {"overall": None, "category": [], "prompt": [], "document": []}
+
+    def test_category_interval_reflects_prompt_correlation(self):
+        # Same claims and risk; all-or-nothing prompts should give a wider interval.
+        correlated, mixed = [], []
+        for p in range(40):
+            for c in range(5):
+                correlated.append(("unsupported" if p % 2 else "supported", f"p{p}", "x", "d"))
+                mixed.append(("unsupported" if c < 2 + p % 2 else "supported", f"p{p}", "x", "d"))
+        wide = breakdowns(verdict_arrays(_verdicts(correlated)), seed=0)["category"][0]
+        narrow = breakdowns(verdict_arrays(_verdicts(mixed)), seed=0)["category"][0]
+        assert wide["interval"][1] - wide["interval"][0] > (
+            narrow["interval"][1] - narrow["interval"][0]
+        )
+
+    def test_fast_at_scale(self):
+        rng = np.random.default_rng(0)
+        labels = np.where(rng.random(100_000) < 0.25, "unsupported", "supported")
+        rows = [
+            (str(label), f"p{i // 8}", f"c{i // 8 % 5}", f"d{i % 500}")
+            for i, label in enumerate(labels)
+        ]
+        arrays = verdict_arrays(_verdicts(rows))
+
+        start = time.perf_counter()
+        result = breakdowns(arrays, seed=0)
+        assert time.perf_counter() - start < 5
+        assert len(result["prompt"]) == 12_500
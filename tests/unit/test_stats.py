@@ -0,0 +1,69 @@
+"""Tests for the sequential-testing statistics."""
+
+from src.stats import clustered_risk_interval, looks, risk_interval, settled_decision
+
+
+class TestRiskInterval:
+    def test_fully_verified_is_exact(self):
+        assert risk_interval(30, 100, 100, 0.95) == (0.3, 0.3)
+
+    def test_nothing_verified_is_uninformative(self):
+        assert risk_interval(0, 0, 100, 0.95) == (0.0, 1.0)
+
+    def test_contains_sample_share(self):
+        low, high = risk_interval(40, 100, 400, 0.95)
+        assert low < 0.4 < high
+
+    def test_narrows_as_sample_grows(self):
+        small = risk_interval(20, 50, 1000, 0.95)
+        large = risk_interval(200, 500, 1000, 0.95)
+        assert large[1] - large[0] < small[1] - small[0]
+
+    def test_finite_population_tightens_interval(self):
+        finite = risk_interval(90, 180, 200, 0.95)
+        infinite = risk_interval(90, 180, 10**9, 0.95)
+        assert finite[1] - finite[0] < infinite[1] - infinite[0]
+
+    def test_clipped_to_certain_bounds(self):
+        low, high = risk_interval(99, 99, 100, 0.95)
+        assert low >= 0.99
+        assert high == 1.0
+
+
+class TestSettledDecision:
+    def test_reject_when_interval_above_threshold(self):
+        assert settled_decision((0.35, 0.5), 0.3) == "reject"
+
+    def test_approve_when_interval_below_threshold(self):
+        assert settled_decision((0.05, 0.2), 0.3) == "approve"
+
+    def test_undecided_when_interval_straddles(self):
+        assert settled_decision((0.25, 0.35), 0.3) is None
+
+
+class TestLooks:
+    def test_schedule(self):
+        assert looks(100, 30, 20) == [30, 50, 70, 90]
+
+    def test_small_run_has_no_looks(self):
+        assert looks(20, 30, 10) == []
+
+
+class TestClusteredRiskInterval:
+    def test_single_cluster_is_uninformative(self):
+        assert clustered_risk_interval([(3, 10)], 0.95) == (0.0, 1.0)
+
+    def test_contains_pooled_share(self):
+        low, high = clustered_risk_interval([(1, 4), (0, 3), (2, 5), (1, 4)], 0.95)
+        assert low < 0.25 < high
+
+    def test_correlated_claims_widen_interval(self):
+        # Same 50% overall, but all-or-nothing per prompt vs mixed within prompts.
+        correlated = clustered_risk_interval([(5, 5), (0, 5)] * 10, 0.95)
+        mixed = clustered_risk_interval([(3, 5), (2, 5)] * 10, 0.95)
+        assert correlated[1] - correlated[0] > mixed[1] - mixed[0]
+
+    def test_nothing_unsupported_still_has_width(self):
+        low, high = clustered_risk_interval([(0, 3)] * 20, 0.95)
+        assert low == 0.0
+        assert 0 < high < 0.1
@@ -2,7 +2,14 @@
 
 from unittest.mock import patch
 
-from src.agents.verify_claims import parse_verdict, verify_claims
+import pytest
+
+from src.agents.verify_claims import (
+    first_tier_label,
+    parse_confidence,
+    parse_verdict,
+    verify_claims,
+)
 
 SUPPORTED_RESPONSE = (
     "LABEL: supported\nJUSTIFICATION: The evidence directly confirms the 30-day return policy."
@@ -101,9 +108,8 @@ class TestVerifyClaims:
         entry = _make_entry("test claim", ["evidence content"])
         state = _make_state([entry])
         verify_claims(state)
-        prompt_arg = mock_llm.call_args[0][0]
-        assert "test claim" in prompt_arg
-        assert "evidence content" in prompt_arg
+        assert mock_llm.call_args.kwargs["prompt"] == "Claim: test claim"
+        assert "evidence content" in mock_llm.call_args.kwargs["prefix"]
 
     @patch("src.agents.verify_claims.call_llm", return_value="gibberish output")
     def test_malformed_llm_response(self, mock_llm):
@@ -134,9 +140,19 @@ class TestVerifyClaims:
         entry = _make_entry("claim", ["doc part 1", "doc part 2"])
         state = _make_state([entry])
         verify_claims(state)
-        prompt_arg = mock_llm.call_args[0][0]
-        assert "doc part 1" in prompt_arg
-        assert "doc part 2" in prompt_arg
+        prefix = mock_llm.call_args.kwargs["prefix"]
+        assert "doc part 1" in prefix
+        assert "doc part 2" in prefix
+
+    @patch("src.agents.verify_claims.call_llm", return_value=SUPPORTED_RESPONSE)
+    def test_caching_is_opt_in(self, mock_llm):
+        state = _make_state([_make_entry("claim", ["doc"])])
+        verify_claims(state)
+        assert mock_llm.call_args.kwargs["cache"] is False
+
+        state["config"] = {"prompt_cache": True}
+        verify_claims(state)
+        assert mock_llm.call_args.kwargs["cache"] is True
 
     @patch("src.agents.verify_claims.call_llm")
     def test_empty_evidence_no_llm_call(self, mock_llm):
@@ -166,5 +182,208 @@ class TestVerifyClaims:
         entry = _make_entry("claim", ["evidence"])
         state = _make_state([entry])
         verify_claims(state)
-        expected_keys = {"claim", "verdict", "evidence_snippet", "confidence"}
+        expected_keys = {
+            "claim",
+            "source_prompt",
+            "category",
+            "verdict",
+            "evidence_snippet",
+            "evidence_source",
+            "confidence",
+            "tier",
+        }
         assert set(state["verdicts"][0].keys()) == expected_keys
+
+
+def _early_stop_state(labels, reject=0.3, **early_stop):
+    entries = [_make_entry(f"claim {i}", ["doc"]) for i in range(len(labels))]
+    responses = {f"claim {i}": label for i, label in enumerate(labels)}
+    state = {
+        "evidence": entries,
+        "config": {
+            "thresholds": {"reject": reject},
+            "verification": {"early_stop": {"seed": 7, **early_stop}},
+        },
+    }
+    return state, responses
+
+
+def _respond(responses):
+    def call(prompt, system="", model_id=None, prefix="", cache=False):
+        claim = prompt.removeprefix("Claim: ")
+        return f"LABEL: {responses[claim]}\nJUSTIFICATION: x"
+
+    return call
+
+
+class TestEarlyStop:
+    @patch("src.agents.verify_claims.call_llm")
+    def test_obviously_failing_run_stops_early(self, mock_llm):
+        state, responses = _early_stop_state(["unsupported"] * 300 + ["supported"] * 100)
+        mock_llm.side_effect = _respond(responses)
+
+        verify_claims(state)
+
+        early_stop = state["early_stop"]
+        assert early_stop["decision"] == "reject"
+        assert early_stop["confidence"] == 0.95
+        assert early_stop["claims_verified"] < 100
+        assert early_stop["claims_verified"] + early_stop["claims_skipped"] == 400
+        assert early_stop["risk_interval"][0] >= 0.3
+        assert mock_llm.call_count == early_stop["claims_verified"]
+        assert len(state["verdicts"]) == early_stop["claims_verified"]
+
+    @patch("src.agents.verify_claims.call_llm")
+    def test_clean_run_approves_early(self, mock_llm):
+        state, responses = _early_stop_state(["supported"] * 400)
+        mock_llm.side_effect = _respond(responses)
+
+        verify_claims(state)
+
+        assert state["early_stop"]["decision"] == "approve"
+        assert state["early_stop"]["risk_interval"][1] < 0.3
+
+    @patch("src.agents.verify_claims.call_llm")
+    def test_true_uses_defaults(self, mock_llm):
+        state, responses = _early_stop_state(["supported"] * 400)
+        state["config"]["verification"]["early_stop"] = True
+        mock_llm.side_effect = _respond(responses)
+
+        verify_claims(state)
+
+        assert state["early_stop"]["decision"] == "approve"
+        assert state["early_stop"]["confidence"] == 0.95
+
+    @patch("src.agents.verify_claims.call_llm")
+    def test_borderline_run_verifies_everything(self, mock_llm):
+        state, responses = _early_stop_state(["unsupported"] * 30 + ["supported"] * 70)
+        mock_llm.side_effect = _respond(responses)
+
+        verify_claims(state)
+
+        assert "early_stop" not in state
+        assert mock_llm.call_count == 100
+        assert [v["claim"] for v in state["verdicts"]] == [f"claim {i}" for i in range(100)]
+
+    @patch("src.agents.verify_claims.call_llm")
+    def test_no_look_before_min_claims(self, mock_llm):
+        state, responses = _early_stop_state(["unsupported"] * 100, min_claims=60)
+        mock_llm.side_effect = _respond(responses)
+
+        verify_claims(state)
+
+        assert state["early_stop"]["claims_verified"] == 60
+
+    @patch("src.agents.verify_claims.call_llm", return_value=SUPPORTED_RESPONSE)
+    def test_verdicts_keep_claim_order(self, mock_llm):
+        state, _ = _early_stop_state(["supported"] * 40, min_claims=100)
+
+        verify_claims(state)
+
+        assert [v["claim"] for v in state["verdicts"]] == [f"claim {i}" for i in range(40)]
+
+
+CASCADE_CONFIG = {
+    "models": {
+        "verify_claims": {"model": "strong-model", "cascade": "fast-model", "min_confidence": 0.8}
+    }
+}
+
+
+class TestFirstTierLabel:
+    def test_confident_clear_label_accepted(self):
+        assert parse_confidence("LABEL: supported\nCONFIDENCE: 0.95") == 0.95
+        assert first_tier_label("LABEL: supported\nCONFIDENCE: 0.95", 0.8) == "supported"
+
+    def test_low_confidence_escalates(self):
+        assert first_tier_label("LABEL: unsupported\nCONFIDENCE: 0.6", 0.8) is None
+
+    def test_missing_confidence_escalates(self):
+        assert first_tier_label("LABEL: unsupported", 0.8) is None
+
+    def test_weakly_supported_escalates(self):
+        assert first_tier_label("LABEL: weakly_supported\nCONFIDENCE: 0.99", 0.8) is None
+
+    def test_unparseable_escalates(self):
+        assert first_tier_label("no idea", 0.8) is None
+
+
+class TestCascade:
+    @patch("src.agents.verify_claims.call_llm", return_value="LABEL: supported\nCONFIDENCE: 0.9")
+    def test_fast_tier_decides_clear_claims(self, mock_llm):
+        state = {"evidence": [_make_entry("claim", ["doc"])], "config": CASCADE_CONFIG}
+        verify_claims(state)
+
+        assert mock_llm.call_count == 1
+        assert mock_llm.call_args.kwargs["model_id"] == "fast-model"
+        assert "CONFIDENCE" in mock_llm.call_args.kwargs["system"]
+        assert state["verdicts"][0]["verdict"] == "supported"
+        assert state["verdicts"][0]["tier"] == "fast"
+
+    @patch(
+        "src.agents.verify_claims.call_llm",
+        side_effect=["LABEL: weakly_supported\nCONFIDENCE: 0.9", UNSUPPORTED_RESPONSE],
+    )
+    def test_unsure_answer_escalates_to_strong_model(self, mock_llm):
+        state = {"evidence": [_make_entry("claim", ["doc"])], "config": CASCADE_CONFIG}
+        verify_claims(state)
+
+        assert [c.kwargs["model_id"] for c in mock_llm.call_args_list] == [
+            "fast-model",
+            "strong-model",
+        ]
+        assert state["verdicts"][0]["verdict"] == "unsupported"
+        assert state["verdicts"][0]["tier"] == "strong"
+
+    @patch("src.agents.verify_claims.call_llm", return_value=SUPPORTED_RESPONSE)
+    def test_without_cascade_main_model_decides(self, mock_llm):
+        config = {"models": {"verify_claims": "strong-model"}}
+        state = {"evidence": [_make_entry("claim", ["doc"])], "config": config}
+        verify_claims(state)
+
+        assert mock_llm.call_args.kwargs["model_id"] == "strong-model"
+        assert state["verdicts"][0]["tier"] == "strong"
+
+
+class TestBatch:
+    def _config(self, tmp_path, **extra):
+        batch = {"transport": "local", "directory": str(tmp_path), "min_records": 1}
+        return {**CASCADE_CONFIG, "batch": batch, **extra}
+
+    def test_cascade_and_escalations_run_as_jobs(self, tmp_path):
+        def answer(model_id, body):
+            claim = body["messages"][0]["content"].rsplit("Claim: ", 1)[1]
+            if model_id == "fast-model":
+                text = "LABEL: supported\nCONFIDENCE: 0.95" if claim == "clear" else "LABEL: x"
+            else:
+                text = UNSUPPORTED_RESPONSE
+            return {"content": [{"text": text}]}
+
+        entries = [
+            _make_entry("clear", ["doc"]),
+            _make_entry("no docs", []),
+            _make_entry("murky", ["doc"]),
+        ]
+        state = {"evidence": entries, "config": self._config(tmp_path)}
+        with (
+            patch("src.wrappers.bedrock_batch._run_local", side_effect=answer),
+            patch("src.agents.verify_claims.call_llm") as mock_llm,
+        ):
+            verify_claims(state)
+
+        mock_llm.assert_not_called()
+        assert [(v["verdict"], v["tier"]) for v in state["verdicts"]] == [
+            ("supported", "fast"),
+            ("unsupported", None),
+            ("unsupported", "strong"),
+        ]
+        assert sorted(p.name.rsplit("-", 1)[0] for p in tmp_path.iterdir()) == [
+            "llm-gate-verify",
+            "llm-gate-verify-fast",
+        ]
+
+    def test_rejects_combination_with_early_stop(self, tmp_path):
+        config = self._config(tmp_path, verification={"early_stop": {"confidence": 0.95}})
+        state = {"evidence": [], "config": config}
+        with pytest.raises(ValueError, match="early_stop"):
+            verify_claims(state)